@@ -1,6 +1,10 @@
-import pandas as pd
 import glob
 import os
+import sys
+
+# 改用 Scripts/fin_CSV_BOM.py 的 byte 串流版本 (不再經過 pandas 讀寫，內容不會被改寫)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Scripts'))
+from fin_CSV_BOM import normalize
 
 # 1. 告訴使用者現在程式在哪裡執行
 current_path = os.getcwd()
@@ -23,11 +27,10 @@ for file in csv_files:
         
         print(f"正在處理: {file}...", end="")
         
-        # 讀取並去除 BOM
-        df = pd.read_csv(file, encoding='utf-8-sig')
-        df.to_csv(file, index=False, encoding='utf-8')
+        # 去除 BOM (沒有 BOM 的檔案不會重寫)
+        action, _ = normalize(file, file)
         
-        print(" [成功 ✅]")
+        print(" [沒有 BOM ✅]" if action == 'unchanged' else " [成功 ✅]")
         
     except Exception as e:
         print(f" [失敗 ❌] {e}")
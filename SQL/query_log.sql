@@ -0,0 +1,34 @@
+-- 期末 Demo 的典型查詢 (Index_Advisor.py 的輸入)
+-- 日期條件以資料裡最後一筆訂單的日期 (MAX(OrderDate)) 往前推，不用 datetime('now'):
+-- 訂單日期固定在生成時的 --anchor-date 之前，跟執行查詢的那一天無關
+
+-- 規格篩選 (GUI 的 RAM / 容量 / 顯卡記憶體下拉選單)
+SELECT SKU_ID, Price FROM SKU WHERE RAM = 8 AND StorageCapacity = 512 AND VRAM >= 0 ORDER BY Price;
+SELECT SKU_ID, Price FROM SKU WHERE RAM = 16 AND StorageCapacity = 512 AND VRAM >= 4 ORDER BY Price;
+SELECT SKU_ID, Price FROM SKU WHERE RAM = 16 AND StorageCapacity = 1024 AND VRAM >= 6 ORDER BY Price;
+SELECT SKU_ID, Price FROM SKU WHERE RAM = 32 AND StorageCapacity = 1024 AND VRAM >= 8 ORDER BY Price;
+
+-- 價格區間瀏覽
+SELECT SKU_ID, CPU, GPU, Price FROM SKU WHERE Price BETWEEN 20000 AND 25000 ORDER BY Price LIMIT 50;
+SELECT SKU_ID, CPU, GPU, Price FROM SKU WHERE Price BETWEEN 45000 AND 55000 ORDER BY Price LIMIT 50;
+
+-- 每日訂單數 (依狀態)
+SELECT substr(OrderDate, 1, 10) AS Day, Status, COUNT(*) AS Orders
+FROM "Order" WHERE OrderDate >= datetime((SELECT MAX(OrderDate) FROM "Order"), '-7 days')
+GROUP BY Day, Status ORDER BY Day;
+
+-- 日期區間銷售報表
+SELECT substr(o.OrderDate, 1, 10) AS Day, COUNT(DISTINCT o.Order_ID) AS Orders, SUM(oi.Quantity * s.Price) AS Revenue
+FROM "Order" o JOIN OrderItem oi ON oi.OrderID = o.Order_ID JOIN SKU s ON s.SKU_ID = oi.SKUID
+WHERE o.OrderDate >= datetime((SELECT MAX(OrderDate) FROM "Order"), '-7 days')
+GROUP BY Day ORDER BY Day;
+
+-- 近 30 天熱銷排行
+SELECT p.BrandName, p.ProductName, SUM(oi.Quantity) AS Sold
+FROM OrderItem oi JOIN "Order" o ON o.Order_ID = oi.OrderID
+JOIN SKU s ON s.SKU_ID = oi.SKUID JOIN Product p ON p.ProductID = s.ProductID
+WHERE o.OrderDate >= datetime((SELECT MAX(OrderDate) FROM "Order"), '-30 days')
+GROUP BY p.ProductID ORDER BY Sold DESC LIMIT 10;
+
+-- 會員中心: 顧客的歷史訂單
+SELECT Order_ID, OrderDate, Status FROM "Order" WHERE Customer_ID = 42 ORDER BY OrderDate DESC;
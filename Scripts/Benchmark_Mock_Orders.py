@@ -0,0 +1,92 @@
+import pandas as pd
+import numpy as np
+import time
+import argparse
+import sys
+
+from faker import Faker
+
+import Mock_Data_Generator_V3 as mock
+
+# --- 0. 參數設定 ---
+LOOP_ORDERS = 20_000        # 逐筆迴圈很慢，用較小的量
+VEC_ORDERS = 2_000_000
+SEED = 42
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+# --- 1. 分布摘要 (兩種模式應該一致) ---
+def distribution(order_df, order_item_df, address_df, hot_skus):
+    items_per_order = order_item_df.groupby('OrderID').size()
+    payment_by_address = dict(zip(address_df['AddressID'], address_df['PaymentMethod']))
+    expected_payment = order_df['Address_ID'].map(payment_by_address)
+    pairs = order_item_df[['OrderID', 'SKUID']]
+    dates = pd.to_datetime(order_df['OrderDate'])
+    customer_counts = order_df['Customer_ID'].value_counts()
+    return {
+        'status': order_df['Status'].astype(str).value_counts(normalize=True).reindex(mock.statuses).to_numpy(),
+        'items': items_per_order.value_counts(normalize=True).reindex(mock.item_counts).to_numpy(),
+        'quantity': order_item_df['Quantity'].value_counts(normalize=True).reindex(mock.quantities).to_numpy(),
+        'hot_share': order_item_df['SKUID'].isin(hot_skus).mean() if hot_skus is not None else np.nan,
+        'payment_ok': (order_df['PaymentMethod'].astype(str).to_numpy() == expected_payment.astype(str).to_numpy()).all(),
+        'unique_sku_in_order': not pairs.duplicated().any(),
+        'date_days': (dates.max() - dates.min()).total_seconds() / 86400,
+        # 均勻抽樣時每位顧客的訂單數近似 Poisson，變異數 / 平均數應接近 1 (與樣本大小無關)
+        'customer_dispersion': customer_counts.var() / customer_counts.mean(),
+    }
+
+def print_distribution(name, d):
+    fmt = lambda arr: ' / '.join(f'{x:.3f}' for x in arr)
+    print(f"  [{name}]")
+    print(f"    狀態比例 {mock.statuses}: {fmt(d['status'])}")
+    print(f"    品項數比例 1/2/3: {fmt(d['items'])}   數量比例 1/2: {fmt(d['quantity'])}")
+    print(f"    熱銷品項占比: {d['hot_share']:.3f}   付款方式與地址一致: {d['payment_ok']}   同單 SKU 不重複: {d['unique_sku_in_order']}")
+    print(f"    日期跨度: {d['date_days']:.1f} 天   每位顧客訂單數 變異數/平均: {d['customer_dispersion']:.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='訂單生成效能比較 (逐筆迴圈 vs 批次)')
+    parser.add_argument('--loop-orders', type=int, default=LOOP_ORDERS, help='迴圈模式的訂單數')
+    parser.add_argument('--orders', type=int, default=VEC_ORDERS, help='批次模式的訂單數')
+    args = parser.parse_args()
+
+    try:
+        valid_sku_ids = mock.load_sku_ids()
+    except FileNotFoundError:
+        print("錯誤：找不到 sku_table_v6.csv。")
+        sys.exit(1)
+
+    mock.seed_all(SEED)
+    fake = Faker(mock.LOCALE)
+    customer_df = mock.generate_customers(fake)
+    address_df = mock.generate_addresses(fake, customer_df)
+    print("-" * 30)
+
+    # 熱銷品項是在函式內抽的，這裡用同樣的種子重抽一次來計算占比
+    mock.seed_all(SEED + 1)
+    hot_loop = set(mock.random.sample(valid_sku_ids, k=int(len(valid_sku_ids) * mock.HOT_RATIO)))
+    mock.seed_all(SEED + 1)
+    (loop_orders, loop_items), t_loop = timed(mock.generate_orders, fake, valid_sku_ids, customer_df, address_df, args.loop_orders)
+
+    hot_rng = np.random.default_rng(SEED + 1)
+    sku_array = np.asarray(valid_sku_ids)
+    hot_vec = set(sku_array[hot_rng.choice(len(sku_array), size=int(len(sku_array) * mock.HOT_RATIO), replace=False)])
+    (vec_orders, vec_items), t_vec = timed(mock.generate_orders_vec, np.random.default_rng(SEED + 1), valid_sku_ids,
+                                           customer_df, address_df, args.orders)
+
+    print("-" * 30)
+    print("[訂單生成速度]")
+    print(f"  loop       : {args.loop_orders:>10} 筆 {t_loop:8.2f} s  ({args.loop_orders / t_loop:12,.0f} orders/s)")
+    print(f"  vectorized : {args.orders:>10} 筆 {t_vec:8.2f} s  ({args.orders / t_vec:12,.0f} orders/s)")
+    print(f"  加速倍數: {(args.orders / t_vec) / (args.loop_orders / t_loop):.0f}x")
+
+    print("[分布比較]")
+    print_distribution('loop', distribution(loop_orders, loop_items, address_df, hot_loop))
+    print_distribution('vectorized', distribution(vec_orders, vec_items, address_df, hot_vec))
+    n, h = len(valid_sku_ids), int(len(valid_sku_ids) * mock.HOT_RATIO)
+    print(f"  (單件抽中熱銷品的理論機率: {mock.HOT_WEIGHT * h / (mock.HOT_WEIGHT * h + n - h):.3f})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+import Schema_Registry
+import Load_SQLite
+import Mock_Data_Generator_V3 as mock
+
+# --- 查詢效能測試 (v2 索引實際有沒有幫助) ---
+# create_tables_v2.sql 為期末 Demo 加了 idx_sku_specs / idx_sku_price / idx_order_date。
+# 這裡定義 Demo 的實際查詢 (規格篩選、價格區間、日期區間銷售報表、熱銷排行)，
+# 在不同資料規模的 SQLite 副本上，分別在「全部索引 / 少一個索引 / 沒有索引」下量測 p50 / p95 延遲，並列出查詢計畫。
+# 資料規模 SF: 顧客 / 訂單數同 Mock_Data_Generator_V3 --scale-factor；SKU 表複製 SF 份 (料號加 -S{k})，
+# 規格 / 價格的分布不變，只是筆數放大。
+
+SCALES = [1, 10, 50]
+REPEAT = 30
+SEED = 42
+
+# 每個查詢: 目標索引、SQL、參數產生方式
+WORKLOADS = {
+    'spec_filter': {
+        'index': 'idx_sku_specs',
+        'sql': 'SELECT SKU_ID, Price FROM SKU WHERE RAM = ? AND StorageCapacity = ? AND VRAM >= ? ORDER BY Price',
+    },
+    'price_range': {
+        'index': 'idx_sku_price',
+        'sql': 'SELECT SKU_ID, CPU, GPU, Price FROM SKU WHERE Price BETWEEN ? AND ? ORDER BY Price LIMIT 50',
+    },
+    'daily_orders': {
+        'index': 'idx_order_date',
+        'sql': """SELECT substr(OrderDate, 1, 10) AS Day, Status, COUNT(*) AS Orders
+                  FROM "Order" WHERE OrderDate >= ? AND OrderDate < ?
+                  GROUP BY Day, Status ORDER BY Day""",
+    },
+    'sales_report': {
+        'index': 'idx_order_date',
+        'sql': """SELECT substr(o.OrderDate, 1, 10) AS Day, COUNT(DISTINCT o.Order_ID) AS Orders, SUM(oi.Quantity * s.Price) AS Revenue
+                  FROM "Order" o JOIN OrderItem oi ON oi.OrderID = o.Order_ID JOIN SKU s ON s.SKU_ID = oi.SKUID
+                  WHERE o.OrderDate >= ? AND o.OrderDate < ?
+                  GROUP BY Day ORDER BY Day""",
+    },
+    'best_sellers': {
+        'index': 'idx_order_date',
+        'sql': """SELECT p.BrandName, p.ProductName, SUM(oi.Quantity) AS Sold
+                  FROM OrderItem oi JOIN "Order" o ON o.Order_ID = oi.OrderID
+                  JOIN SKU s ON s.SKU_ID = oi.SKUID JOIN Product p ON p.ProductID = s.ProductID
+                  WHERE o.OrderDate >= ? AND o.OrderDate < ?
+                  GROUP BY p.ProductID ORDER BY Sold DESC LIMIT 10""",
+    },
+}
+
+# --- 1. 建立指定規模的資料庫 ---
+def write_and_load(conn, table, df, tmp):
+    csv_table = Schema_Registry.csv_table_for(table)
+    path = os.path.join(tmp, csv_table + '.csv')
+    Schema_Registry.cast(df, csv_table).to_csv(path, index=False, encoding='utf-8-sig')
+    return Load_SQLite.load_table(conn, table, path)
+
+def build_database(path, scale, seed=SEED, processed=Schema_Registry.PROCESSED_DIR):
+    conn = Load_SQLite.create_database(path)
+    tmp = os.path.dirname(path)
+    Load_SQLite.load_table(conn, 'Product', os.path.join(processed, 'product_table.csv'))
+
+    sku_df = Schema_Registry.read_csv(os.path.join(processed, 'sku_table_v6.csv'), shrink_columns=False)
+    copies = max(1, int(round(scale)))
+    catalog = pd.concat([sku_df.assign(SKU_ID=sku_df['SKU_ID'] + ('' if k == 0 else f'-S{k}')) for k in range(copies)],
+                        ignore_index=True)
+    write_and_load(conn, 'SKU', catalog, tmp)
+
+    num_customers, num_orders = mock.scaled_counts(scale)
+    customer_df, address_df = mock.generate_customers_sharded(seed, num_customers, workers=1)
+    order_df, order_item_df = mock.generate_orders_sharded(seed + 1, catalog[['SKU_ID']], customer_df, address_df,
+                                                           num_orders, workers=1)
+    for table, df in [('Customer', customer_df), ('AddressBook', address_df), ('Order', order_df), ('OrderItem', order_item_df)]:
+        write_and_load(conn, table, df, tmp)
+    Load_SQLite.create_indexes(conn)
+    conn.execute('ANALYZE')
+    return conn
+
+def table_counts(conn):
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {Load_SQLite.quote(table)}").fetchone()[0]
+            for table in Schema_Registry.load_order()}
+
+# --- 2. 查詢參數 (從資料裡抽，跟真實使用者會查的條件一樣) ---
+def date_windows(conn, rng, n, days):
+    low, high = conn.execute('SELECT MIN(OrderDate), MAX(OrderDate) FROM "Order"').fetchone()
+    low, high = datetime.fromisoformat(low), datetime.fromisoformat(high)
+    span = max((high - low - timedelta(days=days)).total_seconds(), 0)
+    starts = [low + timedelta(seconds=float(s)) for s in rng.random(n) * span]
+    return [(s.isoformat(sep=' '), (s + timedelta(days=days)).isoformat(sep=' ')) for s in starts]
+
+def workload_params(conn, name, rng, n):
+    if name == 'spec_filter':
+        rows = conn.execute('SELECT RAM, StorageCapacity, VRAM FROM SKU').fetchall()
+        return [rows[i] for i in rng.integers(0, len(rows), n)]
+    if name == 'price_range':
+        prices = [row[0] for row in conn.execute('SELECT Price FROM SKU')]
+        return [(prices[i], int(prices[i] * 1.2)) for i in rng.integers(0, len(prices), n)]
+    if name in ('daily_orders', 'sales_report'):
+        return date_windows(conn, rng, n, days=7)
+    if name == 'best_sellers':
+        return date_windows(conn, rng, n, days=30)
+    raise ValueError(f"未知的查詢: {name}")
+
+# --- 3. 量測 ---
+def set_indexes(conn, keep):
+    """只保留 keep 裡的索引 (其他 DROP 掉，缺的補建)，再 ANALYZE 讓查詢計畫用最新的統計。"""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+    indexes = {index['name']: index for index in Schema_Registry.load_schema()['indexes']}
+    for name in existing - set(keep):
+        conn.execute(f"DROP INDEX {Load_SQLite.quote(name)}")
+    for name in set(keep) - existing:
+        conn.execute(Load_SQLite.create_index_sql(indexes[name]))
+    conn.execute('ANALYZE')
+
+def index_configs():
+    names = [index['name'] for index in Schema_Registry.load_schema()['indexes']]
+    return [('全部索引', names)] + [(f'無 {n}', [x for x in names if x != n]) for n in names] + [('無索引', [])]
+
+def time_query(conn, sql, params_list):
+    conn.execute(sql, params_list[0]).fetchall()  # 暖身 (載入 page cache)
+    latencies = []
+    for params in params_list:
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+def query_plan(conn, sql, params):
+    return ' / '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+
+def run_scale(conn, workloads, repeat, seed=SEED):
+    """回傳 {(查詢, 設定): (p50, p95, 查詢計畫)}。"""
+    rng = np.random.default_rng(seed)
+    params = {name: workload_params(conn, name, rng, repeat) for name in workloads}
+    results = {}
+    for config, keep in index_configs():
+        set_indexes(conn, keep)
+        for name in workloads:
+            ms = time_query(conn, WORKLOADS[name]['sql'], params[name])
+            plan = query_plan(conn, WORKLOADS[name]['sql'], params[name][0])
+            results[name, config] = (np.percentile(ms, 50), np.percentile(ms, 95), plan)
+    set_indexes(conn, [index['name'] for index in Schema_Registry.load_schema()['indexes']])
+    return results
+
+def print_scale(results, workloads):
+    configs = [config for config, _ in index_configs()]
+    print(f"  {'查詢':<14}{'設定':<22}{'p50 ms':>10}{'p95 ms':>10}{'p50 加速':>10}")
+    for name in workloads:
+        baseline = results[name, '無索引'][0]
+        for config in configs:
+            p50, p95, _ = results[name, config]
+            print(f"  {name:<14}{config:<22}{p50:10.3f}{p95:10.3f}{baseline / max(p50, 1e-9):9.1f}x")
+    print("  查詢計畫 (全部索引 -> 少了目標索引):")
+    for name in workloads:
+        target = WORKLOADS[name]['index']
+        print(f"    {name}:")
+        print(f"      有 {target}: {results[name, '全部索引'][2]}")
+        print(f"      無 {target}: {results[name, '無 ' + target][2]}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Demo 查詢在不同規模 / 索引組合下的延遲 (SQLite)')
+    parser.add_argument('--scales', type=float, nargs='*', default=SCALES, help='資料規模 SF (顧客 / 訂單 / SKU 的放大倍數)')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='每個查詢執行幾次 (每次參數不同)')
+    parser.add_argument('--workloads', nargs='*', choices=list(WORKLOADS), default=list(WORKLOADS), help='要量測的查詢')
+    parser.add_argument('--seed', type=int, default=SEED, help='資料與查詢參數的亂數種子')
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        print("=" * 30)
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            conn = build_database(os.path.join(tmp, 'LaptopStore.sqlite'), scale, args.seed)
+            counts = table_counts(conn)
+            print(f"[SF={scale:g}] 建立資料庫 {time.perf_counter() - start:.1f} s   "
+                  + '  '.join(f"{table} {n:,}" for table, n in counts.items()))
+            print_scale(run_scale(conn, args.workloads, args.repeat, args.seed), args.workloads)
+            conn.close()
+
+if __name__ == '__main__':
+    main()
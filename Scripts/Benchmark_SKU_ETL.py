@@ -0,0 +1,160 @@
+import pandas as pd
+import numpy as np
+import random
+import time
+import argparse
+import os
+import sys
+import subprocess
+import tempfile
+import hashlib
+
+import ETL_SKU_Table_V6 as etl
+
+# --- 0. 參數設定 ---
+SCALE = 50   # 把 laptop.csv 複製幾倍來模擬大型供應商資料
+SEED = 42
+
+# --- 1. 準備放大後的輸入 ---
+def make_scaled_raw(raw_df, scale):
+    return pd.concat([raw_df] * scale, ignore_index=True)
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+# --- 2. 只量六個清洗欄位 (RAM / ScreenSize / Price / VRAM / StorageCapacity / StorageType) ---
+def clean_columns_row(df):
+    return pd.DataFrame({
+        'RAM': df['RAM'].apply(etl.clean_ram),
+        'ScreenSize': df['Display'].apply(etl.clean_screen),
+        'Price': df['Price'].apply(etl.clean_price),
+        'VRAM': df['GPU'].apply(etl.extract_vram),
+        'StorageCapacity': df.apply(etl.calculate_total_storage, axis=1),
+        'StorageType': df.apply(etl.get_storage_type, axis=1),
+    })
+
+def clean_columns_vectorized(df):
+    return pd.DataFrame({
+        'RAM': etl.clean_ram_vec(df['RAM']),
+        'ScreenSize': etl.clean_screen_vec(df['Display']),
+        'Price': etl.clean_price_vec(df['Price']),
+        'VRAM': etl.extract_vram_vec(df['GPU']),
+        'StorageCapacity': etl.calculate_total_storage_vec(df),
+        'StorageType': etl.get_storage_type_vec(df),
+    })
+
+# --- 3. 重量欄位 (逐列 get_hybrid_weight vs 批次重量模型) ---
+def weight_row(df):
+    return df.apply(etl.get_hybrid_weight, axis=1)
+
+def weight_vectorized(df):
+    return etl.get_hybrid_weight_vec(df, np.random.default_rng(SEED).random(len(df)))
+
+# --- 4. 整條 ETL (含重量、料號、庫存) ---
+def run_full(raw_df, product_df, mode):
+    random.seed(SEED)
+    np.random.seed(SEED)
+    return etl.build_sku_table(raw_df, product_df, mode=mode, seed=SEED)
+
+# --- 5. 記憶體: 一次讀入 vs 串流模式 (各自在子行程執行，量 peak RSS) ---
+def run_with_peak_rss(cmd):
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    if status != 0:
+        raise RuntimeError(f"執行失敗: {' '.join(cmd)}")
+    return usage.ru_maxrss / 1024  # Linux 單位為 KB
+
+def compare_memory(raw_df, scales):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ETL_SKU_Table_V6.py')
+    print("[記憶體 peak RSS]")
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = os.path.join(tmp, 'laptop_scaled.csv')
+        for scale in scales:
+            make_scaled_raw(raw_df, scale).to_csv(raw_path, index=False, encoding=etl.RAW_ENCODING)
+            size_mb = os.path.getsize(raw_path) / 1024 / 1024
+            base = [sys.executable, script, '--raw', raw_path, '--output', os.path.join(tmp, 'out.csv'), '--seed', str(SEED)]
+            batch_mb = run_with_peak_rss(base)
+            stream_mb = run_with_peak_rss(base + ['--stream'])
+            print(f"  輸入 {len(raw_df) * scale:>9} 筆 ({size_mb:7.1f} MB): 一次讀入 {batch_mb:8.1f} MB   串流 {stream_mb:8.1f} MB")
+
+# --- 6. 平行模式的擴展曲線 (1, 2, 4, 8, 16 個行程) ---
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+
+def file_md5(path):
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+def scaling_curve(raw_df, product_df, scale, chunksize):
+    print(f"[平行擴展曲線] (本機 CPU 核心數: {os.cpu_count()})")
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = os.path.join(tmp, 'laptop_scaled.csv')
+        make_scaled_raw(raw_df, scale).to_csv(raw_path, index=False, encoding=etl.RAW_ENCODING)
+        serial_path = os.path.join(tmp, 'serial.csv')
+        _, t_serial = timed(etl.stream_sku_table, raw_path, product_df, serial_path, chunksize, SEED)
+        serial_md5 = file_md5(serial_path)
+        n = len(raw_df) * scale
+        print(f"  serial     : {t_serial:8.2f} s  ({n / t_serial:12,.0f} rows/s)")
+        for workers in WORKER_COUNTS:
+            out_path = os.path.join(tmp, f'parallel_{workers}.csv')
+            _, t_par = timed(etl.parallel_sku_table, raw_path, product_df, out_path, workers, chunksize, SEED)
+            same = file_md5(out_path) == serial_md5
+            print(f"  workers={workers:<3}: {t_par:8.2f} s  ({n / t_par:12,.0f} rows/s)  加速 {t_serial / t_par:5.2f}x  與單行程相同: {same}")
+
+def main():
+    parser = argparse.ArgumentParser(description='SKU ETL 清洗效能比較')
+    parser.add_argument('--scale', type=int, default=SCALE, help='輸入放大倍數')
+    parser.add_argument('--memory', action='store_true', help='改為比較一次讀入與串流模式的記憶體用量')
+    parser.add_argument('--workers-curve', action='store_true', help='改為量測平行模式 1~16 個行程的擴展曲線')
+    parser.add_argument('--chunksize', type=int, default=20_000, help='平行模式每批的列數')
+    args = parser.parse_args()
+
+    try:
+        raw_df, product_df = etl.load_inputs()
+    except FileNotFoundError:
+        print("找不到檔案，請確認 laptop.csv 與 product_table.csv 的位置。")
+        sys.exit(1)
+
+    if args.workers_curve:
+        scaling_curve(raw_df, product_df, args.scale, args.chunksize)
+        return
+
+    if args.memory:
+        compare_memory(raw_df, [max(1, args.scale // 4), args.scale, args.scale * 4])
+        return
+
+    scaled = make_scaled_raw(raw_df, args.scale)
+    n = len(scaled)
+    print(f"輸入筆數: {len(raw_df)} x {args.scale} = {n}")
+    print("-" * 30)
+
+    row_cols, t_row = timed(clean_columns_row, scaled)
+    vec_cols, t_vec = timed(clean_columns_vectorized, scaled)
+    same = row_cols.reset_index(drop=True).equals(vec_cols.reset_index(drop=True))
+    print("[清洗欄位]")
+    print(f"  row        : {t_row:8.2f} s  ({n / t_row:12,.0f} rows/s)")
+    print(f"  vectorized : {t_vec:8.2f} s  ({n / t_vec:12,.0f} rows/s)")
+    print(f"  加速倍數: {t_row / t_vec:.1f}x   輸出相同: {same}")
+
+    weighted = scaled.assign(ScreenSize=vec_cols['ScreenSize'])
+    _, t_row = timed(weight_row, weighted)
+    vec_weight, t_vec = timed(weight_vectorized, weighted)
+    reproducible = vec_weight.equals(weight_vectorized(weighted))
+    print("[重量]")
+    print(f"  row        : {t_row:8.2f} s  ({n / t_row:12,.0f} rows/s)")
+    print(f"  vectorized : {t_vec:8.2f} s  ({n / t_vec:12,.0f} rows/s)")
+    print(f"  加速倍數: {t_row / t_vec:.1f}x   同種子可重現: {reproducible}")
+
+    row_df, t_row = timed(run_full, scaled, product_df, 'row')
+    vec_df, t_vec = timed(run_full, scaled, product_df, 'vectorized')
+    # Weight / Stock / 料號隨機碼的亂數來源不同，只比較其餘欄位
+    compare = [c for c in row_df.columns if c not in ('SKU_ID', 'Weight', 'Stock')]
+    same = row_df[compare].reset_index(drop=True).equals(vec_df[compare].reset_index(drop=True))
+    print("[完整 ETL]")
+    print(f"  row        : {t_row:8.2f} s  ({n / t_row:12,.0f} rows/s)")
+    print(f"  vectorized : {t_vec:8.2f} s  ({n / t_vec:12,.0f} rows/s)")
+    print(f"  加速倍數: {t_row / t_vec:.1f}x   輸出相同: {same}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import pandas as pd
+import time
+import argparse
+import os
+import sys
+import tempfile
+
+import Table_Formats
+
+# --- 0. 參數設定 ---
+SCALE = 20    # 把每張表複製幾倍，讓讀取時間量得出差異
+REPEAT = 3    # 每種格式讀幾次取最快的一次
+PROCESSED = '../Data/Processed'
+TABLES = ['sku_table_v6', 'product_table', 'customer', 'address_book', 'order', 'order_item']
+
+def best_time(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+# --- 1. 單一張表: CSV (未指定型別) vs Parquet vs Feather ---
+def compare_table(table, scale, repeat, tmp):
+    df = pd.read_csv(os.path.join(PROCESSED, table + '.csv'), encoding='utf-8-sig')
+    df = pd.concat([df] * scale, ignore_index=True)
+
+    csv_path = os.path.join(tmp, table + '.csv')
+    df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+    Table_Formats.write_columnar(df, csv_path, Table_Formats.COLUMNAR_FORMATS)
+
+    loaders = {
+        'csv': lambda: pd.read_csv(csv_path, encoding='utf-8-sig'),
+        'parquet': lambda: pd.read_parquet(Table_Formats.columnar_path(csv_path, 'parquet')),
+        'feather': lambda: pd.read_feather(Table_Formats.columnar_path(csv_path, 'feather')),
+    }
+    rows = {}
+    for fmt, loader in loaders.items():
+        loaded, seconds = best_time(loader, repeat)
+        path = csv_path if fmt == 'csv' else Table_Formats.columnar_path(csv_path, fmt)
+        rows[fmt] = (seconds, os.path.getsize(path) / 1024 / 1024, memory_mb(loaded))
+
+    # 型別轉換不能改變內容: 把 CSV 套上同樣的型別後應與 Parquet 完全相同
+    typed_csv = Table_Formats.typed_table(loaders['csv'](), table)
+    same = typed_csv.equals(loaders['parquet']())
+    return len(df), rows, same
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV / Parquet / Feather 讀取效能比較')
+    parser.add_argument('--scale', type=int, default=SCALE, help='每張表放大倍數')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='每種格式讀取次數 (取最快)')
+    args = parser.parse_args()
+
+    if not Table_Formats.has_pyarrow():
+        print("需要 pyarrow 才能比較 Parquet / Feather。")
+        sys.exit(1)
+
+    totals = {fmt: [0.0, 0.0, 0.0] for fmt in ['csv', 'parquet', 'feather']}
+    with tempfile.TemporaryDirectory() as tmp:
+        for table in TABLES:
+            try:
+                n, rows, same = compare_table(table, args.scale, args.repeat, tmp)
+            except FileNotFoundError:
+                print(f"找不到 {table}.csv，略過。")
+                continue
+            print(f"[{table}] {n} 筆   型別轉換後內容相同: {same}")
+            for fmt, (seconds, size_mb, mem_mb) in rows.items():
+                speedup = rows['csv'][0] / seconds
+                print(f"  {fmt:<8}: 讀取 {seconds:7.3f} s ({speedup:5.1f}x)   檔案 {size_mb:7.2f} MB   記憶體 {mem_mb:7.2f} MB")
+                for i, value in enumerate((seconds, size_mb, mem_mb)):
+                    totals[fmt][i] += value
+
+    print("-" * 30)
+    print("[全部資料表合計]")
+    for fmt, (seconds, size_mb, mem_mb) in totals.items():
+        print(f"  {fmt:<8}: 讀取 {seconds:7.3f} s ({totals['csv'][0] / seconds:5.1f}x)   檔案 {size_mb:7.2f} MB   記憶體 {mem_mb:7.2f} MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import argparse
+
+import Schema_Registry
+
+# --- 規格搜尋索引 (GUI 的規格比較 / 篩選) ---
+# 每個篩選條件都要在資料庫掃一次 SKU 表；這裡把 SKU 目錄在記憶體裡建成 bitmap 索引:
+#   - 每個屬性的每一格 (bin) 一個 bitmap (uint64 陣列，一個 bit 對應一個 SKU)
+#   - 不同值不多的屬性 (RAM / VRAM / StorageCapacity / ScreenSize / StorageType) 一個值一格，等值 / 範圍都是整格 OR
+#   - 不同值太多的屬性 (Price / Weight) 依分位數切成 MAX_BINS 格，完全落在範圍內的格子直接 OR，
+#     跨過邊界的格子 (最多兩格) 再逐筆比對原始值 (每格的 SKU 位置以 CSR 方式存放)
+#   - 多個條件 = bitmap AND，筆數 = popcount
+# Facet 數量 (選項旁的 "(123)") 用「其他屬性的條件」計算，已選的屬性仍能看到其他選項的數量。
+# 每個屬性都要對每一格 AND + popcount，成本是「總格數 × SKU 數 / 64」(400 萬筆約 10 ms)，所以 facet 另外:
+#   - 規格組合 (cell): 建索引時把 ATTRIBUTES 的值完全相同的 SKU 併成一組並記下筆數。
+#     同一款機器的各種料號規格都一樣，組合數遠少於 SKU 數 (目錄放大幾倍都不變)，
+#     facet 改成在組合上比對條件、以筆數為權重 bincount，成本只跟組合數有關
+#   - 組合數太多 (幾乎每筆規格都不同) 時才用 bitmap；符合的筆數很少時改成取出位置再 bincount，不必每一格都 AND 一次
+
+ATTRIBUTES = ['RAM', 'VRAM', 'StorageCapacity', 'ScreenSize', 'Weight', 'Price', 'StorageType']
+MAX_BINS = 64       # 不同值超過這個數就改用分位數分格
+SPARSE_RATIO = 64   # 符合筆數 < 總筆數 / SPARSE_RATIO 時，facet 改用位置 + bincount
+REPEAT = 200
+SEED = 42
+
+BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# --- 1. Bitmap 操作 ---
+def bit_counts(bitmaps):
+    # 沿最後一軸計算 1 的個數；numpy >= 2.0 有 bitwise_count，舊版逐 byte 查表
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitmaps).sum(axis=-1, dtype=np.int64)
+    return BYTE_COUNTS[bitmaps.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+def bits_at(positions, words):
+    """由遞增排序的位置建立 bitmap: 同一個 word 的 bit 用 reduceat 一次 OR 起來。"""
+    bitmap = np.zeros(words, dtype=np.uint64)
+    if len(positions):
+        word = positions >> 6
+        bits = np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64))
+        starts = np.flatnonzero(np.r_[True, word[1:] != word[:-1]])
+        bitmap[word[starts]] = np.bitwise_or.reduceat(bits, starts)
+    return bitmap
+
+def condition_mask(values, cond):
+    # 與 CatalogIndex.match 相同的條件語意，直接對值比對 (空值一律不符合)
+    if isinstance(cond, (list, set, frozenset)):
+        mask = np.zeros(len(values), dtype=bool)
+        for value in cond:
+            mask |= condition_mask(values, value)
+        return mask
+    low, high = cond if isinstance(cond, tuple) else (cond, cond)
+    mask = ~pd.isna(values)
+    if low is not None:
+        mask[mask] = values[mask] >= low
+    if high is not None:
+        mask[mask] = values[mask] <= high
+    return mask
+
+def positions_of(bitmap):
+    # 固定以 little-endian 展開 (第 i 個 bit 在第 i // 8 個 byte 的第 i % 8 位)，與機器的位元組順序無關
+    return np.flatnonzero(np.unpackbits(bitmap.astype('<u8', copy=False).view(np.uint8), bitorder='little'))
+
+# --- 2. 建立索引 ---
+def build_column(values, words, max_bins=MAX_BINS):
+    """
+    回傳一個屬性的索引:
+      lower / upper: 每格的最小 / 最大值 (一值一格時兩者相同)；bins: 每筆 SKU 所在的格子 (-1 為空值)
+      order / starts: 依格子排序的 SKU 位置與每格的起點 (CSR)；bitmaps: 每格一個 bitmap
+    """
+    values = np.asarray(values)
+    valid = ~pd.isna(values)
+    uniques = np.unique(values[valid])
+    exact = len(uniques) <= max_bins
+    lower = uniques if exact else np.unique(np.quantile(values[valid], np.linspace(0, 1, max_bins, endpoint=False),
+                                                        method='lower'))
+    bins = np.full(len(values), -1, dtype=np.int32)
+    bins[valid] = np.searchsorted(lower, values[valid], side='right') - 1
+    order = np.argsort(bins, kind='stable')[np.count_nonzero(~valid):]
+    starts = np.searchsorted(bins[order], np.arange(len(lower) + 1))
+    upper = lower if exact else np.maximum.reduceat(values[order], starts[:-1])
+    bitmaps = np.stack([bits_at(order[starts[b]:starts[b + 1]], words) for b in range(len(lower))])
+    return {'values': values, 'exact': exact, 'lower': lower, 'upper': upper, 'bins': bins,
+            'order': order, 'starts': starts, 'bitmaps': bitmaps}
+
+def build_cells(columns):
+    """
+    把各屬性的值完全相同的 SKU 併成一個規格組合，回傳 (每個組合的筆數, {屬性: (組合的值, 組合所在的格子)})。
+    各欄分別 factorize 再逐欄合併代碼 (每次合併後重新 factorize，代碼不會超過 SKU 數，不會溢位)。
+    """
+    combined = None
+    for col in columns.values():
+        codes, uniques = pd.factorize(col['values'], use_na_sentinel=False)
+        combined = codes if combined is None else pd.factorize(combined * np.int64(len(uniques)) + codes)[0]
+    counts = np.bincount(combined)
+    # factorize 的代碼依第一次出現的順序編號，unique 的 return_index 即為每個組合第一次出現的列
+    first_rows = np.unique(combined, return_index=True)[1]
+    return counts, {attr: (col['values'][first_rows], col['bins'][first_rows]) for attr, col in columns.items()}
+
+class CatalogIndex:
+    """
+    篩選條件: {屬性: 條件}
+      值          -> 等於 (RAM = 16)
+      list / set  -> 其中之一 (ScreenSize in [14.0, 15.6])
+      (下限, 上限) -> 範圍，含兩端；None 表示不限 (Price 30000 ~ 40000、VRAM >= 4)
+    """
+    def __init__(self, sku_df, attributes=ATTRIBUTES, max_bins=MAX_BINS):
+        self.ids = sku_df['SKU_ID'].to_numpy()
+        self.n = len(sku_df)
+        self.words = (self.n + 63) // 64
+        self.everything = bits_at(np.arange(self.n), self.words)
+        self.columns = {attr: build_column(sku_df[attr].to_numpy(), self.words, max_bins) for attr in attributes}
+        self.cell_counts, self.cells = build_cells(self.columns)
+        # 兩種 facet 算法的成本: 組合數 × 屬性數 vs 總格數 × word 數，取便宜的
+        total_bins = sum(len(col['lower']) for col in self.columns.values())
+        self.use_cells = len(self.cell_counts) * len(self.columns) <= total_bins * self.words
+
+    def match(self, attr, cond):
+        col = self.columns[attr]
+        if isinstance(cond, (list, set, frozenset)):
+            if not cond:
+                return np.zeros(self.words, dtype=np.uint64)
+            return np.bitwise_or.reduce([self.match(attr, value) for value in cond])
+        low, high = cond if isinstance(cond, tuple) else (cond, cond)
+
+        lower, upper = col['lower'], col['upper']
+        inside = np.ones(len(lower), dtype=bool)
+        overlap = np.ones(len(lower), dtype=bool)
+        if low is not None:
+            inside &= lower >= low
+            overlap &= upper >= low
+        if high is not None:
+            inside &= upper <= high
+            overlap &= lower <= high
+        full = np.flatnonzero(inside)
+        bitmap = np.bitwise_or.reduce(col['bitmaps'][full], axis=0) if len(full) else np.zeros(self.words, dtype=np.uint64)
+        # 跨過邊界的格子逐筆比對 (一值一格時不會發生)
+        for b in np.flatnonzero(overlap & ~inside):
+            # stable argsort: 同一格內的位置本來就是遞增的，可以直接給 bits_at
+            rows = col['order'][col['starts'][b]:col['starts'][b + 1]]
+            values = col['values'][rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            bitmap |= bits_at(rows[keep], self.words)
+        return bitmap
+
+    def filter(self, filters):
+        bitmap = self.everything
+        for attr, cond in filters.items():
+            bitmap = bitmap & self.match(attr, cond)
+        return bitmap
+
+    def count(self, filters):
+        return int(bit_counts(self.filter(filters)))
+
+    def search(self, filters, limit=None):
+        # 回傳符合條件的 SKU_ID (依原本的順序)；limit: 只取前幾筆 (GUI 分頁)，只展開需要的那一段 bitmap
+        bitmap = self.filter(filters)
+        if limit is not None:
+            end = np.searchsorted(np.cumsum(bit_counts(bitmap[:, None])), limit) + 1
+            return self.ids[positions_of(bitmap[:end])[:limit]]
+        return self.ids[positions_of(bitmap)]
+
+    def facets(self, filters):
+        """{屬性: [(下限, 上限, 筆數)]}，每個屬性的數量套用的是「其他屬性」的條件。"""
+        if self.use_cells:
+            return self.cell_facets(filters)
+        matches = {attr: self.match(attr, cond) for attr, cond in filters.items()}
+        result = {}
+        for attr, col in self.columns.items():
+            others = self.everything
+            for other, bitmap in matches.items():
+                if other != attr:
+                    others = others & bitmap
+            if bit_counts(others) * SPARSE_RATIO < self.n:
+                counts = np.bincount(col['bins'][positions_of(others)] + 1, minlength=len(col['lower']) + 1)[1:]
+            else:
+                counts = bit_counts(col['bitmaps'] & others)
+            result[attr] = list(zip(col['lower'], col['upper'], counts.tolist()))
+        return result
+
+    def cell_facets(self, filters):
+        # 與 facets 相同的結果，條件在規格組合上比對，每個組合以它的 SKU 筆數計
+        matches = {attr: condition_mask(self.cells[attr][0], cond) for attr, cond in filters.items()}
+        result = {}
+        for attr, col in self.columns.items():
+            others = np.ones(len(self.cell_counts), dtype=bool)
+            for other, mask in matches.items():
+                if other != attr:
+                    others &= mask
+            bins = self.cells[attr][1][others]
+            counts = np.bincount(bins + 1, weights=self.cell_counts[others], minlength=len(col['lower']) + 1)[1:]
+            result[attr] = list(zip(col['lower'], col['upper'], counts.astype(np.int64).tolist()))
+        return result
+
+    def memory_mb(self):
+        cells = self.cell_counts.nbytes + sum(values.nbytes + bins.nbytes for values, bins in self.cells.values())
+        return (cells + sum(col['bitmaps'].nbytes + col['order'].nbytes + col['bins'].nbytes
+                            for col in self.columns.values())) / 1024 / 1024
+
+# --- 3. 對照組: pandas 全表掃描 ---
+def scan_mask(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for attr, cond in filters.items():
+        col = df[attr]
+        if isinstance(cond, (list, set, frozenset)):
+            mask &= col.isin(list(cond)).to_numpy()
+        else:
+            low, high = cond if isinstance(cond, tuple) else (cond, cond)
+            if low is not None:
+                mask &= (col >= low).to_numpy()
+            if high is not None:
+                mask &= (col <= high).to_numpy()
+    return mask
+
+def scan_facets(df, filters, index):
+    # 跟 CatalogIndex.facets 相同的定義，用 pandas 逐屬性重新掃描
+    result = {}
+    for attr, col in index.columns.items():
+        mask = scan_mask(df, {k: v for k, v in filters.items() if k != attr})
+        result[attr] = np.bincount(col['bins'][mask] + 1, minlength=len(col['lower']) + 1)[1:].tolist()
+    return result
+
+# --- 4. 效能測試 ---
+def load_catalog(copies=1, path=None):
+    # 跟 Benchmark_Queries 一樣把 SKU 表複製 copies 份 (料號加 -S{k})，分布不變只放大筆數
+    path = path or os.path.join(Schema_Registry.PROCESSED_DIR, 'sku_table_v6.csv')
+    base = Schema_Registry.read_csv(path, shrink_columns=False)
+    if copies <= 1:
+        return base
+    catalog = base.iloc[np.tile(np.arange(len(base)), copies)].reset_index(drop=True)
+    suffix = np.repeat(np.array([''] + [f'-S{k}' for k in range(1, copies)], dtype=object), len(base))
+    catalog['SKU_ID'] = catalog['SKU_ID'].astype(object) + suffix
+    return catalog
+
+def sample_filters(df, rng, n):
+    # GUI 常見的幾種組合，條件值取自隨機一筆 SKU
+    rows = df.iloc[rng.integers(0, len(df), n)]
+    shapes = []
+    for i, (_, row) in enumerate(rows.iterrows()):
+        price = int(row['Price'])
+        shapes.append([
+            {'RAM': row['RAM'], 'StorageCapacity': row['StorageCapacity']},
+            {'Price': (int(price * 0.8), int(price * 1.2))},
+            {'RAM': row['RAM'], 'VRAM': (row['VRAM'], None), 'StorageType': row['StorageType']},
+            {'ScreenSize': [14.0, row['ScreenSize']], 'Weight': (None, row['Weight']), 'Price': (None, price)},
+        ][i % 4])
+    return shapes
+
+def time_each(fn, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='SKU 規格搜尋 bitmap 索引 (篩選 + facet 數量) 效能測試')
+    parser.add_argument('--copies', type=int, nargs='*', default=[1, 250, 1000], help='SKU 表複製幾份 (1000 份約 400 萬筆)')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='隨機篩選條件的組數')
+    parser.add_argument('--max-bins', type=int, default=MAX_BINS, help='Price / Weight 等高基數屬性的分格數')
+    parser.add_argument('--seed', type=int, default=SEED, help='篩選條件的亂數種子')
+    args = parser.parse_args()
+
+    for copies in args.copies:
+        catalog = load_catalog(copies)
+        print("=" * 30)
+        start = time.perf_counter()
+        index = CatalogIndex(catalog, max_bins=args.max_bins)
+        print(f"[{len(catalog):,} 個 SKU] 建立索引 {time.perf_counter() - start:.2f} s，{index.memory_mb():.1f} MB   "
+              + '  '.join(f"{a} {len(c['lower'])}{'' if c['exact'] else ' (分格)'}" for a, c in index.columns.items()))
+        print(f"  規格組合 {len(index.cell_counts):,} 種，facet 使用{'規格組合' if index.use_cells else ' bitmap'}")
+
+        filters = sample_filters(catalog, np.random.default_rng(args.seed), args.repeat)
+        # 驗證: 每組條件的結果與 pandas 全表掃描相同，facet 數量抽前幾組比對
+        for f in filters:
+            expected = catalog['SKU_ID'].to_numpy()[scan_mask(catalog, f)]
+            if not np.array_equal(index.search(f), expected) or not np.array_equal(index.search(f, limit=50), expected[:50]):
+                raise AssertionError(f"篩選結果與 pandas 不一致: {f}")
+        for f in filters[:8]:
+            expected = scan_facets(catalog, f, index)
+            if any([c for _, _, c in index.facets(f)[a]] != expected[a] for a in index.columns):
+                raise AssertionError(f"facet 數量與 pandas 不一致: {f}")
+
+        timings = {
+            'bitmap 筆數': time_each(index.count, filters),
+            'bitmap 前 50 筆': time_each(lambda f: index.search(f, limit=50), filters),
+            'bitmap 全部 SKU_ID': time_each(index.search, filters),
+            'facet 數量': time_each(index.facets, filters),
+            'pandas 掃描': time_each(lambda f: catalog['SKU_ID'].to_numpy()[scan_mask(catalog, f)], filters),
+            'pandas facet 數量': time_each(lambda f: scan_facets(catalog, f, index), filters[:max(1, args.repeat // 10)]),
+        }
+        hits = np.array([index.count(f) for f in filters])
+        print(f"  {len(filters)} 組條件，結果與 pandas 全表掃描一致；符合筆數中位數 {np.median(hits):,.0f}")
+        for label, ms in timings.items():
+            print(f"  {label:<18}: p50 {np.percentile(ms, 50):9.3f} ms   p95 {np.percentile(ms, 95):9.3f} ms")
+
+if __name__ == '__main__':
+    main()
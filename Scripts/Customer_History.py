@@ -0,0 +1,285 @@
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import Schema_Registry
+
+# --- 會員中心: 顧客歷史訂單索引 (CSR) ---
+# 會員中心要列出一位顧客的所有訂單與品項；原本得掃一次 order.csv 再掃一次 order_item.csv。
+# 這裡由處理好的表建一次 CSR 索引 (兩層 offsets):
+#   customer_offsets[c] .. customer_offsets[c + 1]  ->  顧客 c 的訂單 (在訂單陣列裡的位置，依 OrderDate 新到舊)
+#   item_offsets[o] .. item_offsets[o + 1]          ->  訂單位置 o 的品項 (在品項陣列裡的位置，依原檔順序)
+# 每個陣列一個 .npy，查詢時以 mmap 開啟，取一位顧客只讀到他自己的那幾段 → O(歷史筆數)，與總訂單數無關。
+# 建索引時 order_item.csv 讀兩次 (先數每張訂單的品項數、再依 offsets 直接寫進 memmap)，不必整檔放進記憶體。
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_DIR = os.path.join(SCRIPTS_DIR, '..', 'Data', 'Index', 'customer_history')
+CHUNK_ROWS = 2_000_000
+ORDER_ARRAYS = ['order_id', 'order_date', 'address_id', 'payment', 'status']
+ITEM_ARRAYS = ['item_id', 'sku', 'quantity']
+SAMPLE_CUSTOMERS = 1000
+SEED = 42
+
+# --- 1. 建索引 ---
+def source_signature(paths):
+    # 來源檔的大小與修改時間 (索引比來源舊時查詢會提醒重建)
+    return {name: [os.path.getsize(p), os.stat(p).st_mtime_ns] for name, p in sorted(paths.items())}
+
+def read_orders(order_path, chunk_rows=CHUNK_ROWS):
+    """order.csv -> 各欄的 numpy 陣列；付款方式 / 狀態轉成代碼 (名稱另存)。"""
+    parts, payments, statuses = [], [], []
+    reader = pd.read_csv(order_path, encoding='utf-8-sig', chunksize=chunk_rows,
+                         usecols=['Order_ID', 'Customer_ID', 'Address_ID', 'OrderDate', 'PaymentMethod', 'Status'],
+                         dtype={'Order_ID': np.int64, 'Customer_ID': np.int64, 'Address_ID': np.int64, 'OrderDate': str})
+    for orders in reader:
+        # 新出現的名稱接在後面，代碼在各塊之間保持一致
+        for names, column in ((payments, 'PaymentMethod'), (statuses, 'Status')):
+            names.extend(v for v in orders[column].dropna().unique() if v not in names)
+        parts.append({
+            'order_id': orders['Order_ID'].to_numpy(),
+            'customer': orders['Customer_ID'].to_numpy(),
+            'order_date': pd.to_datetime(orders['OrderDate'], format='ISO8601').to_numpy('datetime64[s]').view(np.int64),
+            'address_id': orders['Address_ID'].to_numpy(np.int32),
+            'payment': pd.Categorical(orders['PaymentMethod'], categories=payments).codes.astype(np.int8),
+            'status': pd.Categorical(orders['Status'], categories=statuses).codes.astype(np.int8),
+        })
+    arrays = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+    return arrays, payments, statuses
+
+def item_positions(order_ids, position_of):
+    inside = (order_ids >= 0) & (order_ids < len(position_of))
+    return np.where(inside, position_of[np.where(inside, order_ids, 0)], -1)
+
+def build(paths, index_dir=INDEX_DIR, chunk_rows=CHUNK_ROWS):
+    """建立索引，回傳統計。"""
+    orders, payments, statuses = read_orders(paths['order'], chunk_rows)
+    num_customers = int(orders['customer'].max()) + 1 if len(orders['customer']) else 0
+
+    # 訂單依 (顧客, OrderDate 新到舊, Order_ID) 排序，customer_offsets 由每位顧客的訂單數累加
+    order = np.lexsort((orders['order_id'], -orders['order_date'], orders['customer']))
+    orders = {key: values[order] for key, values in orders.items()}
+    customer_offsets = np.zeros(num_customers + 1, dtype=np.int64)
+    np.cumsum(np.bincount(orders['customer'], minlength=num_customers), out=customer_offsets[1:])
+    position_of = np.full(int(orders['order_id'].max()) + 1 if len(order) else 0, -1, dtype=np.int64)
+    position_of[orders['order_id']] = np.arange(len(order))
+
+    tmp_dir = index_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, 'customer_offsets.npy'), customer_offsets)
+    for key in ORDER_ARRAYS:
+        np.save(os.path.join(tmp_dir, key + '.npy'), orders[key])
+
+    sku_ids = pd.read_csv(paths['sku'], encoding='utf-8-sig', usecols=['SKU_ID'])['SKU_ID']
+    sku_index = pd.Index(sku_ids)
+
+    def read_items(columns):
+        return pd.read_csv(paths['order_item'], encoding='utf-8-sig', usecols=columns, chunksize=chunk_rows,
+                           dtype={'OrderItemID': np.int64, 'OrderID': np.int64, 'SKUID': 'category', 'Quantity': np.int16})
+
+    # 第一次: 每張訂單的品項數 -> item_offsets
+    counts = np.zeros(len(order), dtype=np.int64)
+    stats = {'customers': int((np.diff(customer_offsets) > 0).sum()), 'orders': len(order),
+             'items': 0, 'orphan_items': 0, 'unknown_sku': 0}
+    for items in read_items(['OrderID']):
+        positions = item_positions(items['OrderID'].to_numpy(), position_of)
+        stats['orphan_items'] += int((positions < 0).sum())
+        counts += np.bincount(positions[positions >= 0], minlength=len(counts))
+    item_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(counts, out=item_offsets[1:])
+    np.save(os.path.join(tmp_dir, 'item_offsets.npy'), item_offsets)
+    stats['items'] = int(item_offsets[-1])
+
+    # 第二次: 依 offsets 直接寫進 memmap (同一張訂單的品項維持原檔順序)
+    outputs = {
+        'item_id': np.lib.format.open_memmap(os.path.join(tmp_dir, 'item_id.npy'), 'w+', np.int64, (stats['items'],)),
+        'sku': np.lib.format.open_memmap(os.path.join(tmp_dir, 'sku.npy'), 'w+', np.int32, (stats['items'],)),
+        'quantity': np.lib.format.open_memmap(os.path.join(tmp_dir, 'quantity.npy'), 'w+', np.int16, (stats['items'],)),
+    }
+    cursor = item_offsets[:-1].copy()
+    for items in read_items(['OrderItemID', 'OrderID', 'SKUID', 'Quantity']):
+        positions = item_positions(items['OrderID'].to_numpy(), position_of)
+        keep = positions >= 0
+        positions = positions[keep]
+        # 塊內依訂單位置穩定排序，同一張訂單的第 k 個品項寫到 cursor + k
+        order_in_chunk = np.argsort(positions, kind='stable')
+        sorted_positions = positions[order_in_chunk]
+        first = np.r_[True, sorted_positions[1:] != sorted_positions[:-1]]
+        starts = np.flatnonzero(first)
+        rank = np.arange(len(sorted_positions)) - np.repeat(starts, np.diff(np.r_[starts, len(sorted_positions)]))
+        destination = cursor[sorted_positions] + rank
+        cursor[sorted_positions[first]] += np.diff(np.r_[starts, len(sorted_positions)])
+
+        sku = sku_index.get_indexer(items['SKUID'].cat.categories)[items['SKUID'].cat.codes.to_numpy()][keep]
+        stats['unknown_sku'] += int((sku < 0).sum())
+        outputs['item_id'][destination] = items['OrderItemID'].to_numpy()[keep][order_in_chunk]
+        outputs['sku'][destination] = sku[order_in_chunk]
+        outputs['quantity'][destination] = items['Quantity'].to_numpy()[keep][order_in_chunk]
+    for array in outputs.values():
+        array.flush()
+    del outputs
+
+    meta = {'payments': payments, 'statuses': statuses, 'sku_ids': sku_ids.tolist(),
+            'sources': source_signature(paths), 'stats': stats}
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+    return stats
+
+# --- 2. 查詢 ---
+class CustomerHistory:
+    """以 mmap 開啟索引；history(customer_id) 回傳 (訂單, 品項) 兩個 DataFrame。"""
+
+    def __init__(self, index_dir=INDEX_DIR, mmap=True):
+        with open(os.path.join(index_dir, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        mode = 'r' if mmap else None
+        load = lambda name: np.load(os.path.join(index_dir, name + '.npy'), mmap_mode=mode)
+        self.customer_offsets = load('customer_offsets')
+        self.item_offsets = load('item_offsets')
+        self.orders = {key: load(key) for key in ORDER_ARRAYS}
+        self.items = {key: load(key) for key in ITEM_ARRAYS}
+        self.payments = np.array(self.meta['payments'] + [None], dtype=object)
+        self.statuses = np.array(self.meta['statuses'] + [None], dtype=object)
+        self.sku_ids = np.array(self.meta['sku_ids'] + [None], dtype=object)
+
+    def is_stale(self, paths):
+        return self.meta['sources'] != source_signature(paths)
+
+    def order_range(self, customer_id):
+        if not 0 <= customer_id < len(self.customer_offsets) - 1:
+            return 0, 0
+        return int(self.customer_offsets[customer_id]), int(self.customer_offsets[customer_id + 1])
+
+    def order_count(self, customer_id):
+        start, end = self.order_range(customer_id)
+        return end - start
+
+    def history(self, customer_id):
+        start, end = self.order_range(customer_id)
+        orders = pd.DataFrame({
+            'Order_ID': self.orders['order_id'][start:end],
+            'OrderDate': self.orders['order_date'][start:end].astype('datetime64[s]'),
+            'Address_ID': self.orders['address_id'][start:end],
+            'PaymentMethod': self.payments[self.orders['payment'][start:end]],
+            'Status': self.statuses[self.orders['status'][start:end]],
+        })
+        # 同一位顧客的訂單位置連續，品項也就是 item_offsets[start] .. item_offsets[end] 這一整段
+        item_start, item_end = int(self.item_offsets[start]), int(self.item_offsets[end])
+        per_order = np.diff(self.item_offsets[start:end + 1])
+        items = pd.DataFrame({
+            'OrderItemID': self.items['item_id'][item_start:item_end],
+            'OrderID': np.repeat(orders['Order_ID'].to_numpy(), per_order),
+            'SKUID': self.sku_ids[self.items['sku'][item_start:item_end]],
+            'Quantity': self.items['quantity'][item_start:item_end],
+        })
+        return orders, items
+
+# --- 3. 比對與效能 ---
+def scan_history(order_df, item_df, customer_id):
+    # 對照組: 逐表篩選 (原本的做法)
+    orders = order_df[order_df['Customer_ID'] == customer_id]
+    items = item_df[item_df['OrderID'].isin(orders['Order_ID'])]
+    return orders, items
+
+def same_history(index_result, scan_result):
+    orders, items = index_result
+    scan_orders, scan_items = scan_result
+    scan_orders = scan_orders.sort_values(['OrderDate', 'Order_ID'], ascending=[False, True])
+    if orders['Order_ID'].tolist() != scan_orders['Order_ID'].tolist():
+        return False
+    if orders['Status'].tolist() != scan_orders['Status'].tolist():
+        return False
+    keys = ['OrderItemID', 'OrderID', 'SKUID', 'Quantity']
+    a = items[keys].sort_values('OrderItemID', ignore_index=True).astype(str)
+    b = scan_items[keys].sort_values('OrderItemID', ignore_index=True).astype(str)
+    return a.equals(b)
+
+def percentile_ms(seconds, q):
+    return np.percentile(seconds, q) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='會員中心: 顧客歷史訂單的 CSR 索引 (建立 / 查詢 / 比對)')
+    parser.add_argument('--processed', default=Schema_Registry.PROCESSED_DIR, help='CSV 所在資料夾')
+    parser.add_argument('--index', default=INDEX_DIR, help='索引資料夾')
+    parser.add_argument('--build', action='store_true', help='由 order.csv / order_item.csv 建立索引')
+    parser.add_argument('--customer', type=int, nargs='*', default=None, help='列出這些顧客的歷史訂單')
+    parser.add_argument('--bench', type=int, default=0, help=f'隨機查詢幾位顧客並計時 (例如 {SAMPLE_CUSTOMERS})')
+    parser.add_argument('--verify', type=int, default=0, help='隨機抽幾位顧客與掃描 CSV 的結果比對')
+    parser.add_argument('--seed', type=int, default=SEED)
+    args = parser.parse_args()
+
+    paths = {
+        'order': os.path.join(args.processed, 'order.csv'),
+        'order_item': os.path.join(args.processed, 'order_item.csv'),
+        'sku': os.path.join(args.processed, 'sku_table_v6.csv'),
+    }
+    if args.build:
+        missing = [os.path.basename(p) for p in paths.values() if not os.path.exists(p)]
+        if missing:
+            print("錯誤：找不到 " + '、'.join(missing))
+            sys.exit(1)
+        start = time.perf_counter()
+        stats = build(paths, args.index)
+        size = sum(os.path.getsize(os.path.join(args.index, f)) for f in os.listdir(args.index)) / 1024 / 1024
+        print(f"建立索引: {stats['customers']:,} 位顧客、{stats['orders']:,} 張訂單、{stats['items']:,} 個品項 "
+              f"(找不到訂單: {stats['orphan_items']:,}，不在 SKU 目錄: {stats['unknown_sku']:,})，"
+              f"{time.perf_counter() - start:.1f} s，{size:.1f} MB")
+
+    if not os.path.exists(os.path.join(args.index, 'meta.json')):
+        print(f"錯誤：找不到索引 {args.index}，請先執行 --build")
+        sys.exit(1)
+    start = time.perf_counter()
+    index = CustomerHistory(args.index)
+    print(f"開啟索引 (mmap): {(time.perf_counter() - start) * 1000:.1f} ms")
+    if all(os.path.exists(p) for p in paths.values()) and index.is_stale(paths):
+        print("注意：order / order_item / SKU 檔案在建索引之後有變動，請重新執行 --build")
+
+    for customer_id in args.customer or []:
+        orders, items = index.history(customer_id)
+        print("-" * 30)
+        print(f"顧客 {customer_id}: {len(orders)} 張訂單、{len(items)} 個品項")
+        if len(orders):
+            print(orders.to_string(index=False))
+            print(items.to_string(index=False))
+
+    rng = np.random.default_rng(args.seed)
+    num_customers = len(index.customer_offsets) - 1
+    if args.bench:
+        customers = rng.integers(1, num_customers, args.bench)
+        seconds = []
+        for customer_id in customers:
+            start = time.perf_counter()
+            index.history(int(customer_id))
+            seconds.append(time.perf_counter() - start)
+        sizes = np.diff(index.customer_offsets)[customers]
+        print(f"查詢 {args.bench:,} 位顧客 (平均 {sizes.mean():.1f} 張訂單): p50 {percentile_ms(seconds, 50):.3f} ms，"
+              f"p99 {percentile_ms(seconds, 99):.3f} ms")
+
+    if args.verify:
+        start = time.perf_counter()
+        order_df = pd.read_csv(paths['order'], encoding='utf-8-sig')
+        order_df['OrderDate'] = pd.to_datetime(order_df['OrderDate'], format='ISO8601').dt.floor('s')
+        item_df = pd.read_csv(paths['order_item'], encoding='utf-8-sig')
+        print(f"對照組讀入 CSV: {time.perf_counter() - start:.1f} s")
+        customers = rng.integers(1, num_customers, args.verify)
+        scan_seconds, failed = [], []
+        for customer_id in customers:
+            start = time.perf_counter()
+            expected = scan_history(order_df, item_df, int(customer_id))
+            scan_seconds.append(time.perf_counter() - start)
+            if not same_history(index.history(int(customer_id)), expected):
+                failed.append(int(customer_id))
+        print(f"比對 {args.verify} 位顧客: {'全部一致' if not failed else f'不一致 {failed[:10]}'}；"
+              f"對照組 (已讀入記憶體) 每位 p50 {percentile_ms(scan_seconds, 50):.1f} ms")
+        if failed:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
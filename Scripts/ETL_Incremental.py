@@ -0,0 +1,243 @@
+import pandas as pd
+import numpy as np
+import argparse
+import codecs
+import json
+import os
+import sys
+import time
+
+import ETL_SKU_Table_V6 as etl
+import Schema_Registry
+import Table_Formats
+
+# --- 0. 參數設定 ---
+# 增量 (delta) 模式: 只重新清洗 laptop.csv 裡「新增或有變動」的列，
+# 已存在商品的 ProductID / SKU_ID / Weight / Stock 維持不變，下游資料表不會跟著亂跳。
+# 預設路徑相對於執行目錄 (與其他 ETL 腳本相同，從 Scripts/ 執行)；可用 --output / --state-dir 指定
+OUTPUT_DIR = os.path.dirname(etl.OUTPUT_FILENAME)
+PRODUCT_FILENAME = 'product_table.csv'
+SKU_FILENAME = os.path.basename(etl.OUTPUT_FILENAME)
+
+# 狀態檔放在 Data/State (與 Data/Processed 同層)
+STATE_DIR = '../Data/State'
+MANIFEST_FILENAME = 'sku_manifest.csv'
+STATE_FILENAME = 'etl_state.json'
+
+# 一列原始資料的身分: 同一個 Brand + Name 第幾次出現
+KEY_COLUMNS = ['Brand', 'Name', 'Occurrence']
+SKU_COLUMNS = ['SKU_ID', 'ProductID', 'CPU', 'GPU', 'VRAM', 'RAM', 'StorageType', 'StorageCapacity', 'ScreenSize', 'Weight', 'Price', 'Stock']
+MANIFEST_COLUMNS = KEY_COLUMNS + ['Fingerprint', 'BaseSKU_ID', 'Version'] + SKU_COLUMNS
+MANIFEST_TEXT_COLUMNS = ['Brand', 'Name', 'Fingerprint', 'BaseSKU_ID', 'SKU_ID', 'CPU', 'GPU', 'StorageType']
+INT_COLUMNS = ['Version', 'ProductID', 'VRAM', 'RAM', 'StorageCapacity', 'Price', 'Stock']
+FLOAT_COLUMNS = ['ScreenSize', 'Weight']
+
+# --- 1. 讀取原始資料並計算指紋 ---
+def load_raw(raw_path):
+    text_dtypes = {col: str for col in etl.RAW_COLUMNS if col != 'Price'}
+    raw_df = pd.read_csv(raw_path, encoding=etl.RAW_ENCODING, usecols=etl.RAW_COLUMNS, dtype=text_dtypes)
+    raw_df = raw_df.reset_index(drop=True)
+    raw_df['Occurrence'] = raw_df.groupby(['Brand', 'Name'], dropna=False).cumcount()
+
+    # Fingerprint: 清洗會用到的欄位全部一起雜湊，任何一欄變動都算「有變動」
+    fingerprint = pd.util.hash_pandas_object(raw_df[etl.RAW_COLUMNS], index=False).to_numpy()
+    raw_df['Fingerprint'] = [f'{x:016x}' for x in fingerprint]
+    # RowKey: 只跟身分有關，用來決定這一列的亂數 (價格變動不會讓重量 / 庫存改變)
+    raw_df['RowKey'] = pd.util.hash_pandas_object(raw_df[KEY_COLUMNS], index=False).to_numpy()
+    return raw_df
+
+# --- 2. 狀態檔 ---
+def load_state(state_path, seed):
+    if os.path.exists(state_path):
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f)
+    # 第一次執行: 決定種子並記下來，之後每次增量都用同一個
+    return {'entropy': int(etl.seed_entropy(seed))}
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return pd.DataFrame(columns=MANIFEST_COLUMNS)
+    dtypes = {col: str for col in MANIFEST_TEXT_COLUMNS}
+    return pd.read_csv(manifest_path, dtype=dtypes, keep_default_na=False, na_values=[''])
+
+def seed_manifest(raw_df, sku_path):
+    """
+    第一次執行 (還沒有 manifest) 時，由現有的 sku_table_v6.csv 建立 manifest，現有的 SKU_ID / Weight / Stock 全部沿用
+    (與 product_table.csv 沿用現有 ProductID 相同)。V6 的輸出與 laptop.csv 逐列對應，依列的順序配對，
+    所以前提是 SKU 表是由目前這份 laptop.csv 產生的；列數不同時無法配對，回傳 None。
+    """
+    sku_df = Schema_Registry.read_csv(sku_path, shrink_columns=False)
+    if len(sku_df) != len(raw_df):
+        return None
+    # 料號的 -V{n} 後綴即版本號 (etl.add_sku_suffix_vec)，沒有後綴的是第 1 版
+    suffix = sku_df['SKU_ID'].str.extract(r'^(.*)-V(\d+)$')
+    manifest = raw_df[KEY_COLUMNS + ['Fingerprint']].copy()
+    manifest['BaseSKU_ID'] = suffix[0].fillna(sku_df['SKU_ID']).to_numpy()
+    manifest['Version'] = suffix[1].fillna('1').astype('int64').to_numpy()
+    for col in SKU_COLUMNS:
+        manifest[col] = sku_df[col].to_numpy()
+    return manifest[MANIFEST_COLUMNS]
+
+def save_atomic(df, path, encoding):
+    tmp_path = path + '.tmp'
+    df.to_csv(tmp_path, index=False, encoding=encoding)
+    os.replace(tmp_path, path)
+
+def existing_encoding(path, default='utf-8-sig'):
+    # 覆寫既有檔案時沿用它有沒有 BOM (fin_CSV_BOM 去過 BOM 的檔案不會被加回去)；新檔案用 default
+    if not os.path.exists(path):
+        return default
+    with open(path, 'rb') as f:
+        return 'utf-8-sig' if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else 'utf-8'
+
+# --- 3. Product 表: 舊的 ProductID 不動，新商品接在後面編號 ---
+def update_product_table(raw_df, product_df):
+    candidates = pd.DataFrame({
+        'BrandName': raw_df['Brand'],
+        'ProductName': etl.clean_product_name_vec(raw_df['Name']),
+    }).drop_duplicates()
+
+    if product_df is None:
+        product_df = pd.DataFrame(columns=['ProductID', 'BrandName', 'ProductName', 'Category', 'Status'])
+    known = pd.MultiIndex.from_frame(product_df[['BrandName', 'ProductName']].astype(str))
+    is_new = ~pd.MultiIndex.from_frame(candidates.astype(str)).isin(known)
+    new_products = candidates[is_new].copy()
+
+    next_id = int(product_df['ProductID'].max()) + 1 if len(product_df) else 1
+    new_products.insert(0, 'ProductID', range(next_id, next_id + len(new_products)))
+    new_products['Category'] = 'Laptop'
+    new_products['Status'] = 'Active'
+    return pd.concat([product_df, new_products], ignore_index=True), len(new_products)
+
+# --- 4. SKU 表: 只清洗新增 / 變動的列 ---
+def update_sku_table(raw_df, product_df, manifest_df, entropy):
+    prev = manifest_df.drop_duplicates(subset=KEY_COLUMNS).set_index(KEY_COLUMNS)
+    keys = pd.MultiIndex.from_frame(raw_df[KEY_COLUMNS])
+    matched = keys.isin(prev.index)
+    prev_rows = prev.reindex(keys)
+    prev_rows.index = raw_df.index
+
+    unchanged = matched & (prev_rows['Fingerprint'].to_numpy() == raw_df['Fingerprint'].to_numpy())
+    changed = matched & ~unchanged
+    new = ~matched
+    dirty = np.flatnonzero(changed | new)
+
+    # 只清洗 dirty 的列；亂數依 RowKey 決定，跟這次 delta 有多大無關
+    dirty_raw = raw_df.iloc[dirty].reset_index(drop=True)
+    cleaned = etl.clean_sku_chunk(dirty_raw, product_df, entropy, row_keys=dirty_raw['RowKey'].to_numpy())
+    cleaned.index = dirty[cleaned.index]
+    cleaned['BaseSKU_ID'] = cleaned['SKU_ID']
+    cleaned['Version'] = 1
+
+    # 有變動的列沿用原本的料號
+    is_changed = changed[cleaned.index]
+    if is_changed.any():
+        for col in ['SKU_ID', 'BaseSKU_ID', 'Version']:
+            cleaned.loc[is_changed, col] = prev_rows.loc[cleaned.index[is_changed], col].to_numpy()
+
+    # 新的列: 跟保留下來的料號一起去重，版本號從該料號目前最大的版本往後接
+    kept = prev_rows[matched]
+    sku_counts = kept.groupby('BaseSKU_ID')['Version'].max().astype('int64').to_dict()
+    new_idx = cleaned.index[~is_changed]
+    base = cleaned.loc[new_idx, 'SKU_ID']
+    version = etl.sku_versions(base, sku_counts)
+    cleaned.loc[new_idx, 'Version'] = version.to_numpy()
+    cleaned.loc[new_idx, 'SKU_ID'] = base.where(version <= 1, base + '-V' + version.astype(str)).to_numpy()
+
+    # 沒變動的列整列沿用
+    reused = prev_rows[unchanged][['BaseSKU_ID', 'Version'] + SKU_COLUMNS]
+    sku_rows = pd.concat([reused, cleaned[['BaseSKU_ID', 'Version'] + SKU_COLUMNS]]).sort_index()
+    # reindex 過的舊資料欄位會變成 object / float，寫出前轉回原本的型別
+    sku_rows = sku_rows.astype({**{col: 'int64' for col in INT_COLUMNS}, **{col: 'float64' for col in FLOAT_COLUMNS}})
+
+    manifest = pd.concat([raw_df.loc[sku_rows.index, KEY_COLUMNS + ['Fingerprint']], sku_rows], axis=1)
+    stats = {
+        'unchanged': int(unchanged.sum()),
+        'changed': int(changed.sum()),
+        'new': int(new.sum()),
+        'removed': int(len(prev) - matched.sum()),
+    }
+    return sku_rows[SKU_COLUMNS], manifest[MANIFEST_COLUMNS], stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Product / SKU 表增量 ETL')
+    parser.add_argument('--raw', default=None, help='laptop.csv 路徑 (預設 ../Data/Raw/laptop.csv)')
+    parser.add_argument('--seed', type=int, default=etl.RANDOM_SEED, help='第一次執行時使用的亂數種子 (之後記在狀態檔)')
+    parser.add_argument('--columnar', nargs='*', choices=Table_Formats.COLUMNAR_FORMATS, default=[], help='另外輸出帶型別的 Parquet / Feather')
+    parser.add_argument('--full', action='store_true', help='忽略狀態檔，全部重建 (ProductID 仍沿用現有 product_table.csv)')
+    parser.add_argument('--output', default=OUTPUT_DIR, help='product_table.csv / sku_table_v6.csv 所在資料夾')
+    parser.add_argument('--state-dir', default=STATE_DIR, help='增量狀態檔 (manifest、亂數種子) 所在資料夾')
+    args = parser.parse_args()
+
+    product_path = os.path.join(args.output, PRODUCT_FILENAME)
+    sku_path = os.path.join(args.output, SKU_FILENAME)
+    manifest_path = os.path.join(args.state_dir, MANIFEST_FILENAME)
+    state_path = os.path.join(args.state_dir, STATE_FILENAME)
+    raw_path, _ = etl.input_paths(args.raw, product_path)
+    try:
+        start = time.perf_counter()
+        raw_df = load_raw(raw_path)
+        t_read = time.perf_counter() - start
+    except FileNotFoundError:
+        print("找不到 laptop.csv，請確認檔案位置。")
+        sys.exit(1)
+    except UnicodeDecodeError:
+        print(etl.RAW_ENCODING_HINT)
+        sys.exit(1)
+    print(f"資料讀取成功。原始筆數: {len(raw_df)} (讀取 + 指紋 {t_read:.2f} 秒)")
+
+    os.makedirs(args.state_dir, exist_ok=True)
+    os.makedirs(args.output, exist_ok=True)
+    product_df = Schema_Registry.read_csv(product_path, shrink_columns=False) if os.path.exists(product_path) else None
+    if args.full:
+        if os.path.exists(sku_path):
+            print("注意: --full 會重新產生所有料號，現有的 SKU_ID / Weight / Stock 會改變。")
+        state, manifest_df = {'entropy': int(etl.seed_entropy(args.seed))}, pd.DataFrame(columns=MANIFEST_COLUMNS)
+    else:
+        state, manifest_df = load_state(state_path, args.seed), load_manifest(manifest_path)
+        if not os.path.exists(manifest_path) and os.path.exists(sku_path):
+            # 第一次執行: 沿用現有的 SKU 表，而不是全部重新清洗 (那樣料號會整批改變)
+            manifest_df = seed_manifest(raw_df, sku_path)
+            if manifest_df is None:
+                print(f"錯誤：沒有增量狀態檔 ({manifest_path})，且 {sku_path} 與 laptop.csv 的列數不同，無法沿用現有料號。")
+                print("確定要全部重建 (SKU_ID / Weight / Stock 會改變) 請加上 --full。")
+                sys.exit(1)
+            print(f"第一次執行: 由現有的 {sku_path} 建立增量狀態 ({len(manifest_df)} 筆)")
+
+    product_df, new_products = update_product_table(raw_df, product_df)
+
+    start = time.perf_counter()
+    sku_df, manifest, stats = update_sku_table(raw_df, product_df, manifest_df, state['entropy'])
+    t_clean = time.perf_counter() - start
+
+    # 沒有任何變動的表不重寫: 檔案內容、修改時間都不變，下游 (Stage_Cache、fin_CSV_BOM) 也不必重跑
+    product_dirty = new_products > 0 or not os.path.exists(product_path)
+    sku_dirty = stats['changed'] + stats['new'] + stats['removed'] > 0 or not os.path.exists(sku_path)
+    written = []
+    if product_dirty:
+        product_df = Schema_Registry.cast(product_df, 'product_table')
+        save_atomic(product_df, product_path, existing_encoding(product_path))
+        Table_Formats.write_columnar(product_df, product_path, args.columnar)
+        written.append(product_path)
+    if sku_dirty:
+        sku_df = Schema_Registry.cast(sku_df, 'sku_table_v6')
+        save_atomic(sku_df, sku_path, existing_encoding(sku_path))
+        Table_Formats.write_columnar(sku_df, sku_path, args.columnar)
+        written.append(sku_path)
+    if sku_dirty or not os.path.exists(manifest_path):
+        save_atomic(manifest, manifest_path, 'utf-8')
+    if not os.path.exists(state_path) or args.full:
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+    print("-" * 30)
+    print(f"Product: 新增 {new_products} 筆，共 {len(product_df)} 筆")
+    print(f"SKU:     沿用 {stats['unchanged']} 筆 / 變動 {stats['changed']} 筆 / 新增 {stats['new']} 筆 / 移除 {stats['removed']} 筆")
+    print(f"只重新清洗 {stats['changed'] + stats['new']} 筆，耗時 {t_clean:.2f} 秒")
+    if written:
+        print(f"處理完成！檔案已存為 {'、'.join(written)}")
+    else:
+        print("沒有任何變動，輸出檔案維持不變。")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import pandas as pd
+import os
+import sys
+import argparse
+
+import Schema_Registry
+import Table_Formats
+
+parser = argparse.ArgumentParser(description='Product Table ETL')
+parser.add_argument('--columnar', nargs='*', choices=Table_Formats.COLUMNAR_FORMATS, default=[], help='另外輸出帶型別的 Parquet / Feather')
+args = parser.parse_args()
+
+# 1. 讀取原始資料
+# 假設腳本在 Scripts/，資料在 ../Data/
+if os.path.exists('../Data/Raw/laptop.csv'):
+    raw_path = '../Data/Raw/laptop.csv'
+else:
+    # Fallback
+    raw_path = 'laptop.csv'
+
+try:
+    # laptop.csv 一律是 UTF-8；其他編碼的舊檔先用 fin_CSV_BOM.py --source-encoding latin-1 轉一次
+    df = pd.read_csv(raw_path, encoding='utf-8')
+    print(f"成功讀取原始資料，共 {len(df)} 筆。")
+except FileNotFoundError:
+    print("錯誤：找不到 laptop.csv，請確認檔案位置。")
+    sys.exit(1)
+except UnicodeDecodeError:
+    print("錯誤：laptop.csv 不是 UTF-8，請先執行 python fin_CSV_BOM.py <laptop.csv> --in-place --source-encoding latin-1 轉換。")
+    sys.exit(1)
+
+# 2. 定義清理名稱的函式
+def clean_product_name(raw_name):
+    # 邏輯：找到第一個 '('，只取前面的部分，並移除前後空白
+    if '(' in raw_name:
+        return raw_name.split('(')[0].strip()
+    return raw_name.strip()
+
+# 3. 建立 Product 表格的資料
+product_df = df[['Brand', 'Name']].copy()
+product_df['ProductName'] = product_df['Name'].apply(clean_product_name)
+product_df = product_df.drop(columns=['Name'])
+product_df = product_df.rename(columns={'Brand': 'BrandName'})
+
+# 4. 去除重複 (De-duplicate)
+# 同一個商品系列可能有不同規格的多筆資料，只保留 "BrandName" 和 "ProductName" 都相同的第一筆
+product_df = product_df.drop_duplicates(subset=['BrandName', 'ProductName'])
+
+# 5. 生成 ProductID (Surrogate Key)，從 1 開始編號
+product_df.insert(0, 'ProductID', range(1, 1 + len(product_df)))
+
+# 6. 補上其他固定欄位
+product_df['Category'] = 'Laptop'
+product_df['Status'] = 'Active'
+
+# 7. 輸出成 CSV
+print("-" * 30)
+print(f"總共生成 {len(product_df)} 筆唯一的商品資料。")
+
+output_filename = '../Data/Processed/product_table.csv'
+product_df = Schema_Registry.cast(product_df, 'product_table')
+product_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+written = Table_Formats.write_columnar(product_df, output_filename, args.columnar)
+print(f"檔案已儲存為：{', '.join([output_filename] + written)}")
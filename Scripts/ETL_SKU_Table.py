@@ -2,10 +2,12 @@ import pandas as pd
 import numpy as np
 import re
 
+from Parse_Cache import ParseCache
+
 # --- 1. 讀取資料 ---
 try:
     # 原始資料
-    raw_df = pd.read_csv('laptop.csv', encoding='latin-1')
+    raw_df = pd.read_csv('laptop.csv', encoding='utf-8')
     # 剛剛產生的 Product 表 (為了拿 ProductID)
     product_df = pd.read_csv('product_table.csv') 
     print("成功讀取原始資料與 Product 表。")
@@ -83,9 +85,11 @@ if missing_ids > 0:
     merged_df = merged_df.dropna(subset=['ProductID'])
 
 # C. 清洗各個欄位
-merged_df['RAM'] = merged_df['RAM'].apply(clean_ram)
-merged_df['Storage'] = merged_df.apply(clean_storage, axis=1)
-merged_df['ScreenSize'] = merged_df['Display'].apply(clean_screen)
+# 規格欄位每種寫法只解析一次 (結果存在 Data/.cache，下次執行直接查表)
+parse_cache = ParseCache()
+merged_df['RAM'] = parse_cache.parse(merged_df['RAM'], clean_ram)
+merged_df['Storage'] = parse_cache.parse(merged_df[['SSD', 'HDD']], clean_storage)
+merged_df['ScreenSize'] = parse_cache.parse(merged_df['Display'], clean_screen)
 merged_df['Price'] = merged_df['Price'].apply(clean_price)
 
 # D. 生成 SKU_ID (PK)
@@ -126,4 +130,6 @@ print(f"總共生成 {len(final_sku_df)} 筆 SKU 資料。")
 
 output_filename = 'sku_table.csv'
 final_sku_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+parse_cache.save()
+parse_cache.report()
 print(f"檔案已儲存為：{output_filename}")
\ No newline at end of file
@@ -4,10 +4,12 @@ import re
 import random
 import string
 
+from Parse_Cache import ParseCache
+
 # --- 1. 讀取資料 ---
 try:
     # 假設 product_table.csv 已經存在
-    raw_df = pd.read_csv('laptop.csv', encoding='latin-1')
+    raw_df = pd.read_csv('laptop.csv', encoding='utf-8')
     product_df = pd.read_csv('product_table.csv') 
     print(f"資料讀取成功。處理筆數: {len(raw_df)}")
 except FileNotFoundError:
@@ -132,9 +134,11 @@ merged_df = pd.merge(
 merged_df = merged_df.dropna(subset=['ProductID'])
 
 # B. 清洗與生成
-merged_df['RAM'] = merged_df['RAM'].apply(clean_ram)
-merged_df['Storage'] = merged_df.apply(clean_storage, axis=1)
-merged_df['ScreenSize'] = merged_df['Display'].apply(clean_screen)
+# 規格欄位每種寫法只解析一次 (結果存在 Data/.cache，下次執行直接查表)
+parse_cache = ParseCache()
+merged_df['RAM'] = parse_cache.parse(merged_df['RAM'], clean_ram)
+merged_df['Storage'] = parse_cache.parse(merged_df[['SSD', 'HDD']], clean_storage)
+merged_df['ScreenSize'] = parse_cache.parse(merged_df['Display'], clean_screen)
 merged_df['Price'] = merged_df['Price'].apply(clean_price)
 merged_df['Weight'] = merged_df.apply(get_hybrid_weight, axis=1) # 套用混合式重量
 merged_df['SKU_ID'] = merged_df.apply(extract_real_sku_id, axis=1) # 套用真實料號
@@ -157,6 +161,8 @@ final_sku_df = merged_df[[
 
 output_filename = 'sku_table_v3.csv'
 final_sku_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+parse_cache.save()
+parse_cache.report()
 
 print("-" * 30)
 print(f"處理完成！檔案已存為 {output_filename}")
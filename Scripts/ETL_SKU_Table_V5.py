@@ -5,14 +5,16 @@ import random
 import string
 import os
 
+from Parse_Cache import ParseCache
+
 # --- 1. 讀取資料 ---
 try:
     # 調整路徑以符合專案結構 (假設從專案根目錄執行)
     if os.path.exists('laptop.csv'):
-        raw_df = pd.read_csv('laptop.csv', encoding='latin-1')
+        raw_df = pd.read_csv('laptop.csv', encoding='utf-8')
     else:
         # Fallback if inside Scripts dir
-        raw_df = pd.read_csv('../laptop.csv', encoding='latin-1')
+        raw_df = pd.read_csv('../laptop.csv', encoding='utf-8')
 
     if os.path.exists('Ready_to_Use_Data/product_table.csv'):
         product_df = pd.read_csv('Ready_to_Use_Data/product_table.csv')
@@ -198,16 +200,18 @@ merged_df = pd.merge(
 merged_df = merged_df.dropna(subset=['ProductID'])
 
 # B. 清洗與生成
-merged_df['RAM'] = merged_df['RAM'].apply(clean_ram)
-merged_df['Storage'] = merged_df.apply(clean_storage, axis=1)
-merged_df['ScreenSize'] = merged_df['Display'].apply(clean_screen)
+# 規格欄位每種寫法只解析一次 (結果存在 Data/.cache，下次執行直接查表)
+parse_cache = ParseCache()
+merged_df['RAM'] = parse_cache.parse(merged_df['RAM'], clean_ram)
+merged_df['Storage'] = parse_cache.parse(merged_df[['SSD', 'HDD']], clean_storage)
+merged_df['ScreenSize'] = parse_cache.parse(merged_df['Display'], clean_screen)
 merged_df['Price'] = merged_df['Price'].apply(clean_price)
 merged_df['Weight'] = merged_df.apply(get_hybrid_weight, axis=1)
 merged_df['SKU_ID'] = merged_df.apply(extract_real_sku_id, axis=1)
 
 # --- 新增欄位 ---
-merged_df['VRAM'] = merged_df['GPU'].apply(extract_vram)
-merged_df['StorageCapacity'] = merged_df.apply(calculate_total_storage, axis=1)
+merged_df['VRAM'] = parse_cache.parse(merged_df['GPU'], extract_vram)
+merged_df['StorageCapacity'] = parse_cache.parse(merged_df[['SSD', 'HDD']], calculate_total_storage)
 
 # C. 處理 SKU_ID 重複
 merged_df['SKU_ID_Count'] = merged_df.groupby('SKU_ID').cumcount() + 1
@@ -230,6 +234,8 @@ final_sku_df = merged_df[output_columns].rename(columns={'Processor_Name': 'CPU'
 
 output_filename = 'sku_table_v5.csv'
 final_sku_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+parse_cache.save()
+parse_cache.report()
 
 print("-" * 30)
 print(f"處理完成！檔案已存為 {output_filename}")
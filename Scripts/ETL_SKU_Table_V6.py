@@ -4,27 +4,62 @@ import re
 import random
 import string
 import os
+import sys
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import Parse_Cache
+import Schema_Registry
+import Table_Formats
+
+# --- 0. 參數設定 ---
+# 清洗模式:
+#   'row'        : 原本的逐列 apply 寫法 (保留作為對照組)
+#   'vectorized' : 整欄運算 (str.extract + 遮罩運算)，清洗欄位與 'row' 完全相同；
+#                  Weight / Stock / 料號隨機碼改由種子化的 NumPy Generator 產生
+CLEAN_MODE = 'vectorized'
+
+# 向量化模式的 Weight / Stock / 料號隨機碼都由這個種子產生 (None = 每次不同)
+RANDOM_SEED = None
+
+# 串流模式: 每次只讀入這麼多列原始資料，記憶體用量與輸入大小無關
+CHUNK_SIZE = 100_000
+
+OUTPUT_FILENAME = '../Data/Processed/sku_table_v6.csv'
+
+# laptop.csv 的編碼。原始檔是 UTF-8 (目前內容全是 ASCII)；其他編碼的舊檔先用 fin_CSV_BOM.py 轉一次
+RAW_ENCODING = 'utf-8'
+RAW_ENCODING_HINT = "錯誤：laptop.csv 不是 UTF-8，請先執行 python fin_CSV_BOM.py <laptop.csv> --in-place --source-encoding latin-1 轉換。"
+
+# 清洗時實際會用到的原始欄位 (串流模式只讀這些欄位)
+RAW_COLUMNS = ['Brand', 'Name', 'Price', 'Processor_Name', 'RAM', 'Display', 'GPU', 'SSD', 'HDD']
 
 # --- 1. 讀取資料 ---
-try:
+def input_paths(raw_path=None, product_path=None):
     # 調整路徑以符合新的資料夾結構
     # 假設腳本在 Scripts/，資料在 ../Data/
-    if os.path.exists('../Data/Raw/laptop.csv'):
-        raw_df = pd.read_csv('../Data/Raw/laptop.csv', encoding='latin-1')
-    else:
-        # Fallback
-        raw_df = pd.read_csv('laptop.csv', encoding='latin-1')
+    if raw_path is None:
+        if os.path.exists('../Data/Raw/laptop.csv'):
+            raw_path = '../Data/Raw/laptop.csv'
+        else:
+            # Fallback
+            raw_path = 'laptop.csv'
 
-    if os.path.exists('../Data/Processed/product_table.csv'):
-        product_df = pd.read_csv('../Data/Processed/product_table.csv')
-    else:
-        # Fallback
-        product_df = pd.read_csv('product_table.csv')
-        
-    print(f"資料讀取成功。處理筆數: {len(raw_df)}")
-except FileNotFoundError:
-    print("找不到檔案，請確認 laptop.csv 與 product_table.csv 的位置。")
-    exit()
+    if product_path is None:
+        if os.path.exists('../Data/Processed/product_table.csv'):
+            product_path = '../Data/Processed/product_table.csv'
+        else:
+            # Fallback
+            product_path = 'product_table.csv'
+
+    return raw_path, product_path
+
+def load_inputs(raw_path=None, product_path=None):
+    raw_path, product_path = input_paths(raw_path, product_path)
+    raw_df = pd.read_csv(raw_path, encoding=RAW_ENCODING)
+    product_df = Schema_Registry.read_csv(product_path, shrink_columns=False)
+    return raw_df, product_df
 
 # --- 2. 真實重量查找表 ---
 REAL_WEIGHT_MAP = {
@@ -80,11 +115,11 @@ def calculate_total_storage(row):
 def get_storage_type(row):
     ssd = str(row['SSD']).strip()
     hdd = str(row['HDD']).strip()
-    
+
     # Case insensitive check for "No" or "NO"
     has_ssd = 'NO' not in ssd.upper() and ssd != 'nan'
     has_hdd = 'NO' not in hdd.upper() and hdd != 'nan'
-    
+
     if has_ssd and has_hdd:
         return "SSD + HDD"
     elif has_ssd:
@@ -122,37 +157,432 @@ def get_hybrid_weight(row):
     if is_gaming: base_min += 0.4; base_max += 0.8
     return round(np.random.uniform(base_min, base_max), 2)
 
+# --- 3b. 向量化清洗函式 (整欄運算) ---
+# 每個函式都對應上面一個逐列版本，語意必須完全一致。
+# 常見格式走 str.extract / 遮罩運算；極少數不符合快速路徑的值，
+# 才退回原本的逐列函式處理 (只處理那幾筆)，確保輸出一模一樣。
+
+def _as_str(series):
+    # 等同逐列版本的 str(x)：NaN 會變成 'nan'
+    return series.astype(object).where(series.notna(), 'nan').astype(str)
+
+def _first_int(extracted, default):
+    # extracted 為 str.extract 的結果 (找不到為 NaN)；非 ASCII 數字交給 int() 處理
+    values = pd.to_numeric(extracted, errors='coerce')
+    leftover = extracted.notna() & values.isna()
+    if leftover.any():
+        values[leftover] = extracted[leftover].map(int)
+    return values.fillna(default).astype('int64')
+
+def clean_product_name_vec(names):
+    return _as_str(names).str.split('(', n=1).str[0].str.strip()
+
+def clean_ram_vec(ram):
+    # NaN 轉成 'nan' 後找不到數字，一樣會落到預設值 8
+    return _first_int(_as_str(ram).str.extract(r'(\d+)', expand=False), 8)
+
+def clean_screen_vec(display):
+    text = _as_str(display)
+    # 快速路徑: 第一個 token 是一般的小數 (例如 '15.6 ')
+    token = text.str.extract(r'^\s*([+-]?(?:\d+\.?\d*|\.\d+))(?:\s|$)', expand=False)
+    matched = token.notna()
+    result = pd.Series(15.6, index=display.index, dtype='float64')
+    result[matched] = np.asarray(token[matched], dtype=str).astype(np.float64)
+    # 其餘 (例如 'OLED Display With Touchscreen') 交給原本的函式
+    if (~matched).any():
+        result[~matched] = text[~matched].map(clean_screen).astype('float64')
+    return result
+
+def clean_price_vec(price):
+    if pd.api.types.is_integer_dtype(price):
+        return price.fillna(0).astype('int64')
+    if pd.api.types.is_float_dtype(price):
+        # int() 會無條件捨去；NaN / inf 會丟例外 -> 0
+        values = price.to_numpy(dtype='float64')
+        values = np.where(np.isfinite(values), values, 0)
+        return pd.Series(np.trunc(values).astype('int64'), index=price.index)
+    # 字串欄位: 純整數字串直接轉換，其餘交給原本的函式
+    text = _as_str(price)
+    int_like = text.str.fullmatch(r'\s*[+-]?[0-9]+\s*')
+    result = pd.Series(0, index=price.index, dtype='int64')
+    result[int_like] = pd.to_numeric(text[int_like].str.strip()).astype('int64')
+    rest = ~int_like & price.notna()
+    if rest.any():
+        result[rest] = price[rest].map(clean_price).astype('int64')
+    return result
+
+def extract_vram_vec(gpu):
+    text = _as_str(gpu).str.strip()
+    return _first_int(text.str.extract(r'(\d+)\s*GB', flags=re.IGNORECASE, expand=False), 0)
+
+def parse_storage_capacity_vec(size):
+    upper = _as_str(size).str.upper()
+    digits = _first_int(upper.str.extract(r'(\d+)', expand=False), 0)
+    has_tb = upper.str.contains('TB', regex=False)
+    has_gb = upper.str.contains('GB', regex=False)
+    return pd.Series(np.where(has_tb, digits * 1024, np.where(has_gb, digits, 0)), index=size.index)
+
+def calculate_total_storage_vec(df):
+    total = pd.Series(0, index=df.index, dtype='int64')
+    for col in ['SSD', 'HDD']:
+        text = _as_str(df[col])
+        present = ~text.str.contains('No', regex=False) & (text != 'nan')
+        total += parse_storage_capacity_vec(df[col]).where(present, 0)
+    return total.where(total > 0, 256)
+
+def get_storage_type_vec(df):
+    ssd = _as_str(df['SSD']).str.strip()
+    hdd = _as_str(df['HDD']).str.strip()
+    has_ssd = ~ssd.str.upper().str.contains('NO', regex=False) & (ssd != 'nan')
+    has_hdd = ~hdd.str.upper().str.contains('NO', regex=False) & (hdd != 'nan')
+    storage_type = np.select([has_ssd & has_hdd, has_ssd, has_hdd], ["SSD + HDD", "SSD", "HDD"], default="SSD")
+    return pd.Series(storage_type, index=df.index)
+
+def sku_versions(sku_ids, sku_counts=None):
+    # 每列是同一個料號的第幾次出現 (等同 groupby('SKU_ID').cumcount() + 1)
+    # sku_counts: 之前已出現過的 SKU_ID 次數 (跨 chunk / 增量去重用，會就地更新)
+    count = sku_ids.groupby(sku_ids).cumcount() + 1
+    if sku_counts is not None:
+        count += sku_ids.map(sku_counts).fillna(0).astype('int64')
+        chunk_counts = sku_ids.value_counts()
+        for sku_id, n in zip(chunk_counts.index, chunk_counts.to_numpy()):
+            sku_counts[sku_id] = sku_counts.get(sku_id, 0) + int(n)
+    return count
+
+def add_sku_suffix_vec(sku_ids, sku_counts=None):
+    # 等同逐列補上 -V{n}
+    count = sku_versions(sku_ids, sku_counts)
+    return sku_ids.where(count <= 1, sku_ids + '-V' + count.astype(str))
+
+# --- 3c. 批次重量模型 (取代逐列 get_hybrid_weight) ---
+# 先用一個合併所有 key 的 regex 一次篩出「有命中任何系列」的列，
+# 再只對這些列依 dict 順序決定是哪個系列 (跟逐列版本的 for 迴圈優先順序相同)。
+_WEIGHT_KEYS = list(REAL_WEIGHT_MAP.keys())
+_WEIGHT_VALUES = np.array(list(REAL_WEIGHT_MAP.values()))
+_WEIGHT_PATTERN = '|'.join(re.escape(key) for key in _WEIGHT_KEYS)
+
+# 螢幕尺寸分級: <12, 12~14, 14~15, 15~16, >=16 (NaN 跟逐列版本一樣落在最後一級)
+SCREEN_EDGES = np.array([12.0, 14.0, 15.0, 16.0])
+BASE_MIN = np.array([1.05, 1.15, 1.30, 1.60, 2.00])
+BASE_MAX = np.array([1.30, 1.45, 1.65, 1.95, 2.50])
+
+def match_weight_family(names):
+    # 回傳每列命中的系列編號 (對應 _WEIGHT_KEYS)，沒命中為 -1
+    name_upper = _as_str(names).str.upper()
+    family = np.full(len(name_upper), -1)
+    hit = name_upper.str.contains(_WEIGHT_PATTERN).to_numpy()
+    pending = np.flatnonzero(hit)
+    for i, key in enumerate(_WEIGHT_KEYS):
+        if len(pending) == 0: break
+        found = name_upper.iloc[pending].str.contains(key, regex=False).to_numpy()
+        family[pending[found]] = i
+        pending = pending[~found]
+    return family
+
+def get_hybrid_weight_vec(df, u):
+    # u: 每列一個 [0, 1) 的均勻亂數 (由呼叫端一次抽好)
+    family = match_weight_family(df['Name'])
+    matched = family >= 0
+
+    screen = df['ScreenSize'].to_numpy(dtype='float64')
+    bucket = np.searchsorted(SCREEN_EDGES, screen, side='right')
+    is_gaming = _as_str(df['GPU']).str.upper().str.contains('RTX|GTX|DEDICATED').to_numpy()
+    base_min = BASE_MIN[bucket] + np.where(is_gaming, 0.4, 0.0)
+    base_max = BASE_MAX[bucket] + np.where(is_gaming, 0.8, 0.0)
+
+    # 同一組亂數轉成: 查表的 +-0.05kg，或估算區間內的均勻分佈
+    looked_up = _WEIGHT_VALUES[np.where(matched, family, 0)] + (-0.05 + 0.1 * u)
+    estimated = base_min + (base_max - base_min) * u
+    return pd.Series(np.round(np.where(matched, looked_up, estimated), 2), index=df.index)
+
+# --- 3d. 依列號產生的亂數 (Weight / Stock / 料號隨機碼) ---
+# 原始資料每 RNG_BLOCK 列為一個區塊，每個區塊有自己的亂數串流 (由同一個種子衍生)。
+# 某一列拿到的亂數只跟「種子 + 它在 laptop.csv 的列號」有關，
+# 所以一次處理、串流分批、多行程平行處理，只要種子相同，輸出就完全相同。
+RNG_BLOCK = 65_536
+SKU_ALPHABET = np.array(list(string.ascii_uppercase + string.digits))
+
+def seed_entropy(seed=RANDOM_SEED):
+    # seed=None 時隨機產生一次，之後整個執行過程 (含子行程) 共用
+    return np.random.SeedSequence(seed).entropy
+
+def row_random(entropy, row_no):
+    """回傳 (重量雜訊 u, 庫存, 料號隨機碼) 三組陣列，順序對應 row_no。"""
+    row_no = np.asarray(row_no, dtype='int64')
+    u = np.empty(len(row_no))
+    stock = np.empty(len(row_no), dtype='int64')
+    suffix = np.empty((len(row_no), 5), dtype='int64')
+    block = row_no // RNG_BLOCK
+    for b in np.unique(block):
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(int(b),)))
+        block_u = rng.random(RNG_BLOCK)
+        block_stock = rng.integers(1, 51, size=RNG_BLOCK)
+        block_suffix = rng.integers(0, len(SKU_ALPHABET), size=(RNG_BLOCK, 5))
+        rows = np.flatnonzero(block == b)
+        offset = row_no[rows] - b * RNG_BLOCK
+        u[rows] = block_u[offset]
+        stock[rows] = block_stock[offset]
+        suffix[rows] = block_suffix[offset]
+    return u, stock, suffix
+
+def _splitmix64(x):
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def keyed_random(entropy, row_keys):
+    """
+    跟 row_random 回傳同樣的三組陣列，但亂數由每列自己的 key (uint64) 決定，
+    與列號無關。增量模式用它讓同一筆商品每次執行都拿到相同的亂數。
+    """
+    base = np.random.SeedSequence(entropy).generate_state(1, np.uint64)[0]
+    keys = np.asarray(row_keys, dtype=np.uint64) ^ base
+    # 7 條獨立串流: 重量雜訊、庫存、5 碼隨機碼
+    streams = _splitmix64(keys[:, None] + np.arange(7, dtype=np.uint64) * np.uint64(0xD1B54A32D192ED03))
+    u = (streams[:, 0] >> np.uint64(11)).astype('float64') * (1.0 / (1 << 53))
+    stock = (streams[:, 1] % np.uint64(50)).astype('int64') + 1
+    suffix = (streams[:, 2:] % np.uint64(len(SKU_ALPHABET))).astype('int64')
+    return u, stock, suffix
+
+# --- 3e. 向量化料號提取 (對應 extract_real_sku_id) ---
+def extract_real_sku_id_vec(df, suffix_codes):
+    candidate = _as_str(df['Name']).str.extract(r'\(([\w\d\-]+)\)', expand=False)
+    has_digit = candidate.str.contains('[0-9]')
+    # 非 ASCII 的候選字串交給 str.isdigit()，跟逐列版本的 any(c.isdigit()) 一致
+    non_ascii = candidate.notna() & ~candidate.fillna('').str.isascii()
+    if non_ascii.any():
+        has_digit[non_ascii] = candidate[non_ascii].map(lambda c: any(ch.isdigit() for ch in c))
+    valid = (candidate.str.len() > 4) & has_digit & ~candidate.str.contains('Inch', regex=False)
+    valid = valid.fillna(False).astype(bool)
+
+    brand = _as_str(df['Brand']).str.upper().str[:3]
+    random_code = SKU_ALPHABET[suffix_codes].view('<U5').ravel() if len(df) else np.array([], dtype='<U5')
+    generated = brand + '-' + pd.Series(random_code, index=df.index)
+    return candidate.str.upper().where(valid, generated)
+
 # --- 4. 執行 ETL ---
-sku_df = raw_df.copy()
-sku_df['TempName'] = sku_df['Name'].apply(clean_product_name)
-merged_df = pd.merge(sku_df, product_df[['ProductID', 'BrandName', 'ProductName']], left_on=['Brand', 'TempName'], right_on=['BrandName', 'ProductName'], how='left')
-merged_df = merged_df.dropna(subset=['ProductID'])
-
-merged_df['RAM'] = merged_df['RAM'].apply(clean_ram)
-merged_df['ScreenSize'] = merged_df['Display'].apply(clean_screen)
-merged_df['Price'] = merged_df['Price'].apply(clean_price)
-merged_df['Weight'] = merged_df.apply(get_hybrid_weight, axis=1)
-merged_df['SKU_ID'] = merged_df.apply(extract_real_sku_id, axis=1)
-merged_df['VRAM'] = merged_df['GPU'].apply(extract_vram)
-merged_df['StorageCapacity'] = merged_df.apply(calculate_total_storage, axis=1)
-merged_df['StorageType'] = merged_df.apply(get_storage_type, axis=1) # New Logic
-
-merged_df['SKU_ID_Count'] = merged_df.groupby('SKU_ID').cumcount() + 1
-merged_df['SKU_ID'] = merged_df.apply(lambda x: f"{x['SKU_ID']}-V{x['SKU_ID_Count']}" if x['SKU_ID_Count'] > 1 else x['SKU_ID'], axis=1)
-merged_df['Stock'] = np.random.randint(1, 51, size=len(merged_df))
+# RAM / Display / GPU / SSD+HDD 的寫法只有幾百種；給了 cache (Parse_Cache.ParseCache) 時每種值只解析一次
+def parse_spec(cache, data, func, batch=True):
+    if cache is None:
+        return func(data) if batch else (data.map(func) if isinstance(data, pd.Series) else data.apply(func, axis=1))
+    return cache.parse(data, func, batch=batch)
 
 output_columns = [
-    'SKU_ID', 'ProductID', 'Processor_Name', 'GPU', 'VRAM', 
+    'SKU_ID', 'ProductID', 'Processor_Name', 'GPU', 'VRAM',
     'RAM', 'StorageType', 'StorageCapacity', # Removed Storage, added StorageType
     'ScreenSize', 'Weight', 'Price', 'Stock'
 ]
 
-final_sku_df = merged_df[output_columns].rename(columns={'Processor_Name': 'CPU'})
+def clean_sku_chunk(raw_df, product_df, entropy, row_offset=0, row_keys=None, cache=None):
+    """
+    向量化清洗一段原始資料 (raw_df 為 laptop.csv 第 row_offset 列開始的連續片段)。
+    回傳的 SKU_ID 尚未去重，由 add_sku_suffix_vec 統一處理；index 為原始列號。
+    row_keys: 若有給 (每列一個 uint64)，亂數改由 key 決定 (見 keyed_random)。
+    cache: 若有給，規格欄位改成每種值只解析一次 (結果相同)。
+    """
+    # 只帶需要的欄位進 merge，避免整份原始資料被複製兩次
+    sku_df = raw_df[RAW_COLUMNS].assign(
+        TempName=clean_product_name_vec(raw_df['Name']),
+        RowNo=np.arange(row_offset, row_offset + len(raw_df)),
+    )
+    merged_df = pd.merge(sku_df, product_df[['ProductID', 'BrandName', 'ProductName']], left_on=['Brand', 'TempName'], right_on=['BrandName', 'ProductName'], how='left')
+    merged_df = merged_df.dropna(subset=['ProductID'])
+    # left join 有對應失敗時 ProductID 會變成 float，這裡轉回 INT (對應 Schema)
+    merged_df['ProductID'] = merged_df['ProductID'].astype('int64')
+
+    row_no = merged_df['RowNo'].to_numpy()
+    if row_keys is None:
+        u, stock, suffix_codes = row_random(entropy, row_no)
+    else:
+        u, stock, suffix_codes = keyed_random(entropy, np.asarray(row_keys)[row_no - row_offset])
+    merged_df['RAM'] = parse_spec(cache, merged_df['RAM'], clean_ram_vec)
+    merged_df['ScreenSize'] = parse_spec(cache, merged_df['Display'], clean_screen_vec)
+    merged_df['Price'] = clean_price_vec(merged_df['Price'])
+    merged_df['Weight'] = get_hybrid_weight_vec(merged_df, u)
+    merged_df['SKU_ID'] = extract_real_sku_id_vec(merged_df, suffix_codes)
+    merged_df['VRAM'] = parse_spec(cache, merged_df['GPU'], extract_vram_vec)
+    merged_df['StorageCapacity'] = parse_spec(cache, merged_df[['SSD', 'HDD']], calculate_total_storage_vec)
+    merged_df['StorageType'] = parse_spec(cache, merged_df[['SSD', 'HDD']], get_storage_type_vec)
+    merged_df['Stock'] = stock
+
+    sku_df = merged_df[output_columns].rename(columns={'Processor_Name': 'CPU'})
+    sku_df.index = row_no
+    return sku_df
+
+def build_sku_table(raw_df, product_df, mode=CLEAN_MODE, seed=RANDOM_SEED, cache=None):
+    if mode == 'vectorized':
+        sku_df = clean_sku_chunk(raw_df, product_df, seed_entropy(seed), cache=cache)
+        sku_df['SKU_ID'] = add_sku_suffix_vec(sku_df['SKU_ID'])
+        return sku_df
+
+    sku_df = raw_df.copy()
+    sku_df['TempName'] = sku_df['Name'].apply(clean_product_name)
+    merged_df = pd.merge(sku_df, product_df[['ProductID', 'BrandName', 'ProductName']], left_on=['Brand', 'TempName'], right_on=['BrandName', 'ProductName'], how='left')
+    merged_df = merged_df.dropna(subset=['ProductID'])
+    merged_df['ProductID'] = merged_df['ProductID'].astype('int64')
+
+    merged_df['RAM'] = parse_spec(cache, merged_df['RAM'], clean_ram, batch=False)
+    merged_df['ScreenSize'] = parse_spec(cache, merged_df['Display'], clean_screen, batch=False)
+    merged_df['Price'] = merged_df['Price'].apply(clean_price)
+    merged_df['Weight'] = merged_df.apply(get_hybrid_weight, axis=1)
+    merged_df['SKU_ID'] = merged_df.apply(extract_real_sku_id, axis=1)
+    merged_df['VRAM'] = parse_spec(cache, merged_df['GPU'], extract_vram, batch=False)
+    merged_df['StorageCapacity'] = parse_spec(cache, merged_df[['SSD', 'HDD']], calculate_total_storage, batch=False)
+    merged_df['StorageType'] = parse_spec(cache, merged_df[['SSD', 'HDD']], get_storage_type, batch=False) # New Logic
+
+    merged_df['SKU_ID_Count'] = merged_df.groupby('SKU_ID').cumcount() + 1
+    merged_df['SKU_ID'] = merged_df.apply(lambda x: f"{x['SKU_ID']}-V{x['SKU_ID_Count']}" if x['SKU_ID_Count'] > 1 else x['SKU_ID'], axis=1)
+    merged_df['Stock'] = np.random.randint(1, 51, size=len(merged_df))
+
+    return merged_df[output_columns].rename(columns={'Processor_Name': 'CPU'})
+
+# --- 5. 串流模式 (分批讀取 -> 清洗 -> 對應 ProductID -> 附加寫出) ---
+def read_raw_chunks(raw_path, chunksize):
+    # 文字欄位固定讀成字串，避免每個 chunk 各自推斷出不同型別
+    text_dtypes = {col: str for col in RAW_COLUMNS if col != 'Price'}
+    return pd.read_csv(raw_path, encoding=RAW_ENCODING, usecols=RAW_COLUMNS, dtype=text_dtypes, chunksize=chunksize)
+
+def write_sku_chunks(chunks, output_path):
+    """
+    依序寫出已清洗的 chunk，並在這裡做全域的 SKU_ID 去重:
+    sku_counts 記錄之前 chunk 出現過的次數，結果與一次處理全部相同
+    (這份計數表的大小只跟「不同的料號數」有關)。
+    """
+    sku_counts = {}
+    rows_out = 0
+    # 只開一次檔案: 用 utf-8-sig 開啟只會在檔頭寫一次 BOM
+    with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
+        for i, sku_chunk in enumerate(chunks):
+            sku_chunk['SKU_ID'] = add_sku_suffix_vec(sku_chunk['SKU_ID'], sku_counts)
+            sku_chunk = Schema_Registry.cast(sku_chunk, 'sku_table_v6')
+            sku_chunk.to_csv(f, index=False, header=(i == 0))
+            rows_out += len(sku_chunk)
+    return rows_out
+
+def stream_sku_table(raw_path, product_df, output_path, chunksize=CHUNK_SIZE, seed=RANDOM_SEED, cache=None):
+    """
+    分批處理 laptop.csv，記憶體只跟 chunksize 有關。
+    Product 表很小，整份放在記憶體裡做 join。
+    """
+    entropy = seed_entropy(seed)
+    rows_in = 0
+
+    def cleaned_chunks():
+        nonlocal rows_in
+        for chunk in read_raw_chunks(raw_path, chunksize):
+            yield clean_sku_chunk(chunk, product_df, entropy, row_offset=rows_in, cache=cache)
+            rows_in += len(chunk)
+            print(f"  已處理 {rows_in} 筆")
+
+    rows_out = write_sku_chunks(cleaned_chunks(), output_path)
+    return rows_in, rows_out
+
+# --- 6. 平行模式 (多行程分片清洗，主行程依序合併) ---
+_worker_cache = None
+
+def _clean_shard(args):
+    # 每個工作行程各自讀一次解析快取 (只讀不寫，避免多個行程同時寫檔)
+    global _worker_cache
+    chunk, product_df, entropy, row_offset, use_cache = args
+    if use_cache and _worker_cache is None:
+        _worker_cache = Parse_Cache.ParseCache()
+    return clean_sku_chunk(chunk, product_df, entropy, row_offset, cache=_worker_cache if use_cache else None)
+
+def parallel_sku_table(raw_path, product_df, output_path, workers, chunksize=CHUNK_SIZE, seed=RANDOM_SEED, use_cache=True):
+    """
+    主行程分批讀取 laptop.csv，把每一批 (含起始列號) 丟給行程池清洗；
+    結果依原始順序收回，再由 write_sku_chunks 做全域 SKU_ID 去重並寫出。
+    亂數依列號產生，所以輸出與單行程執行 (相同種子) 逐位元組相同。
+    同時最多只有 workers * 2 批在處理中，記憶體仍有上限。
+    """
+    entropy = seed_entropy(seed)
+    rows_in = 0
+
+    def shard_args():
+        nonlocal rows_in
+        for chunk in read_raw_chunks(raw_path, chunksize):
+            yield (chunk, product_df, entropy, rows_in, use_cache)
+            rows_in += len(chunk)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def cleaned_chunks():
+            pending = deque()
+            for args in shard_args():
+                pending.append(pool.submit(_clean_shard, args))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+        rows_out = write_sku_chunks(cleaned_chunks(), output_path)
+    return rows_in, rows_out
+
+def main():
+    parser = argparse.ArgumentParser(description='SKU Table ETL (V6)')
+    parser.add_argument('--mode', choices=['row', 'vectorized'], default=CLEAN_MODE, help='清洗模式')
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED, help='Weight / Stock / 料號隨機碼的亂數種子 (vectorized 模式)')
+    parser.add_argument('--stream', action='store_true', help='串流模式: 分批讀取原始資料，記憶體用量固定')
+    parser.add_argument('--workers', type=int, default=1, help='平行模式: 用幾個行程分片清洗 (>1 時啟用，輸出與單行程相同)')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help='串流 / 平行模式每批的列數')
+    parser.add_argument('--raw', default=None, help='laptop.csv 路徑 (預設 ../Data/Raw/laptop.csv)')
+    parser.add_argument('--product', default=None, help='product_table.csv 路徑')
+    parser.add_argument('--output', default=OUTPUT_FILENAME, help='輸出檔案路徑')
+    parser.add_argument('--columnar', nargs='*', choices=Table_Formats.COLUMNAR_FORMATS, default=[], help='另外輸出帶型別的 Parquet / Feather')
+    parser.add_argument('--no-parse-cache', action='store_true', help='不使用規格字串解析快取 (每列都跑 regex)')
+    args = parser.parse_args()
+
+    output_filename = args.output
+    raw_path, product_path = input_paths(args.raw, args.product)
+    cache = None if args.no_parse_cache else Parse_Cache.ParseCache()
+
+    if args.stream or args.workers > 1:
+        try:
+            product_df = Schema_Registry.read_csv(product_path, shrink_columns=False)
+            if args.workers > 1:
+                print(f"平行模式: {args.workers} 個行程，每批 {args.chunksize} 筆")
+                rows_in, rows_out = parallel_sku_table(raw_path, product_df, output_filename, args.workers, args.chunksize, args.seed,
+                                                       use_cache=cache is not None)
+            else:
+                print(f"串流模式: 每批 {args.chunksize} 筆")
+                rows_in, rows_out = stream_sku_table(raw_path, product_df, output_filename, args.chunksize, args.seed, cache)
+        except FileNotFoundError:
+            print("找不到檔案，請確認 laptop.csv 與 product_table.csv 的位置。")
+            sys.exit(1)
+        except UnicodeDecodeError:
+            print(RAW_ENCODING_HINT)
+            sys.exit(1)
+        written = Table_Formats.convert_csv(output_filename, args.columnar, args.chunksize)
+        if cache is not None:
+            cache.save()
+            cache.report()
+        print("-" * 30)
+        print(f"處理完成！共讀入 {rows_in} 筆，輸出 {rows_out} 筆，檔案已存為 {', '.join([output_filename] + written)}")
+        return
+
+    try:
+        raw_df, product_df = load_inputs(raw_path, product_path)
+        print(f"資料讀取成功。處理筆數: {len(raw_df)}")
+    except FileNotFoundError:
+        print("找不到檔案，請確認 laptop.csv 與 product_table.csv 的位置。")
+        sys.exit(1)
+    except UnicodeDecodeError:
+        print(RAW_ENCODING_HINT)
+        sys.exit(1)
+
+    final_sku_df = build_sku_table(raw_df, product_df, mode=args.mode, seed=args.seed, cache=cache)
+    if cache is not None:
+        cache.save()
+        cache.report()
+    final_sku_df = Schema_Registry.cast(final_sku_df, 'sku_table_v6')
+
+    final_sku_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+    written = Table_Formats.write_columnar(final_sku_df, output_filename, args.columnar)
 
-output_filename = '../Data/Processed/sku_table_v6.csv'
-final_sku_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+    print("-" * 30)
+    print(f"處理完成！檔案已存為 {', '.join([output_filename] + written)}")
+    print("前 5 筆預覽：")
+    print(final_sku_df[['SKU_ID', 'StorageType', 'StorageCapacity']].head())
 
-print("-" * 30)
-print(f"處理完成！檔案已存為 {output_filename}")
-print("前 5 筆預覽：")
-print(final_sku_df[['SKU_ID', 'StorageType', 'StorageCapacity']].head())
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+import sqlite3
+import csv
+import gzip
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import Schema_Registry
+import Load_SQLite
+
+# --- 匯出 SQL dump (multi-row INSERT) ---
+# 給正式的 MySQL 用: 把 Data/Processed 的 CSV 轉成可攜的 SQL 檔，先執行 create_tables_v2.sql 建表再匯入這份 dump。
+#   - 每個 INSERT 塞多筆資料，直到接近 MAX_BYTES (對應 MySQL 的 max_allowed_packet；預設與 mysqldump 的 net_buffer_length 相同)
+#   - 依外鍵順序輸出 (Product, SKU, Customer, AddressBook, `Order`, OrderItem)，每張表一個 transaction
+#   - 逐列讀 CSV、逐句寫出，記憶體只跟一個 INSERT 的大小有關
+# 字串一律用 NO_BACKSLASH_ESCAPES 的規則 (只把 ' 變成 '')，這也正好是 SQLite 的規則；
+# MySQL 專用的設定放在 /*!40101 ... */ 裡，MySQL 會執行、SQLite 當成註解，所以同一份檔案可以直接在 SQLite 重播驗證。
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DUMP_PATH = os.path.join(SCRIPTS_DIR, '..', 'Data', 'LaptopStore_dump.sql')
+MAX_BYTES = 1024 * 1024
+
+NUMERIC_TYPES = set(Schema_Registry.INT_RANGES) | {'DECIMAL', 'NUMERIC', 'FLOAT', 'DOUBLE'}
+
+HEADER = """-- LaptopStore data dump (先執行 SQL/create_tables_v2.sql 建表)
+/*!40101 SET NAMES utf8mb4 */;
+/*!40101 SET @OLD_SQL_MODE = @@SQL_MODE, SQL_MODE = CONCAT(@@SQL_MODE, ',NO_BACKSLASH_ESCAPES') */;
+/*!40014 SET @OLD_FOREIGN_KEY_CHECKS = @@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS = 0 */;
+/*!40014 SET @OLD_UNIQUE_CHECKS = @@UNIQUE_CHECKS, UNIQUE_CHECKS = 0 */;
+"""
+FOOTER = """/*!40014 SET UNIQUE_CHECKS = @OLD_UNIQUE_CHECKS */;
+/*!40014 SET FOREIGN_KEY_CHECKS = @OLD_FOREIGN_KEY_CHECKS */;
+/*!40101 SET SQL_MODE = @OLD_SQL_MODE */;
+"""
+
+class VerifyError(Exception):
+    """CSV 本身違反資料庫限制，無法比對；args[0] 為說明文字的 list。"""
+
+def open_dump(path, mode):
+    # .gz 結尾就直接壓縮 / 解壓縮
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='\n')
+    return open(path, mode, encoding='utf-8', newline='\n')
+
+# --- 1. 值 -> SQL 字面值 ---
+def quote_text(value):
+    return "'" + value.replace("'", "''") + "'"
+
+def literal_formats(columns, table):
+    # 數值欄位原樣輸出，其他 (文字 / 日期) 加引號；空字串為 NULL
+    ddl = Schema_Registry.load_schema()['tables'][table]
+    return [ddl[name]['sql_type'] in NUMERIC_TYPES for name in columns]
+
+def row_values(row, numeric):
+    return '(' + ','.join('NULL' if value == '' else value if is_num else quote_text(value)
+                          for value, is_num in zip(row, numeric)) + ')'
+
+# --- 2. 打包成 multi-row INSERT ---
+def csv_columns(header, table):
+    # 回傳 (要輸出的 CSV 欄位位置, 對應的 DDL 欄名)；DDL 沒有的欄位略過
+    csv_table = Schema_Registry.csv_table_for(table)
+    ddl_columns = Schema_Registry.load_schema()['tables'][table]
+    keep = [i for i, name in enumerate(header) if Schema_Registry.ddl_column(csv_table, name) in ddl_columns]
+    return keep, [Schema_Registry.ddl_column(csv_table, header[i]) for i in keep]
+
+def table_statements(csv_path, table, max_bytes=MAX_BYTES):
+    """
+    逐列讀 CSV，產出 (INSERT 敘述, 筆數)。每句的 UTF-8 位元組數不超過 max_bytes；
+    單筆就超過的資料自成一句 (MySQL 端需要調大 max_allowed_packet)。
+    """
+    with open(csv_path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        keep, columns = csv_columns(next(reader), table)
+        numeric = literal_formats(columns, table)
+        prefix = f"INSERT INTO `{table}` ({','.join('`' + c + '`' for c in columns)}) VALUES "
+        prefix_bytes = len(prefix.encode('utf-8')) + 2   # 結尾的 ";\n"
+
+        values, size = [], prefix_bytes
+        for row in reader:
+            value = row_values([row[i] for i in keep], numeric)
+            value_bytes = len(value.encode('utf-8')) + 1  # 分隔的 ','
+            if values and size + value_bytes > max_bytes:
+                yield prefix + ','.join(values) + ';\n', len(values)
+                values, size = [], prefix_bytes
+            values.append(value)
+            size += value_bytes
+        if values:
+            yield prefix + ','.join(values) + ';\n', len(values)
+
+def write_dump(path, processed=Schema_Registry.PROCESSED_DIR, max_bytes=MAX_BYTES):
+    """回傳 [(表名, 筆數, INSERT 句數, 位元組數, 秒數)]。"""
+    stats = []
+    with open_dump(path, 'w') as out:
+        out.write(HEADER)
+        for table in Schema_Registry.load_order():
+            csv_path = os.path.join(processed, Schema_Registry.csv_table_for(table) + '.csv')
+            start = time.perf_counter()
+            rows = statements = size = 0
+            out.write(f"\n-- {table}\nBEGIN;\n")
+            for statement, n in table_statements(csv_path, table, max_bytes):
+                out.write(statement)
+                rows += n
+                statements += 1
+                size += len(statement.encode('utf-8'))
+            out.write("COMMIT;\n")
+            stats.append((table, rows, statements, size, time.perf_counter() - start))
+        out.write('\n' + FOOTER)
+    return stats
+
+# --- 3. 在 SQLite 重播 (驗證) ---
+def iter_statements(path):
+    # 逐行累積到一個完整的敘述才送出 (字串裡可能有換行)
+    with open_dump(path, 'r') as f:
+        buffer = ''
+        for line in f:
+            buffer += line
+            if sqlite3.complete_statement(buffer):
+                yield buffer
+                buffer = ''
+        if buffer.strip():
+            yield buffer
+
+def statement_table(statement):
+    # 'INSERT INTO `Customer` (...' -> 'Customer'
+    return statement.split('`', 2)[1] if statement.startswith('INSERT INTO `') else None
+
+def replay(dump_path, db_path):
+    """
+    建立空的 SQLite LaptopStore，執行整份 dump，回傳 (INSERT 句數, 秒數, 錯誤)。
+    錯誤為 None，或 (表名, 第幾句 INSERT, IntegrityError)；遇到違反限制的敘述就停止重播。
+    """
+    conn = Load_SQLite.create_database(db_path)
+    start = time.perf_counter()
+    inserts = 0
+    error = None
+    for statement in iter_statements(dump_path):
+        try:
+            conn.execute(statement)
+        except sqlite3.IntegrityError as e:
+            error = (statement_table(statement), inserts + 1, e)
+            break
+        inserts += statement.startswith('INSERT')
+    seconds = time.perf_counter() - start
+    conn.close()
+    return inserts, seconds, error
+
+def compare_with_csv(db_path, processed):
+    """把 CSV 用 Load_SQLite 匯入另一份資料庫，逐表比對內容；回傳 {表名: (dump 筆數, 差異筆數)}。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = os.path.join(tmp, 'reference.sqlite')
+        conn = Load_SQLite.create_database(reference)
+        for table in Schema_Registry.load_order():
+            csv_path = os.path.join(processed, Schema_Registry.csv_table_for(table) + '.csv')
+            try:
+                Load_SQLite.load_table(conn, table, csv_path)
+            except sqlite3.IntegrityError as e:
+                conn.close()
+                raise VerifyError(Load_SQLite.integrity_report(table, csv_path, e)) from e
+        conn.execute('ATTACH DATABASE ? AS dump', (db_path,))
+        result = {}
+        for table in Schema_Registry.load_order():
+            t = Load_SQLite.quote(table)
+            # 只比對 CSV 有的欄位: CSV 沒有的欄位由 DEFAULT 補 (例如 RegisterDate 的 CURRENT_TIMESTAMP)，兩次匯入的時間不同
+            with open(os.path.join(processed, Schema_Registry.csv_table_for(table) + '.csv'), encoding='utf-8-sig', newline='') as f:
+                _, columns = csv_columns(next(csv.reader(f)), table)
+            cols = ', '.join(Load_SQLite.quote(c) for c in columns)
+            rows = conn.execute(f"SELECT COUNT(*) FROM dump.{t}").fetchone()[0]
+            diff = conn.execute(f"SELECT COUNT(*) FROM (SELECT {cols} FROM main.{t} EXCEPT SELECT {cols} FROM dump.{t})").fetchone()[0]
+            diff += conn.execute(f"SELECT COUNT(*) FROM (SELECT {cols} FROM dump.{t} EXCEPT SELECT {cols} FROM main.{t})").fetchone()[0]
+            result[table] = (rows, diff)
+        conn.execute('DETACH DATABASE dump')
+        conn.close()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='把 Data/Processed 的 CSV 匯出成 multi-row INSERT 的 SQL dump')
+    parser.add_argument('--output', default=DUMP_PATH, help='輸出路徑 (.gz 結尾會壓縮)')
+    parser.add_argument('--processed', default=Schema_Registry.PROCESSED_DIR, help='CSV 所在資料夾')
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES, help='每個 INSERT 的位元組上限 (<= MySQL max_allowed_packet)')
+    parser.add_argument('--verify', action='store_true', help='在暫存的 SQLite 重播 dump，並與 CSV 逐表比對')
+    args = parser.parse_args()
+
+    missing = [t for t in Schema_Registry.load_order()
+               if not os.path.exists(os.path.join(args.processed, Schema_Registry.csv_table_for(t) + '.csv'))]
+    if missing:
+        print("錯誤：找不到 " + '、'.join(Schema_Registry.csv_table_for(t) + '.csv' for t in missing))
+        sys.exit(1)
+
+    print(f"匯出 {args.output} (每個 INSERT 最多 {args.max_bytes:,} bytes)")
+    for table, rows, statements, size, seconds in write_dump(args.output, args.processed, args.max_bytes):
+        print(f"  {table:<12}: {rows:>10} 筆 -> {statements:>7} 句 INSERT   {size / 1024 / 1024:8.1f} MB "
+              f"{seconds:7.2f} s ({rows / max(seconds, 1e-9):12,.0f} 筆/秒)")
+    print(f"檔案大小: {os.path.getsize(args.output) / 1024 / 1024:.1f} MB")
+
+    if args.verify:
+        print("-" * 30)
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'replay.sqlite')
+            inserts, seconds, error = replay(args.output, db_path)
+            print(f"SQLite 重播: {inserts} 句 INSERT，{seconds:.2f} s")
+            if error:
+                table, statement, e = error
+                print(f"錯誤：重播 {table} 的第 {statement} 句 INSERT 失敗，dump 無法匯入。")
+                csv_path = os.path.join(args.processed, Schema_Registry.csv_table_for(table) + '.csv')
+                print('\n'.join(Load_SQLite.integrity_report(table, csv_path, e)))
+                sys.exit(1)
+            try:
+                result = compare_with_csv(db_path, args.processed)
+            except VerifyError as e:
+                print('\n'.join(e.args[0]))
+                sys.exit(1)
+        failed = False
+        for table, (rows, diff) in result.items():
+            print(f"  {table:<12}: {rows:>10} 筆   與 CSV 不同: {diff}")
+            failed |= diff > 0
+        if failed:
+            print("錯誤：重播結果與 CSV 不一致。")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+
+# --- 身分資料池 (Identity Pool) ---
+# Faker 每呼叫一次 fake.name() / fake.address() 都要跑一次格式解析，產生幾千筆以上就成了瓶頸。
+# 這裡把 zh_TW provider 內建的資料 (姓氏 / 名字與權重、城市、街道、電話格式...) 取出來存成一份小檔案，
+# 之後用 NumPy 一次抽整個陣列再組合字串，格式與 Faker 的輸出相同。
+#
+# 快取位置: Data/.cache/identity_pools/<locale>.json (Faker 版本不同時自動重建)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+POOL_DIR = os.path.join(SCRIPTS_DIR, '..', 'Data', '.cache', 'identity_pools')
+
+EMAIL_DOMAINS = ['example.com', 'example.org', 'example.net']   # 與 Faker 的 safe email 相同
+PASSWORD_SPECIAL = '!@#$%^&*()_+'
+LOWER = 'abcdefghijklmnopqrstuvwxyz'
+UPPER = LOWER.upper()
+DIGITS = '0123456789'
+
+# --- 1. 從 Faker provider 取出資料 ---
+def build_pools(locale='zh_TW'):
+    import importlib
+    import faker
+
+    person = importlib.import_module(f'faker.providers.person.{locale}').Provider
+    address = importlib.import_module(f'faker.providers.address.{locale}').Provider
+    phone = importlib.import_module(f'faker.providers.phone_number.{locale}').Provider
+
+    def weighted(mapping):
+        return {'values': list(mapping.keys()), 'weights': [float(w) for w in mapping.values()]}
+
+    return {
+        'faker_version': faker.VERSION,
+        'locale': locale,
+        'last_names': weighted(person.last_names),
+        'first_names_male': weighted(person.first_names_male),
+        'first_names_female': weighted(person.first_names_female),
+        'last_romanized': weighted(person.last_romanized_names),
+        'first_romanized': weighted(person.first_romanized_names),
+        'cities': list(address.cities),
+        'city_suffixes': list(address.city_suffixes),
+        'street_names': list(address.street_names),
+        'street_suffixes': list(address.street_suffixes),
+        'phone_formats': list(phone.formats),
+    }
+
+def load_pools(locale='zh_TW', cache_dir=POOL_DIR):
+    import faker
+
+    path = os.path.join(cache_dir, f'{locale}.json')
+    if os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                pools = json.load(f)
+            if pools.get('faker_version') == faker.VERSION:
+                return IdentityPool(pools)
+        except ValueError:
+            print(f"注意：資料池快取 {path} 無法讀取，重新建立。")
+
+    pools = build_pools(locale)
+    os.makedirs(cache_dir, exist_ok=True)
+    # 先寫到暫存檔再換名: 其他行程同時讀取時只會看到舊檔或完整的新檔，不會讀到寫一半的 JSON
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(pools, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return IdentityPool(pools)
+
+# --- 2. 字串組合小工具 ---
+def join(*parts):
+    # 逐欄串接 (每個 part 是等長的字串陣列或單一字串)
+    result = np.asarray(parts[0], dtype=str)
+    for part in parts[1:]:
+        result = np.char.add(result, np.asarray(part, dtype=str))
+    return result
+
+def from_codepoints(codes):
+    # (n, k) 的 Unicode 碼位陣列 -> n 個長度 k 的字串
+    codes = np.ascontiguousarray(codes, dtype=np.uint32)
+    return codes.view(f'<U{codes.shape[1]}').ravel()
+
+def fill_template(rng, template, n):
+    # Faker 的數字格式: '#' = 0~9，'%' = 1~9，其他字元原樣保留
+    codes = np.tile(np.array([ord(c) for c in template], dtype=np.uint32), (n, 1))
+    for i, c in enumerate(template):
+        if c == '#':
+            codes[:, i] = ord('0') + rng.integers(0, 10, n)
+        elif c == '%':
+            codes[:, i] = ord('1') + rng.integers(0, 9, n)
+    return from_codepoints(codes)
+
+def by_format(rng, formats, n, build):
+    # 每筆隨機選一種格式，同一種格式的列一起產生
+    choice = rng.integers(0, len(formats), n)
+    out = np.empty(n, dtype=object)
+    for i, fmt in enumerate(formats):
+        rows = np.flatnonzero(choice == i)
+        if len(rows):
+            out[rows] = build(fmt, len(rows))
+    return out.astype(str)
+
+def make_unique(emails, counts=None):
+    """
+    重複的 email 在 @ 前面加上 '.流水號' (第 2 次出現 -> user.1@...)。
+    產生的帳號 (與 Faker 一樣經過 slugify) 不會含 '.'，所以加上後綴的帳號不可能再撞到別人，一次就能去重。
+    counts: 分批處理時傳入同一個 dict (email -> 之前出現的次數)，會就地更新，結果與整批一次處理相同。
+    """
+    emails = np.asarray(emails, dtype=str)
+    codes, uniques = pd.factorize(emails)
+    dup = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+    if counts is not None:
+        before = pd.Series(uniques).map(counts).fillna(0).to_numpy(dtype=np.int64)
+        dup = dup + before[codes]
+        counts.update(zip(uniques.tolist(), (before + np.bincount(codes, minlength=len(uniques))).tolist()))
+    mask = dup > 0
+    if not mask.any():
+        return emails
+    parts = np.char.partition(emails[mask], '@')
+    out = emails.astype(object)
+    out[mask] = join(parts[:, 0], '.', dup[mask].astype(str), '@', parts[:, 2])
+    return out.astype(str)
+
+class IdentityPool:
+    def __init__(self, pools):
+        self.pools = pools
+        self._arrays = {}
+        for key in ['last_names', 'first_names_male', 'first_names_female', 'last_romanized', 'first_romanized']:
+            values = np.array(pools[key]['values'])
+            weights = np.array(pools[key]['weights'], dtype=np.float64)
+            self._arrays[key] = (values, np.cumsum(weights) / weights.sum())
+
+    def sample(self, rng, key, n):
+        values, cdf = self._arrays[key]
+        return values[np.searchsorted(cdf, rng.random(n), side='right')]
+
+    @staticmethod
+    def pick(rng, values, n):
+        values = np.asarray(values)
+        return values[rng.integers(0, len(values), n)]
+
+    # --- 3. 各欄位 ---
+    def names(self, rng, n):
+        # 男 / 女各半，姓與名依 Faker 的權重抽
+        male = rng.random(n) < 0.5
+        first = np.where(male, self.sample(rng, 'first_names_male', n), self.sample(rng, 'first_names_female', n))
+        return join(self.sample(rng, 'last_names', n), first)
+
+    def user_names(self, rng, n):
+        # 同 Faker zh_TW 的 user_name_formats (slugify 會拿掉 '.')，再轉小寫
+        last = np.char.lower(self.sample(rng, 'last_romanized', n))
+        first = np.char.lower(self.sample(rng, 'first_romanized', n))
+        digits = np.char.zfill(rng.integers(0, 100, n).astype(str), 2)
+        initial = from_codepoints((ord('a') + rng.integers(0, 26, n))[:, None])
+        formats = [join(last, first), join(first, last), join(first, digits), join(initial, last)]
+        return np.choose(rng.integers(0, len(formats), n), formats)
+
+    def emails(self, rng, n, unique=False):
+        emails = join(self.user_names(rng, n), '@', self.pick(rng, EMAIL_DOMAINS, n))
+        return make_unique(emails) if unique else emails
+
+    def passwords(self, rng, n, length=10):
+        # 與 fake.password() 相同: 至少各一個特殊字元 / 數字 / 大寫 / 小寫，其餘從全部字元抽，最後打亂順序
+        groups = [PASSWORD_SPECIAL, DIGITS, UPPER, LOWER]
+        alphabet = np.array([ord(c) for c in ''.join(groups)], dtype=np.uint32)
+        codes = alphabet[rng.integers(0, len(alphabet), (n, length))]
+        for i, group in enumerate(groups):
+            chars = np.array([ord(c) for c in group], dtype=np.uint32)
+            codes[:, i] = chars[rng.integers(0, len(chars), n)]
+        order = np.argsort(rng.random((n, length)), axis=1)
+        return from_codepoints(np.take_along_axis(codes, order, axis=1))
+
+    def phones(self, rng, n):
+        return by_format(rng, self.pools['phone_formats'], n, lambda fmt, k: fill_template(rng, fmt, k))
+
+    def addresses(self, rng, n):
+        # '{{postcode}} {{city}}{{street_name}}{{street_suffix}}{{section}}{{building_number}}{{secondary_address}}'
+        postcode = by_format(rng, ['%####', '%##'], n, lambda fmt, k: fill_template(rng, fmt, k))
+        city = self.pick(rng, self.pools['cities'], n)
+        city = np.where(rng.random(n) < 0.5, city, join(city, self.pick(rng, self.pools['city_suffixes'], n)))
+        street = join(self.pick(rng, self.pools['street_names'], n), self.pick(rng, self.pools['street_suffixes'], n))
+        section = np.where(rng.random(n) < 0.2, join(fill_template(rng, '%', n), '段'), '')
+        building = join(by_format(rng, ['%', '%#', '%##'], n, lambda fmt, k: fill_template(rng, fmt, k)), '號')
+        secondary = by_format(rng, ['#樓', '之#'], n, lambda fmt, k: fill_template(rng, fmt, k))
+        return join(postcode, ' ', city, street, section, building, secondary)
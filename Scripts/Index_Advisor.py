@@ -0,0 +1,449 @@
+import pandas as pd
+import numpy as np
+import sqlite3
+import math
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+
+import Schema_Registry
+import Load_SQLite
+import Benchmark_Queries as bench
+
+# --- 索引建議 (依資料分布與查詢紀錄) ---
+# v2 的 idx_sku_specs (RAM, StorageCapacity, VRAM) 欄位順序是手選的；實際資料裡大部分筆電 VRAM = 0、RAM 集中在 8 / 16，
+# 手選的順序不一定適合常見的篩選條件。這支工具:
+#   1. 讀查詢紀錄 (預設 SQL/query_log.sql)，找出每個查詢的等值條件、範圍條件、JOIN 欄位、ORDER BY 與用到的欄位
+#   2. 在本機 SQLite 上統計這些欄位的分布: 不同值個數、最常見值的占比、等值條件的平均選擇率 (Σp²)、範圍條件的命中比例
+#   3. 依選擇率排組合索引的欄位順序: 等值欄位 (越能篩掉資料的越前面) -> 範圍欄位或 ORDER BY 欄位 -> 覆蓋欄位 (covering)
+#   4. 用簡單的成本模型估計加速 (讀取的索引 / 資料列數)，再實際建索引量測 p50
+# 成本模型只是粗估: 命中列數 * (覆蓋索引 1；否則回表 LOOKUP_COST) + 需要排序時 n log n，沒有考慮 LIMIT 與快取。
+# 每個查詢各自挑最好的候選索引後，拿掉對整份查詢紀錄幫助不大 (估計總成本差不到 MIN_GAIN) 的重複索引。
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+QUERY_LOG = os.path.join(SCRIPTS_DIR, '..', 'SQL', 'query_log.sql')
+
+SAMPLE_ROWS = 200_000   # 統計分布時最多抽樣的筆數
+LOOKUP_COST = 3.0       # 在 B-tree 裡找一次 (索引起點 / 非覆蓋索引回表) 的成本，相對於循序讀一筆
+MAX_COVERING = 4        # 覆蓋索引最多額外加幾個欄位
+MIN_GAIN = 0.2          # 估計成本至少降低 20% 才建議
+REPEAT = 20
+
+# --- 1. 解析查詢紀錄 ---
+COLUMN = r'(?:([A-Za-z_]\w*)\.)?[`"]?([A-Za-z_]\w*)[`"]?'
+# 函式呼叫 / 子查詢最多三層括號，例如 datetime((SELECT MAX(OrderDate) FROM "Order"), '-7 days')
+PARENS = r'\([^()]*\)'
+for _ in range(2):
+    PARENS = rf'\((?:[^()]|{PARENS})*\)'
+VALUE = rf"(-?\d+(?:\.\d+)?|'(?:[^']|'')*'|\w*{PARENS})"
+TABLE_RE = re.compile(r'(?:FROM|JOIN)\s+[`"]?(\w+)[`"]?(?:\s+(?:AS\s+)?(\w+))?', re.I)
+BETWEEN_RE = re.compile(rf'{COLUMN}\s+BETWEEN\s+{VALUE}\s+AND\s+{VALUE}', re.I)
+JOIN_RE = re.compile(rf'{COLUMN}\s*=\s*{COLUMN}(?![\w.(])')
+COMPARE_RE = re.compile(rf'{COLUMN}\s*(>=|<=|<>|!=|=|<|>)\s*{VALUE}')
+ORDER_RE = re.compile(r'ORDER\s+BY\s+(.+?)(?:\s+LIMIT\b|;|$)', re.I)
+REFERENCE_RE = re.compile(rf'{COLUMN}(?!\s*\()')
+KEYWORDS = {'ON', 'WHERE', 'JOIN', 'INNER', 'LEFT', 'RIGHT', 'CROSS', 'GROUP', 'ORDER', 'LIMIT', 'USING'}
+
+def read_log(path):
+    # 逐行累積到一個完整的敘述 (同 Export_SQL_Dump.iter_statements)，略過註解行，空白壓成一格
+    statements, buffer = [], ''
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip().startswith('--'):
+                continue
+            buffer += line
+            if sqlite3.complete_statement(buffer):
+                statements.append(' '.join(buffer.split()))
+                buffer = ''
+    return statements
+
+def parse_query(conn, sql):
+    """
+    回傳 {'sql', 'tables', 'eq': {(表, 欄): 值}, 'range': {(表, 欄): [下限, 上限]},
+          'joins': [(表, 欄, 表, 欄)], 'order': [(表, 欄)], 'columns': {表: 用到的欄位}}
+    條件右邊的運算式 (例如 datetime((SELECT MAX(OrderDate) FROM "Order"), '-7 days')) 交給 SQLite 算出實際的值。
+    """
+    ddl = Schema_Registry.load_schema()['tables']
+    aliases = {}
+    for table, alias in TABLE_RE.findall(sql):
+        if table in ddl:
+            aliases[table] = table
+            if alias and alias.upper() not in KEYWORDS:
+                aliases[alias] = table
+    tables = set(aliases.values())
+
+    def resolve(alias, column):
+        if alias:
+            table = aliases.get(alias)
+            return table if table and column in ddl[table] else None
+        found = [t for t in tables if column in ddl[t]]
+        return found[0] if len(found) == 1 else None
+
+    def evaluate(value):
+        return conn.execute('SELECT ' + value).fetchone()[0]
+
+    query = {'sql': sql, 'tables': tables, 'eq': {}, 'range': {}, 'joins': [], 'order': [],
+             'columns': {t: set() for t in tables}}
+    # 依序比對，比對過的片段清掉，避免 BETWEEN 的 AND 或 JOIN 的欄位又被當成別的條件
+    rest = sql
+    for match in BETWEEN_RE.finditer(sql):
+        table = resolve(*match.group(1, 2))
+        if table:
+            query['range'][table, match.group(2)] = [evaluate(match.group(3)), evaluate(match.group(4))]
+        rest = rest.replace(match.group(0), ' ')
+    for match in JOIN_RE.finditer(rest):
+        left, right = resolve(*match.group(1, 2)), resolve(*match.group(3, 4))
+        if left and right and left != right:
+            query['joins'].append((left, match.group(2), right, match.group(4)))
+            rest = rest.replace(match.group(0), ' ')
+    for alias, column, op, value in COMPARE_RE.findall(rest):
+        table = resolve(alias, column)
+        if not table or op in ('<>', '!='):
+            continue
+        if op == '=':
+            query['eq'][table, column] = evaluate(value)
+        else:
+            bounds = query['range'].setdefault((table, column), [None, None])
+            bounds[0 if op.startswith('>') else 1] = evaluate(value)
+
+    order = ORDER_RE.search(sql)
+    if order:
+        for term in order.group(1).split(','):
+            match = re.fullmatch(COLUMN + r'(?:\s+(?:ASC|DESC))?', term.strip(), re.I)
+            table = resolve(*match.group(1, 2)) if match else None
+            if table:
+                query['order'].append((table, match.group(2)))
+    for alias, column in REFERENCE_RE.findall(sql):
+        table = resolve(alias, column)
+        if table:
+            query['columns'][table].add(column)
+    return query
+
+# --- 2. 資料分布 ---
+def profile_column(conn, table, column, sample_rows=SAMPLE_ROWS):
+    """
+    回傳欄位的分布統計。超過 sample_rows 筆時用 rowid 等距抽樣；
+    等值選擇率用 Σ c(c-1) / (n(n-1)) 估計 Σp² (抽樣時比直接算 Σp² 不偏)，下限為 1 / 不同值個數。
+    """
+    t, c = Load_SQLite.quote(table), Load_SQLite.quote(column)
+    rows, distinct = conn.execute(f"SELECT COUNT(*), COUNT(DISTINCT {c}) FROM {t}").fetchone()
+    step = max(1, math.ceil(rows / sample_rows))
+    where = f"WHERE rowid % {step} = 0" if step > 1 else ''
+    values = pd.Series([row[0] for row in conn.execute(f"SELECT {c} FROM {t} {where}")])
+    counts = values.value_counts(dropna=False)
+    n = max(len(values), 2)
+    eq_selectivity = max(float((counts * (counts - 1)).sum()) / (n * (n - 1)), 1 / max(distinct, 1))
+    return {
+        'rows': rows, 'distinct': distinct,
+        'top': counts.index[0] if len(counts) else None,
+        'top_share': counts.iloc[0] / len(values) if len(counts) else 0.0,
+        'eq_selectivity': eq_selectivity,
+        'freq': counts / len(values),
+        'sorted': np.sort(values.dropna().to_numpy()),
+    }
+
+def sel_eq(profile, value):
+    # 沒抽到的值視為一般的低頻值
+    share = profile['freq'].get(value, 0.0)
+    return share if share > 0 else 1 / max(profile['distinct'], 1)
+
+def sel_range(profile, low, high):
+    values = profile['sorted']
+    if len(values) == 0:
+        return 0.0
+    left = np.searchsorted(values, low, side='left') if low is not None else 0
+    right = np.searchsorted(values, high, side='right') if high is not None else len(values)
+    return max(right - left, 0) / len(values)
+
+def profile_queries(conn, queries):
+    # 只統計查詢紀錄裡當成條件 / JOIN / ORDER BY 的欄位
+    wanted = set()
+    for query in queries:
+        wanted |= set(query['eq']) | set(query['range']) | set(query['order'])
+        wanted |= {(t, c) for t, c, _, _ in query['joins']} | {(t, c) for _, _, t, c in query['joins']}
+    return {key: profile_column(conn, *key) for key in sorted(wanted)}
+
+# --- 3. 成本模型 ---
+def table_info(conn):
+    """{表名: {'rows', 'rowid' (INTEGER PRIMARY KEY 的欄名), 'indexes': 主鍵 / UNIQUE / 資料庫裡的索引}}"""
+    info = {}
+    for table, columns in Schema_Registry.load_schema()['tables'].items():
+        pk = [name for name, col in columns.items() if col['primary_key']]
+        rowid = pk[0] if len(pk) == 1 and Load_SQLite.SQLITE_TYPES.get(columns[pk[0]]['sql_type']) == 'INTEGER' else None
+        indexes = [{'name': 'PRIMARY KEY', 'table': table, 'columns': pk}] if pk else []
+        indexes += [{'name': f'UNIQUE({name})', 'table': table, 'columns': [name]}
+                    for name, col in columns.items() if col['unique']]
+        for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name = ?",
+                                  (table,)):
+            indexes.append({'name': name, 'table': table,
+                            'columns': [row[2] for row in conn.execute(f"PRAGMA index_info({Load_SQLite.quote(name)})")]})
+        rows = conn.execute(f"SELECT COUNT(*) FROM {Load_SQLite.quote(table)}").fetchone()[0]
+        info[table] = {'rows': rows, 'rowid': rowid, 'indexes': indexes}
+    return info
+
+def local_selectivity(query, table, profiles):
+    f = 1.0
+    for (t, column), value in query['eq'].items():
+        if t == table:
+            f *= sel_eq(profiles[t, column], value)
+    for (t, column), (low, high) in query['range'].items():
+        if t == table:
+            f *= sel_range(profiles[t, column], low, high)
+    return f
+
+def sort_cost(rows):
+    return rows * math.log2(rows + 2)
+
+def is_covering(index, query, table, info):
+    # rowid 表本身就是依主鍵排序的 B-tree；其他索引要包含查詢用到的所有欄位 (索引裡自帶 rowid)
+    if index['columns'] == [info[table]['rowid']]:
+        return True
+    return query['columns'][table] <= set(index['columns']) | {info[table]['rowid']}
+
+def access_cost(index, query, table, info, profiles):
+    """用 index 篩選 table 的估計成本；index 為 None 時是全表掃描。用不到的索引回傳 None。"""
+    n = info[table]['rows']
+    eq = {c for t, c in query['eq'] if t == table}
+    ranges = {c for t, c in query['range'] if t == table}
+    # 只有單表查詢的 ORDER BY 能直接靠索引的順序省掉排序
+    order = [c for t, c in query['order'] if t == table] if len(query['tables']) == 1 else []
+    result = n * local_selectivity(query, table, profiles)
+    if index is None:
+        return n + (sort_cost(result) if order else 0)
+
+    columns, f, pos = index['columns'], 1.0, 0
+    while pos < len(columns) and columns[pos] in eq:
+        f *= sel_eq(profiles[table, columns[pos]], query['eq'][table, columns[pos]])
+        pos += 1
+    in_order = bool(order) and columns[pos:pos + len(order)] == order
+    if pos < len(columns) and columns[pos] in ranges:
+        f *= sel_range(profiles[table, columns[pos]], *query['range'][table, columns[pos]])
+        pos += 1
+    if pos == 0 and not in_order:
+        return None
+    per_row = 1.0 if is_covering(index, query, table, info) else LOOKUP_COST
+    return LOOKUP_COST + n * f * per_row + (0 if in_order or not order else sort_cost(result))
+
+def join_cost(index, join, query, info, profiles):
+    """inner.欄 = outer.欄，outer 先依自己的條件篩選，再逐筆到 inner 找對應的資料。"""
+    inner, column, outer, _ = join
+    n = info[inner]['rows']
+    if index is None or index['columns'][:1] != [column]:
+        return n  # 沒有可用的索引: 掃整張表 (SQLite 也可能臨時建 automatic index，一樣要讀整張表)
+    outer_rows = info[outer]['rows'] * local_selectivity(query, outer, profiles)
+    fanout = n / max(profiles[inner, column]['distinct'], 1)
+    per_row = 1.0 if is_covering(index, query, inner, info) else LOOKUP_COST
+    return outer_rows * LOOKUP_COST + outer_rows * fanout * per_row
+
+def accesses(query):
+    """查詢裡需要估計的存取: 有篩選條件的表，以及被有條件的表 JOIN 過去、且不是用主鍵對應的那一側。"""
+    filtered = {t for t, _ in query['eq']} | {t for t, _ in query['range']}
+    if len(query['tables']) == 1:
+        filtered |= {t for t, _ in query['order']}
+    items = [('filter', table) for table in sorted(filtered)]
+    for left, lcol, right, rcol in query['joins']:
+        for join in ((left, lcol, right, rcol), (right, rcol, left, lcol)):
+            if join[2] in filtered and join[0] not in filtered:
+                items.append(('join', join))
+    return items
+
+def best_access(item, indexes, query, info, profiles):
+    """回傳 (成本, 使用的索引名稱或 None)。"""
+    kind, target = item
+    table = target if kind == 'filter' else target[0]
+    options = [(access_cost(None, query, table, info, profiles) if kind == 'filter'
+                else join_cost(None, target, query, info, profiles), None)]
+    for index in indexes:
+        if index['table'] != table:
+            continue
+        cost = (access_cost(index, query, table, info, profiles) if kind == 'filter'
+                else join_cost(index, target, query, info, profiles))
+        if cost is not None:
+            options.append((cost, index['name']))
+    return min(options, key=lambda option: option[0])
+
+def query_cost(query, indexes, info, profiles):
+    # 查詢的估計成本 = 各存取的成本總和；回傳 (成本, 用到的索引)
+    total, used = 0.0, set()
+    for item in accesses(query):
+        cost, name = best_access(item, indexes, query, info, profiles)
+        total += cost
+        if name:
+            used.add(name)
+    return total, used
+
+# --- 4. 產生建議 ---
+def index_name(table, columns):
+    return 'adv_' + table.lower() + '_' + '_'.join(c.lower() for c in columns)
+
+def candidates(item, query, info, profiles):
+    # 等值欄位依平均選擇率排序 (越能篩掉資料的放前面)，後面接最能篩的範圍欄位或 ORDER BY 欄位，再加覆蓋欄位
+    kind, target = item
+    if kind == 'join':
+        table, keys = target[0], [[target[1]]]
+    else:
+        table = target
+        eq = sorted((c for t, c in query['eq'] if t == table), key=lambda c: profiles[table, c]['eq_selectivity'])
+        ranges = sorted((c for t, c in query['range'] if t == table),
+                        key=lambda c: sel_range(profiles[table, c], *query['range'][table, c]))
+        order = [c for t, c in query['order'] if t == table] if len(query['tables']) == 1 else []
+        keys = [eq] + ([eq + ranges[:1]] if ranges else []) + ([eq + order] if order else [])
+    rowid = info[table]['rowid']
+    for key in keys:
+        key = list(dict.fromkeys(key))
+        if not key or rowid in key:
+            continue
+        yield {'table': table, 'key': key, 'columns': key}
+        extras = sorted(query['columns'][table] - set(key) - {rowid})
+        if extras and len(extras) <= MAX_COVERING:
+            yield {'table': table, 'key': key, 'columns': key + extras}
+
+def recommend(queries, info, profiles):
+    """
+    每個查詢的每個存取挑估計成本最低的候選索引 (需比現有索引省 MIN_GAIN 以上)，
+    再合併: 相同鍵的覆蓋欄位取聯集，欄位是另一個索引開頭的索引就不另外建。
+    """
+    existing = [index for table in info.values() for index in table['indexes']]
+    picked = {}
+    for query in queries:
+        for item in accesses(query):
+            current, _ = best_access(item, existing, query, info, profiles)
+            best = None
+            for candidate in candidates(item, query, info, profiles):
+                candidate['name'] = index_name(candidate['table'], candidate['columns'])
+                cost, name = best_access(item, [candidate], query, info, profiles)
+                if name and (best is None or cost < best[0]):
+                    best = (cost, candidate)
+            if best and best[0] < current * (1 - MIN_GAIN):
+                candidate = best[1]
+                merged = picked.setdefault((candidate['table'], tuple(candidate['key'])), list(candidate['key']))
+                merged += [c for c in candidate['columns'] if c not in merged]
+
+    result = []
+    for (table, _), cols in picked.items():
+        longer = [other for (t, _), other in picked.items() if t == table and len(other) > len(cols) and other[:len(cols)] == cols]
+        same = [index for index in existing if index['table'] == table and index['columns'] == cols]
+        if not longer and not same:
+            result.append({'name': index_name(table, cols), 'table': table, 'columns': cols})
+    return prune(result, queries, existing, info, profiles)
+
+def prune(advice, queries, existing, info, profiles):
+    # 依序試著拿掉每個建議索引 (欄位多的先試)；查詢紀錄的一行算執行一次，整體估計成本增加不到 MIN_GAIN 就不建
+    def total(indexes):
+        return sum(query_cost(query, existing + indexes, info, profiles)[0] for query in queries)
+
+    for index in sorted(advice, key=lambda index: -len(index['columns'])):
+        rest = [other for other in advice if other is not index]
+        if total(rest) <= total(advice) * (1 + MIN_GAIN):
+            advice = rest
+    return advice
+
+# --- 5. 量測 ---
+def copy_database(path, copy_path):
+    # 量測要反覆 DROP / CREATE INDEX 與 ANALYZE，一律在複本上做: 使用者的資料庫以唯讀開啟，中途失敗或中斷也不會被改到
+    source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    target = sqlite3.connect(copy_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return Load_SQLite.connect(copy_path)
+
+def set_indexes(conn, wanted):
+    # 讓資料庫裡的索引剛好是 wanted (主鍵 / UNIQUE 不動)，再 ANALYZE
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+    names = {index['name'] for index in wanted}
+    for name in existing - names:
+        conn.execute(f"DROP INDEX {Load_SQLite.quote(name)}")
+    for index in wanted:
+        if index['name'] not in existing:
+            conn.execute(Load_SQLite.create_index_sql(index))
+    conn.execute('ANALYZE')
+
+def measure(conn, queries, wanted, repeat):
+    set_indexes(conn, wanted)
+    results = []
+    for query in queries:
+        ms = bench.time_query(conn, query['sql'], [()] * repeat)
+        results.append((np.percentile(ms, 50), bench.query_plan(conn, query['sql'], ())))
+    return results
+
+def print_profiles(profiles):
+    print(f"  {'欄位':<24}{'筆數':>10}{'不同值':>9}{'最常見值':>28}{'占比':>8}{'等值選擇率':>12}")
+    for (table, column), p in profiles.items():
+        top = str(p['top'])[:26]
+        print(f"  {table + '.' + column:<24}{p['rows']:>10,}{p['distinct']:>9,}{top:>28}{p['top_share']:>8.1%}{p['eq_selectivity']:>12.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='依資料分布與查詢紀錄建議組合索引 / 覆蓋索引，並在 SQLite 量測')
+    parser.add_argument('--db', default=Load_SQLite.DB_PATH, help='已匯入資料的 SQLite (Load_SQLite.py 產生)')
+    parser.add_argument('--scale', type=float, default=None, help='改用 Benchmark_Queries 建立這個規模 SF 的暫存資料庫')
+    parser.add_argument('--log', default=QUERY_LOG, help='查詢紀錄 (以 ; 分隔的 SQL)')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='每個查詢量測幾次')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.scale is not None:
+            start = time.perf_counter()
+            conn = bench.build_database(os.path.join(tmp, 'LaptopStore.sqlite'), args.scale)
+            print(f"[SF={args.scale:g}] 建立暫存資料庫 {time.perf_counter() - start:.1f} s")
+        elif os.path.exists(args.db):
+            start = time.perf_counter()
+            conn = copy_database(args.db, os.path.join(tmp, 'LaptopStore.sqlite'))
+            print(f"複製 {args.db} 到暫存資料夾 {time.perf_counter() - start:.1f} s (索引只在複本上增刪，原檔不變)")
+        else:
+            print(f"錯誤：找不到 {args.db}，請先執行 Load_SQLite.py，或用 --scale 建立暫存資料庫。")
+            sys.exit(1)
+
+        queries = [parse_query(conn, sql) for sql in read_log(args.log)]
+        info = table_info(conn)
+        print(f"查詢紀錄: {len(queries)} 個查詢   " + '  '.join(f"{t} {v['rows']:,}" for t, v in info.items()))
+        profiles = profile_queries(conn, queries)
+        print("欄位分布:")
+        print_profiles(profiles)
+
+        existing = [index for table in info.values() for index in table['indexes']]
+        schema_indexes = [index for index in existing if index['name'] in
+                          {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}]
+        advice = recommend(queries, info, profiles)
+        print("-" * 30)
+        print("建議的索引:")
+        for index in advice:
+            print(f"  {Load_SQLite.create_index_sql(index)};")
+        if not advice:
+            print("  (現有索引已足夠)")
+
+        # 加入建議後，估計模型不再使用的現有索引
+        used = set()
+        for query in queries:
+            used |= query_cost(query, existing + advice, info, profiles)[1]
+        unused = [index for index in schema_indexes if index['name'] not in used]
+        for index in unused:
+            print(f"  可移除: {index['name']} ({', '.join(index['columns'])})，查詢紀錄裡的查詢都有更好的索引")
+
+        configs = [('現有索引', schema_indexes), ('現有 + 建議', schema_indexes + advice),
+                   ('建議 (移除不用的)', [i for i in schema_indexes if i not in unused] + advice)]
+        measured = {label: measure(conn, queries, wanted, args.repeat) for label, wanted in configs}
+
+        print("-" * 30)
+        print(f"  {'#':<3}{'估計成本 現有':>14}{'-> 建議':>12}{'估計加速':>10}" + ''.join(f"{label + ' ms':>20}" for label, _ in configs)
+              + f"{'實測加速':>10}")
+        for i, query in enumerate(queries):
+            before = query_cost(query, existing, info, profiles)[0]
+            after = query_cost(query, [i for i in existing if i not in unused] + advice, info, profiles)[0]
+            times = [measured[label][i][0] for label, _ in configs]
+            print(f"  {i + 1:<3}{before:14,.0f}{after:12,.0f}{before / max(after, 1e-9):9.1f}x"
+                  + ''.join(f"{t:20.3f}" for t in times) + f"{times[0] / max(times[-1], 1e-9):9.1f}x")
+        print("查詢計畫 (現有 -> 建議):")
+        for i, query in enumerate(queries):
+            print(f"  {i + 1}. {query['sql'][:100]}")
+            print(f"     現有: {measured[configs[0][0]][i][1]}")
+            print(f"     建議: {measured[configs[-1][0]][i][1]}")
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+import sqlite3
+import csv
+from collections import Counter
+import os
+import sys
+import time
+import argparse
+
+import Schema_Registry
+
+# --- 匯入 SQLite (LaptopStore 的本機替身) ---
+# 原本的流程是在 MySQL Workbench 手動匯入 Data/Processed 的 CSV。
+# 這裡依 create_tables_v2.sql 在 SQLite 建一份相同結構的資料庫，方便本機查詢 / 驗證 / 量測。
+# MySQL -> SQLite 的轉換:
+#   INT 類 -> INTEGER (INT PRIMARY KEY 成為 rowid，查詢最快)、DECIMAL -> REAL、VARCHAR / DATETIME -> TEXT
+#   `Order` 反引號 -> "Order"；DEFAULT CURRENT_TIMESTAMP 兩邊相同
+#   CREATE DATABASE / USE / SET FOREIGN_KEY_CHECKS 在 SQLite 沒有對應，不處理
+# 大量匯入的做法 (跟 DDL 開頭 SET FOREIGN_KEY_CHECKS = 0 的用意相同):
+#   匯入期間關閉外鍵檢查與 journal，每 TXN_ROWS 筆才 COMMIT 一次；
+#   資料進去之後才建 idx_sku_* / idx_order_date 索引，最後用 PRAGMA foreign_key_check 一次檢查全部外鍵。
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(SCRIPTS_DIR, '..', 'Data', 'LaptopStore.sqlite')
+
+BATCH_ROWS = 50_000     # 每次 executemany 的筆數
+TXN_ROWS = 1_000_000    # 每個 transaction 的筆數
+
+SQLITE_TYPES = {
+    'INT': 'INTEGER', 'TINYINT': 'INTEGER', 'SMALLINT': 'INTEGER', 'BIGINT': 'INTEGER',
+    'DECIMAL': 'REAL', 'NUMERIC': 'REAL', 'FLOAT': 'REAL', 'DOUBLE': 'REAL',
+}
+
+# --- 1. DDL 轉換 ---
+def quote(name):
+    return '"' + name + '"'
+
+def column_sql(name, info):
+    sql = f"{quote(name)} {SQLITE_TYPES.get(info['sql_type'], 'TEXT')}"
+    if info['primary_key']:
+        sql += ' PRIMARY KEY'
+    elif info['not_null']:
+        sql += ' NOT NULL'
+    if info['unique']:
+        sql += ' UNIQUE'
+    default = info['default']
+    if default is not None:
+        if default.upper() == 'CURRENT_TIMESTAMP' or info['sql_type'] in SQLITE_TYPES:
+            sql += f' DEFAULT {default}'
+        else:
+            sql += " DEFAULT '" + default.replace("'", "''") + "'"
+    return sql
+
+def create_table_sql(table):
+    schema = Schema_Registry.load_schema()
+    lines = [column_sql(name, info) for name, info in schema['tables'][table].items()]
+    # 外鍵宣告為 DEFERRABLE: 之後開啟 foreign_keys 時，同一個 transaction 內可以先寫子表
+    lines += [f"FOREIGN KEY ({quote(fk['column'])}) REFERENCES {quote(fk['ref_table'])}({quote(fk['ref_column'])}) "
+              "DEFERRABLE INITIALLY DEFERRED"
+              for fk in schema['foreign_keys'] if fk['table'] == table]
+    return f"CREATE TABLE {quote(table)} (\n    " + ',\n    '.join(lines) + "\n)"
+
+def create_index_sql(index):
+    columns = ', '.join(quote(c) for c in index['columns'])
+    return f"CREATE INDEX {quote(index['name'])} ON {quote(index['table'])}({columns})"
+
+def schema_sql():
+    """整份 SQLite 版的 DDL (建表 + 索引)，依外鍵順序排列。"""
+    statements = [create_table_sql(table) for table in Schema_Registry.load_order()]
+    statements += [create_index_sql(index) for index in Schema_Registry.load_schema()['indexes']]
+    return ';\n\n'.join(statements) + ';\n'
+
+# --- 2. 連線 ---
+def connect(path, bulk=False):
+    conn = sqlite3.connect(path, isolation_level=None)
+    if bulk:
+        # 資料庫隨時可以從 CSV 重建，匯入期間不需要 journal / fsync
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute('PRAGMA cache_size = -262144')   # 256 MB
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA foreign_keys = OFF')
+    else:
+        conn.execute('PRAGMA foreign_keys = ON')
+    return conn
+
+def create_database(path):
+    # 重置環境: 跟 DDL 的 DROP TABLE 一樣，每次從空的資料庫開始
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = connect(path, bulk=True)
+    for table in Schema_Registry.load_order():
+        conn.execute(create_table_sql(table))
+    return conn
+
+# --- 3. 匯入 ---
+def csv_batches(path, csv_table, batch_rows=BATCH_ROWS):
+    """
+    回傳 (DDL 欄名, 批次 generator)。空字串轉成 NULL；DDL 沒有的欄位略過，
+    CSV 缺少的欄位 (例如 customer.csv 沒有 RegisterDate) 不寫入，由 DEFAULT 補上。
+    """
+    f = open(path, encoding='utf-8-sig', newline='')
+    reader = csv.reader(f)
+    header = next(reader)
+    ddl_columns = Schema_Registry.load_schema()['tables'][Schema_Registry.CSV_TABLES[csv_table]]
+    keep = [i for i, name in enumerate(header) if Schema_Registry.ddl_column(csv_table, name) in ddl_columns]
+    columns = [Schema_Registry.ddl_column(csv_table, header[i]) for i in keep]
+    everything = len(keep) == len(header)
+
+    def batches():
+        with f:
+            batch = []
+            for row in reader:
+                if not everything:
+                    row = [row[i] for i in keep]
+                batch.append([value if value != '' else None for value in row])
+                if len(batch) >= batch_rows:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    return columns, batches()
+
+def load_table(conn, table, csv_path, batch_rows=BATCH_ROWS, txn_rows=TXN_ROWS):
+    csv_table = Schema_Registry.csv_table_for(table)
+    columns, batches = csv_batches(csv_path, csv_table, batch_rows)
+    sql = (f"INSERT INTO {quote(table)} ({', '.join(quote(c) for c in columns)}) "
+           f"VALUES ({', '.join('?' * len(columns))})")
+    rows = in_txn = 0
+    conn.execute('BEGIN')
+    try:
+        for batch in batches:
+            conn.executemany(sql, batch)
+            rows += len(batch)
+            in_txn += len(batch)
+            if in_txn >= txn_rows:
+                conn.execute('COMMIT')
+                conn.execute('BEGIN')
+                in_txn = 0
+    except sqlite3.IntegrityError:
+        # 違反 UNIQUE / NOT NULL: 結束這個 transaction，由呼叫端回報 (見 integrity_report) 並刪除資料庫；
+        # bulk 模式沒有 journal，ROLLBACK 不保證能還原已寫入的資料
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+    return rows
+
+def constraint_columns(error):
+    # 'UNIQUE constraint failed: Customer.Email' -> ['Email']
+    _, _, detail = str(error).partition(': ')
+    return [part.strip().split('.', 1)[-1] for part in detail.split(',')] if detail else []
+
+def duplicate_keys(csv_path, csv_table, key_columns):
+    """CSV 裡重複出現的鍵值 -> 次數 (欄名用 DDL 的名稱)。"""
+    columns, batches = csv_batches(csv_path, csv_table)
+    if not all(c in columns for c in key_columns):
+        return {}
+    positions = [columns.index(c) for c in key_columns]
+    counts = Counter(tuple(row[i] for i in positions) for batch in batches for row in batch)
+    return {key: count for key, count in counts.items() if count > 1}
+
+def integrity_report(table, csv_path, error, limit=10):
+    """IntegrityError -> 說明文字的 list (哪張表、哪個限制、哪些鍵值)。"""
+    lines = [f"錯誤：{table} ({os.path.basename(csv_path)}) 違反限制: {error}"]
+    key_columns = constraint_columns(error)
+    if str(error).startswith('UNIQUE') and key_columns:
+        duplicates = duplicate_keys(csv_path, Schema_Registry.csv_table_for(table), key_columns)
+        extra = sum(duplicates.values()) - len(duplicates)
+        lines.append(f"  {', '.join(key_columns)} 有 {len(duplicates)} 個值重複 (多出 {extra} 筆)，例如:")
+        for key, count in sorted(duplicates.items(), key=lambda item: -item[1])[:limit]:
+            lines.append(f"    {', '.join(str(v) for v in key)}  x{count}")
+    return lines
+
+def create_indexes(conn):
+    timings = []
+    for index in Schema_Registry.load_schema()['indexes']:
+        start = time.perf_counter()
+        conn.execute(create_index_sql(index))
+        timings.append((index['name'], time.perf_counter() - start))
+    return timings
+
+def foreign_key_violations(conn):
+    # 回傳 {子表: 違反筆數}
+    violations = {}
+    for table, _, _, _ in conn.execute('PRAGMA foreign_key_check'):
+        violations[table] = violations.get(table, 0) + 1
+    return violations
+
+def main():
+    parser = argparse.ArgumentParser(description='把 Data/Processed 的 CSV 匯入 SQLite (LaptopStore)')
+    parser.add_argument('--db', default=DB_PATH, help='SQLite 資料庫路徑 (會覆寫)')
+    parser.add_argument('--processed', default=Schema_Registry.PROCESSED_DIR, help='CSV 所在資料夾')
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS, help='每次 executemany 的筆數')
+    parser.add_argument('--txn-rows', type=int, default=TXN_ROWS, help='每個 transaction 的筆數')
+    parser.add_argument('--show-schema', action='store_true', help='只印出轉換後的 SQLite DDL')
+    args = parser.parse_args()
+
+    if args.show_schema:
+        print(schema_sql())
+        return
+
+    paths = {table: os.path.join(args.processed, Schema_Registry.csv_table_for(table) + '.csv')
+             for table in Schema_Registry.load_order()}
+    missing = [path for path in paths.values() if not os.path.exists(path)]
+    if missing:
+        print("錯誤：找不到 " + '、'.join(os.path.basename(p) for p in missing))
+        sys.exit(1)
+
+    total_start = time.perf_counter()
+    conn = create_database(args.db)
+    print(f"匯入 {args.db} (每批 {args.batch_rows} 筆，每 {args.txn_rows} 筆 COMMIT 一次)")
+    for table, path in paths.items():
+        start = time.perf_counter()
+        try:
+            rows = load_table(conn, table, path, args.batch_rows, args.txn_rows)
+        except sqlite3.IntegrityError as e:
+            # 不留下只匯入一半的資料庫
+            conn.close()
+            os.remove(args.db)
+            print('\n'.join(integrity_report(table, path, e)))
+            print(f"已刪除未完成的 {args.db}；請先修正 CSV (或執行 python Schema_Registry.py 檢查) 再匯入。")
+            sys.exit(1)
+        seconds = time.perf_counter() - start
+        print(f"  {table:<12}: {rows:>10} 筆 {seconds:8.2f} s ({rows / max(seconds, 1e-9):12,.0f} 筆/秒)")
+
+    print("建立索引:")
+    for name, seconds in create_indexes(conn):
+        print(f"  {name:<16}: {seconds:8.2f} s")
+    start = time.perf_counter()
+    conn.execute('ANALYZE')
+    print(f"  {'ANALYZE':<16}: {time.perf_counter() - start:8.2f} s")
+
+    start = time.perf_counter()
+    violations = foreign_key_violations(conn)
+    print(f"外鍵檢查: {time.perf_counter() - start:.2f} s")
+    conn.close()
+    print("-" * 30)
+    print(f"總計 {time.perf_counter() - total_start:.2f} s，資料庫 {os.path.getsize(args.db) / 1024 / 1024:.1f} MB")
+    if violations:
+        for table, count in violations.items():
+            print(f"錯誤：{table} 有 {count} 筆資料違反外鍵。")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -3,148 +3,649 @@ import random
 from faker import Faker
 import numpy as np
 import os
+import sys
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import Identity_Pool
+import Schema_Registry
+import Table_Formats
+import Weighted_Sampler
 
 # --- 參數設定 (Scale Up) ---
 NUM_CUSTOMERS = 1000
 NUM_ORDERS = 5000
+# 規模係數 (類似 TPC-H 的 SF): 顧客 / 訂單數 = 上面的基準量 × SF，
+# 地址數與訂單品項數依各自的分布跟著放大。None = 直接用 --customers / --orders
+SCALE_FACTOR = None
 LOCALE = 'zh_TW'
+RANDOM_SEED = None  # 指定後 random / numpy / Faker 的結果都可重現
+
+# 顧客 / 地址的身分資料來源:
+#   'faker' : 每筆呼叫一次 Faker (保留作為對照組)
+#   'pool'  : 預先從 Faker zh_TW 資料建好的資料池，整批抽樣組合 (見 Identity_Pool.py)
+IDENTITY_MODE = 'pool'
+UNIQUE_EMAILS = True   # Customer.Email 在 DDL 是 UNIQUE
+
+# 訂單生成模式:
+#   'loop'       : 原本的逐筆迴圈 (保留作為對照組)
+#   'vectorized' : 整批用 NumPy 陣列一次產生所有訂單 / 品項，分布與 'loop' 相同
+ORDER_MODE = 'vectorized'
+
+# 平行分片: 1 = 單一行程；> 1 時由主行程先決定每個分片的 ID 區段與亂數串流，再交給 worker 生成
+# (只適用 'pool' 與 'vectorized' 模式；同一組 seed + workers 的輸出完全相同)
+NUM_WORKERS = 1
+
+# 串流模式 (--stream): 每批生成幾筆 (顧客 / 訂單) 就寫出，記憶體與總筆數無關
+STREAM_BATCH = 500_000
+PROGRESS_EVERY = 100_000   # 逐筆迴圈每幾筆回報一次速度
+
+# 訂單日期區間: 最近 6 個月 (Faker 的 'M' 是月、'm' 是分鐘，一個月以 30.42 天計)
+ORDER_DATE_START = '-6M'
+ORDER_WINDOW = pd.Timedelta(days=6 * 30.42)
+# 日期區間的終點 (例如 '2026-01-01')；None = 執行當下，同一個 seed 每次執行的訂單日期都不同
+ANCHOR_DATE = None
+
+CUSTOMER_OUTPUT = '../Data/Processed/customer.csv'
+ADDRESS_OUTPUT = '../Data/Processed/address_book.csv'
+ORDER_OUTPUT = '../Data/Processed/order.csv'
+ORDER_ITEM_OUTPUT = '../Data/Processed/order_item.csv'
+
+payment_methods = ['Credit Card', 'Line Pay', 'Cash on Delivery', 'Apple Pay']
+address_counts, address_count_weights = [1, 2], [0.8, 0.2]
+statuses = ['Processing', 'Shipped', 'Delivered', 'Cancelled']
+status_weights = [0.1, 0.2, 0.6, 0.1]
+item_counts, item_count_weights = [1, 2, 3], [0.6, 0.3, 0.1]
+quantities, quantity_weights = [1, 2], [0.9, 0.1]
+HOT_RATIO, HOT_WEIGHT = 0.1, 10
 
-fake = Faker(LOCALE)
+# 商品熱門度 (只用於 vectorized 模式，見 Weighted_Sampler.py):
+#   'hot'     : 10% 的商品權重 10 倍 (原本的邏輯)
+#   'zipf'    : 商品隨機排名，第 k 名的權重 1 / k^ZIPF_S
+#   'uniform' : 每個商品一樣熱門
+# BRAND_SKEW / PRICE_SKEW 再依品牌倍數、價格高低調整權重 (預設不調整)
+POPULARITY_CURVE = 'hot'
+ZIPF_S = 1.0
+BRAND_SKEW = {}
+PRICE_SKEW = 0.0
+
+def seed_all(seed):
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+        Faker.seed(seed)
+
+def report_progress(label, rows, start):
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"  {label}: 已生成 {rows:,} 筆，{elapsed:.1f} 秒 ({rows / elapsed:,.0f} 筆/秒)")
 
 # --- 1. 讀取 SKU ID ---
-try:
+def load_sku_ids():
     if os.path.exists('../Data/Processed/sku_table_v6.csv'):
-        sku_df = pd.read_csv('../Data/Processed/sku_table_v6.csv')
+        sku_df = Schema_Registry.read_csv('../Data/Processed/sku_table_v6.csv', usecols=['SKU_ID'])
     elif os.path.exists('sku_table_v6.csv'):
-        sku_df = pd.read_csv('sku_table_v6.csv')
+        sku_df = Schema_Registry.read_csv('sku_table_v6.csv', usecols=['SKU_ID'])
     else:
         # Fallback
         if os.path.exists('sku_table_v3.csv'):
              sku_df = pd.read_csv('sku_table_v3.csv')
         else:
              sku_df = pd.read_csv('../Data/Processed/sku_table_v6.csv') # Force check again or error
+    return sku_df['SKU_ID'].tolist()
 
-    valid_sku_ids = sku_df['SKU_ID'].tolist()
-    
-    # 模擬 "熱銷商品"
-    hot_items = random.sample(valid_sku_ids, k=int(len(valid_sku_ids) * 0.1))
-    
-    print(f"成功讀取 SKU 表，共有 {len(valid_sku_ids)} 種商品。")
-    print(f"已標記 {len(hot_items)} 種熱銷商品 (權重加倍)。")
-    
-except FileNotFoundError:
-    print("錯誤：找不到 sku_table_v6.csv 或 sku_table_v3.csv。")
-    exit()
+def load_sku_catalog(with_attributes=False):
+    # 品牌 / 價格偏好需要 Price 與 BrandName (從 Product 表對應)；不需要時只有 SKU_ID
+    if not with_attributes:
+        return pd.DataFrame({'SKU_ID': load_sku_ids()})
+    sku_df = Schema_Registry.read_csv('../Data/Processed/sku_table_v6.csv', usecols=['SKU_ID', 'ProductID', 'Price'])
+    product_df = Schema_Registry.read_csv('../Data/Processed/product_table.csv', usecols=['ProductID', 'BrandName'])
+    return sku_df.merge(product_df, on='ProductID', how='left')
 
 # --- 2. 生成顧客資料 (Customer) ---
-print(f"正在生成 {NUM_CUSTOMERS} 位顧客資料...")
-customers = []
-for i in range(1, NUM_CUSTOMERS + 1):
-    customers.append({
-        'CustomerID': i,
-        'Email': fake.email(),
-        'Password': fake.password(length=10),
-        'Name': fake.name(),
-        'Phone': fake.phone_number()
-    })
-customer_df = pd.DataFrame(customers)
+def generate_customers(fake, num_customers=NUM_CUSTOMERS, unique_emails=False):
+    print(f"正在生成 {num_customers} 位顧客資料...")
+    customers = []
+    for i in range(1, num_customers + 1):
+        customers.append({
+            'CustomerID': i,
+            'Email': fake.email(),
+            'Password': fake.password(length=10),
+            'Name': fake.name(),
+            'Phone': fake.phone_number()
+        })
+    customer_df = pd.DataFrame(customers)
+    if unique_emails:
+        customer_df['Email'] = Identity_Pool.make_unique(customer_df['Email'])
+    return customer_df
 
 # --- 3. 生成地址簿 (AddressBook) ---
-print("正在生成地址資料...")
-addresses = []
-address_id_counter = 1
-customer_address_map = {} 
-address_payment_map = {} # [New] Map AddressID -> PaymentMethod
+def generate_addresses(fake, customer_df):
+    print("正在生成地址資料...")
+    addresses = []
+    address_id_counter = 1
 
-payment_methods = ['Credit Card', 'Line Pay', 'Cash on Delivery', 'Apple Pay']
+    for cust_id in customer_df['CustomerID']:
+        # 每個顧客隨機生成 1~2 個地址
+        num_addr = random.choices(address_counts, weights=address_count_weights)[0]
 
-for cust_id in customer_df['CustomerID']:
-    # 每個顧客隨機生成 1~2 個地址
-    num_addr = random.choices([1, 2], weights=[0.8, 0.2])[0]
-    customer_addr_ids = []
-    
-    for _ in range(num_addr):
-        pm = random.choice(payment_methods) # Randomly assign one here
-        
-        addresses.append({
-            'AddressID': address_id_counter,
-            'CustomerID': cust_id,
-            'ReceiverName': fake.name(),
-            'Phone': fake.phone_number(),
-            'Address': fake.address(),
-            'PaymentMethod': pm
-        })
-        
-        # Store for lookup later
-        address_payment_map[address_id_counter] = pm
-        
-        customer_addr_ids.append(address_id_counter)
-        address_id_counter += 1
-    
-    customer_address_map[cust_id] = customer_addr_ids
+        for _ in range(num_addr):
+            pm = random.choice(payment_methods) # Randomly assign one here
 
-address_df = pd.DataFrame(addresses)
+            addresses.append({
+                'AddressID': address_id_counter,
+                'CustomerID': cust_id,
+                'ReceiverName': fake.name(),
+                'Phone': fake.phone_number(),
+                'Address': fake.address(),
+                'PaymentMethod': pm
+            })
+            address_id_counter += 1
 
-# --- 4. 生成訂單 (Order) ---
-print(f"正在生成 {NUM_ORDERS} 筆訂單 (這可能需要幾秒鐘)...")
-orders = []
-order_items = []
-order_item_id_counter = 1
+    return pd.DataFrame(addresses)
 
-statuses = ['Processing', 'Shipped', 'Delivered', 'Cancelled']
-status_weights = [0.1, 0.2, 0.6, 0.1]
+# --- 2b / 3b. 用身分資料池整批生成顧客與地址 ---
+def generate_customers_pool(pool, rng, num_customers=NUM_CUSTOMERS, unique_emails=UNIQUE_EMAILS, id_start=1, verbose=True):
+    if verbose:
+        print(f"正在生成 {num_customers} 位顧客資料 (資料池)...")
+    return pd.DataFrame({
+        'CustomerID': np.arange(id_start, id_start + num_customers),
+        'Email': pool.emails(rng, num_customers, unique=unique_emails),
+        'Password': pool.passwords(rng, num_customers),
+        'Name': pool.names(rng, num_customers),
+        'Phone': pool.phones(rng, num_customers),
+    })
 
-# 權重池預處理
-sku_weights = [10 if sku in hot_items else 1 for sku in valid_sku_ids]
-sku_array = np.array(valid_sku_ids)
-sku_probs = np.array(sku_weights) / sum(sku_weights)
-
-for order_id in range(1, NUM_ORDERS + 1):
-    cust_id = random.choice(customer_df['CustomerID'])
-    addr_id = random.choice(customer_address_map[cust_id])
-    
-    # [New] Lookup Payment Method
-    payment_method = address_payment_map[addr_id]
-    
-    order_date = fake.date_time_between(start_date='-6m', end_date='now')
-    
-    orders.append({
-        'Order_ID': order_id,
-        'Customer_ID': cust_id,
-        'Address_ID': addr_id,
-        'OrderDate': order_date,
-        'PaymentMethod': payment_method, # [New] Added Field
-        'Status': random.choices(statuses, weights=status_weights)[0]
+def generate_addresses_pool(pool, rng, customer_df, num_addr=None, id_start=1, verbose=True):
+    if verbose:
+        print("正在生成地址資料 (資料池)...")
+    # 每個顧客 1~2 個地址 (分片模式由主行程先抽好傳進來)
+    if num_addr is None:
+        num_addr = draw_address_counts(rng, len(customer_df))
+    n = int(num_addr.sum())
+    return pd.DataFrame({
+        'AddressID': np.arange(id_start, id_start + n),
+        'CustomerID': np.repeat(customer_df['CustomerID'].to_numpy(), num_addr),
+        'ReceiverName': pool.names(rng, n),
+        'Phone': pool.phones(rng, n),
+        'Address': pool.addresses(rng, n),
+        'PaymentMethod': np.asarray(payment_methods)[rng.integers(0, len(payment_methods), n)],
     })
-    
-    # --- 5. 生成訂單品項 (OrderItem) ---
-    num_items = random.choices([1, 2, 3], weights=[0.6, 0.3, 0.1])[0]
-    selected_skus = np.random.choice(sku_array, size=num_items, replace=False, p=sku_probs)
-    
-    for sku_id in selected_skus:
-        order_items.append({
-            'OrderItemID': order_item_id_counter,
-            'OrderID': order_id,
-            'SKUID': sku_id,
-            'Quantity': random.choices([1, 2], weights=[0.9, 0.1])[0]
+
+# --- 4. 生成訂單 (Order) ---
+def generate_orders(fake, valid_sku_ids, customer_df, address_df, num_orders=NUM_ORDERS, now=None):
+    # 模擬 "熱銷商品"
+    hot_items = random.sample(valid_sku_ids, k=int(len(valid_sku_ids) * HOT_RATIO))
+    print(f"已標記 {len(hot_items)} 種熱銷商品 (權重加倍)。")
+
+    # 顧客 -> 地址清單、地址 -> 付款方式 (訂單階段可單獨執行，所以從地址簿重建)
+    customer_address_map = address_df.groupby('CustomerID', sort=False)['AddressID'].apply(list).to_dict()
+    address_payment_map = dict(zip(address_df['AddressID'], address_df['PaymentMethod'])) # [New] Map AddressID -> PaymentMethod
+
+    print(f"正在生成 {num_orders} 筆訂單...")
+    start = time.perf_counter()
+    orders = []
+    order_items = []
+    order_item_id_counter = 1
+
+    # 權重池預處理
+    hot_set = set(hot_items)
+    sku_weights = [HOT_WEIGHT if sku in hot_set else 1 for sku in valid_sku_ids]
+    sku_array = np.array(valid_sku_ids)
+    sku_probs = np.array(sku_weights) / sum(sku_weights)
+
+    for order_id in range(1, num_orders + 1):
+        cust_id = random.choice(customer_df['CustomerID'])
+        addr_id = random.choice(customer_address_map[cust_id])
+
+        # [New] Lookup Payment Method
+        payment_method = address_payment_map[addr_id]
+
+        if now is None:
+            order_date = fake.date_time_between(start_date=ORDER_DATE_START, end_date='now')
+        else:
+            order_date = fake.date_time_between(start_date=now - ORDER_WINDOW, end_date=now)
+
+        orders.append({
+            'Order_ID': order_id,
+            'Customer_ID': cust_id,
+            'Address_ID': addr_id,
+            'OrderDate': order_date,
+            'PaymentMethod': payment_method, # [New] Added Field
+            'Status': random.choices(statuses, weights=status_weights)[0]
         })
-        order_item_id_counter += 1
-
-order_df = pd.DataFrame(orders)
-order_item_df = pd.DataFrame(order_items)
-
-# --- 6. 輸出 ---
-print("-" * 30)
-customer_df.to_csv('../Data/Processed/customer.csv', index=False, encoding='utf-8-sig')
-address_df.to_csv('../Data/Processed/address_book.csv', index=False, encoding='utf-8-sig')
-order_df.to_csv('../Data/Processed/order.csv', index=False, encoding='utf-8-sig')
-order_item_df.to_csv('../Data/Processed/order_item.csv', index=False, encoding='utf-8-sig')
-
-print(f"生成完畢！數據統計：")
-print(f"Customer:   {len(customer_df)} 筆")
-print(f"Address:    {len(address_df)} 筆")
-print(f"Order:      {len(order_df)} 筆")
-print(f"OrderItem:  {len(order_item_df)} 筆")
-print("-" * 30)
-print("前 5 筆訂單預覽 (含 PaymentMethod):")
-print(order_df[['Order_ID', 'Address_ID', 'PaymentMethod']].head())
+
+        # --- 5. 生成訂單品項 (OrderItem) ---
+        num_items = random.choices(item_counts, weights=item_count_weights)[0]
+        selected_skus = np.random.choice(sku_array, size=num_items, replace=False, p=sku_probs)
+
+        for sku_id in selected_skus:
+            order_items.append({
+                'OrderItemID': order_item_id_counter,
+                'OrderID': order_id,
+                'SKUID': sku_id,
+                'Quantity': random.choices(quantities, weights=quantity_weights)[0]
+            })
+            order_item_id_counter += 1
+
+        if order_id % PROGRESS_EVERY == 0:
+            report_progress('Order', order_id, start)
+
+    report_progress('Order', num_orders, start)
+    return pd.DataFrame(orders), pd.DataFrame(order_items)
+
+# --- 4b. 批次生成訂單 (Vectorized) ---
+# 每個欄位都是一次抽整個陣列，不再逐筆呼叫 random / Faker:
+#   顧客: 均勻抽樣；地址: 該顧客的地址中均勻抽一個 (地址簿依 CustomerID 排序後用 searchsorted 找區段)
+#   日期: 在 [now - 6 個月, now] 均勻抽 (微秒)；狀態 / 品項數 / 數量: 依權重查累積機率表
+#   SKU: 依熱銷權重抽，同一張訂單內不重複 —— 撞到同單已抽過的 SKU 就只重抽那幾格，
+#        這跟 np.random.choice(replace=False, p=...) 的「逐一抽出、剩下的重新正規化」分布相同
+def draw(rng, weights, size):
+    cdf = np.cumsum(weights, dtype=np.float64)
+    return np.searchsorted(cdf / cdf[-1], rng.random(size), side='right')
+
+def address_ranges(customer_ids, address_df):
+    # 回傳地址簿 (依 CustomerID 穩定排序) 以及每位顧客的地址區段 [start, start + count)
+    addresses = address_df.sort_values('CustomerID', kind='stable')
+    addr_customer = addresses['CustomerID'].to_numpy()
+    start = np.searchsorted(addr_customer, customer_ids, side='left')
+    count = np.searchsorted(addr_customer, customer_ids, side='right') - start
+    if (count == 0).any():
+        raise ValueError("有顧客沒有任何地址，無法生成訂單。")
+    return addresses, start, count
+
+def sample_order_skus(rng, sku_sampler, num_items, max_items):
+    # (訂單數, max_items) 的矩陣，超過該訂單品項數的格子不使用；每格用 alias table 抽，O(1)
+    n = len(num_items)
+    # 同一張訂單的品項不重複: 抽得到的商品比品項數少時下面的重抽永遠不會結束
+    needed = int(num_items.max()) if n else 0
+    available = int(np.count_nonzero(sku_sampler.probabilities() > 0))
+    if needed > available:
+        raise ValueError(f"只有 {available} 種商品的權重大於 0，不夠組成 {needed} 個不重複品項的訂單。")
+    used = np.arange(max_items) < num_items[:, None]
+    skus = sku_sampler.sample(rng, (n, max_items))
+    for j in range(1, max_items):
+        while True:
+            clash = used[:, j] & (skus[:, j:j + 1] == skus[:, :j]).any(axis=1)
+            if not clash.any():
+                break
+            skus[clash, j] = sku_sampler.sample(rng, int(clash.sum()))
+    return skus[used]
+
+def draw_address_counts(rng, num_customers):
+    return np.asarray(address_counts)[draw(rng, address_count_weights, num_customers)]
+
+def draw_item_counts(rng, num_orders):
+    return np.asarray(item_counts)[draw(rng, item_count_weights, num_orders)]
+
+def build_sku_sampler(rng, catalog, curve=POPULARITY_CURVE, zipf_s=ZIPF_S, brand_skew=BRAND_SKEW, price_skew=PRICE_SKEW):
+    # catalog: SKU_ID (+ BrandName / Price，有品牌 / 價格偏好時才需要)，列順序即抽出的索引
+    weights = Weighted_Sampler.popularity_weights(rng, len(catalog), curve, zipf_s, HOT_RATIO, HOT_WEIGHT)
+    weights = Weighted_Sampler.skew_weights(weights, catalog.get('BrandName'), brand_skew,
+                                            catalog.get('Price'), price_skew)
+    if curve == 'hot':
+        print(f"已標記 {int(len(catalog) * HOT_RATIO)} 種熱銷商品 (權重加倍)。")
+    else:
+        print(f"商品熱門度: {curve}，前 1% 的商品占 {Weighted_Sampler.top_share(weights):.1%} 的抽樣機率。")
+    return Weighted_Sampler.AliasTable(weights)
+
+def generate_orders_vec(rng, valid_sku_ids, customer_df, address_df, num_orders=NUM_ORDERS,
+                        order_id_start=1, item_id_start=1, now=None, sku_sampler=None, num_items=None, verbose=True):
+    # sku_sampler / num_items 為 None 時在這裡抽；分片模式由主行程抽好，所有分片共用同一組商品熱門度
+    sku_array = np.asarray(valid_sku_ids)
+    if sku_sampler is None:
+        sku_sampler = build_sku_sampler(rng, pd.DataFrame({'SKU_ID': sku_array}))
+    if num_items is not None:
+        num_orders = len(num_items)
+    if verbose:
+        print(f"正在批次生成 {num_orders} 筆訂單...")
+
+    customer_ids = customer_df['CustomerID'].to_numpy()
+    addresses, addr_start, addr_count = address_ranges(customer_ids, address_df)
+
+    # 顧客 -> 地址 -> 付款方式
+    cust_idx = rng.integers(0, len(customer_ids), num_orders)
+    addr_pos = addr_start[cust_idx] + (rng.random(num_orders) * addr_count[cust_idx]).astype(np.int64)
+    payment = pd.Categorical(addresses['PaymentMethod'].to_numpy()[addr_pos], categories=payment_methods)
+
+    # 訂單日期 (微秒精度，與 Faker 的輸出相同)
+    end = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    end_us = end.value // 1000
+    start_us = end_us - ORDER_WINDOW.value // 1000
+    order_dates = rng.integers(start_us, end_us + 1, num_orders).astype('datetime64[us]')
+
+    order_ids = np.arange(order_id_start, order_id_start + num_orders)
+    order_df = pd.DataFrame({
+        'Order_ID': order_ids,
+        'Customer_ID': customer_ids[cust_idx],
+        'Address_ID': addresses['AddressID'].to_numpy()[addr_pos],
+        'OrderDate': order_dates,
+        'PaymentMethod': payment,
+        'Status': pd.Categorical.from_codes(draw(rng, status_weights, num_orders), categories=statuses),
+    })
+
+    # --- 5b. 訂單品項 ---
+    if num_items is None:
+        num_items = draw_item_counts(rng, num_orders)
+    sku_idx = sample_order_skus(rng, sku_sampler, num_items, max(item_counts))
+    total_items = len(sku_idx)
+    order_item_df = pd.DataFrame({
+        'OrderItemID': np.arange(item_id_start, item_id_start + total_items),
+        'OrderID': np.repeat(order_ids, num_items),
+        'SKUID': sku_array[sku_idx],
+        'Quantity': np.asarray(quantities)[draw(rng, quantity_weights, total_items)],
+    })
+    return order_df, order_item_df
+
+# --- 5c. 平行分片 (Sharded) ---
+# ID 是連續編號，所以「每個分片有幾筆」必須在開工前就知道:
+#   主行程先用 planner 串流抽出每位顧客的地址數 / 每張訂單的品項數 (很便宜)，
+#   用前綴和算出每個分片的 CustomerID / AddressID / Order_ID / OrderItemID 起點，區段互不重疊；
+#   其餘欄位由各分片用自己的亂數串流生成，合併時依分片順序接起來。
+# 亂數串流: SeedSequence(entropy, spawn_key=(part, shard))，planner 用 spawn_key=(part,)，
+# 跟 ETL_SKU_Table_V6 的 row_random 一樣，同一組 seed + workers 的結果與執行順序無關。
+PART_CUSTOMERS, PART_ORDERS = 0, 1
+
+def seed_entropy(seed):
+    return np.random.SeedSequence(seed).entropy
+
+def shard_rng(entropy, part, shard=None):
+    spawn_key = (part,) if shard is None else (part, shard)
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=spawn_key))
+
+def shard_bounds(total, shards):
+    # 把 [0, total) 切成 shards 段 (前後相差最多 1 筆)
+    return np.linspace(0, total, shards + 1).astype(np.int64)
+
+def batch_bounds(total, batch_size):
+    # 串流模式: 每 batch_size 筆一段 (最後一段可能較短)
+    return np.append(np.arange(0, total, batch_size), total).astype(np.int64)
+
+def iter_shards(func, tasks, workers):
+    """依 tasks 的順序產出結果；tasks 可以是 generator，同時最多只有 workers * 2 個分片在處理中。"""
+    if workers <= 1:
+        for task in tasks:
+            yield func(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(func, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _customer_shard(args):
+    entropy, shard, pool, customer_start, num_addr, address_start = args
+    rng = shard_rng(entropy, PART_CUSTOMERS, shard)
+    # Email 去重要看全部分片，由主行程合併時再做
+    customer_df = generate_customers_pool(pool, rng, len(num_addr), unique_emails=False,
+                                          id_start=customer_start, verbose=False)
+    address_df = generate_addresses_pool(pool, rng, customer_df, num_addr=num_addr,
+                                         id_start=address_start, verbose=False)
+    return customer_df, address_df
+
+def customer_tasks(entropy, bounds):
+    # planner 依分片順序抽地址數 (一次只抽一個分片的量)，累加出每個分片的 AddressID 起點
+    planner = shard_rng(entropy, PART_CUSTOMERS)
+    # 資料池由主行程載入一次 (需要時建立快取)，隨 task 傳給各分片，worker 不碰快取檔
+    pool = Identity_Pool.load_pools(LOCALE)
+    address_start = 1
+    for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        num_addr = draw_address_counts(planner, int(hi - lo))
+        yield (entropy, i, pool, int(lo) + 1, num_addr, address_start)
+        address_start += int(num_addr.sum())
+
+def iter_customer_shards(seed, bounds, workers=NUM_WORKERS):
+    return iter_shards(_customer_shard, customer_tasks(seed_entropy(seed), bounds), workers)
+
+def generate_customers_sharded(seed, num_customers=NUM_CUSTOMERS, unique_emails=UNIQUE_EMAILS, workers=NUM_WORKERS):
+    print(f"正在以 {workers} 個分片生成 {num_customers} 位顧客資料...")
+    results = list(iter_customer_shards(seed, shard_bounds(num_customers, workers), workers))
+    customer_df = pd.concat([c for c, _ in results], ignore_index=True)
+    address_df = pd.concat([a for _, a in results], ignore_index=True)
+    if unique_emails:
+        customer_df['Email'] = Identity_Pool.make_unique(customer_df['Email'].to_numpy())
+    return customer_df, address_df
+
+def _order_shard(args):
+    entropy, shard, sku_array, sku_sampler, customer_df, address_df, num_items, order_start, item_start, now = args
+    rng = shard_rng(entropy, PART_ORDERS, shard)
+    return generate_orders_vec(rng, sku_array, customer_df, address_df, order_id_start=order_start,
+                               item_id_start=item_start, now=now, sku_sampler=sku_sampler,
+                               num_items=num_items, verbose=False)
+
+def order_tasks(entropy, catalog, customer_df, address_df, bounds, popularity, now=None):
+    # 商品熱門度 (alias table) 由 planner 建一次，所有分片共用；品項數依分片順序抽，累加出 OrderItemID 起點
+    planner = shard_rng(entropy, PART_ORDERS)
+    sku_array = catalog['SKU_ID'].to_numpy()
+    sku_sampler = build_sku_sampler(planner, catalog, **popularity)
+    # 日期區間的終點只取一次，各分片共用
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    # 分片只需要 ID 與付款方式，不必把整張地址簿傳給每個 worker
+    customer_df = customer_df[['CustomerID']]
+    address_df = address_df[['AddressID', 'CustomerID', 'PaymentMethod']]
+    item_start = 1
+    for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        num_items = draw_item_counts(planner, int(hi - lo))
+        yield (entropy, i, sku_array, sku_sampler, customer_df, address_df, num_items, int(lo) + 1, item_start, now)
+        item_start += int(num_items.sum())
+
+def iter_order_shards(seed, catalog, customer_df, address_df, bounds, workers=NUM_WORKERS, popularity=None, now=None):
+    tasks = order_tasks(seed_entropy(seed), catalog, customer_df, address_df, bounds, popularity or {}, now)
+    return iter_shards(_order_shard, tasks, workers)
+
+def generate_orders_sharded(seed, catalog, customer_df, address_df, num_orders=NUM_ORDERS, workers=NUM_WORKERS,
+                            popularity=None, now=None):
+    print(f"正在以 {workers} 個分片生成 {num_orders} 筆訂單...")
+    results = list(iter_order_shards(seed, catalog, customer_df, address_df,
+                                     shard_bounds(num_orders, workers), workers, popularity, now))
+    order_df = pd.concat([o for o, _ in results], ignore_index=True)
+    order_item_df = pd.concat([i for _, i in results], ignore_index=True)
+    return order_df, order_item_df
+
+# --- 5d. 串流輸出 (Streaming) ---
+# 一次只生成 batch_size 筆 (顧客或訂單)，轉型後直接接在 CSV 後面，記憶體只跟 batch_size 有關，
+# 與總筆數無關 (1 億筆訂單品項也一樣)。批次就是 5c 的分片，所以 --workers 可以一起用。
+# 唯一會隨資料量成長的是:
+#   - Email 去重的計數表 (大小 = 不同的 Email 數，跟顧客數同級)
+#   - 訂單要用的顧客 ID / 地址簿 (AddressID、CustomerID、PaymentMethod 三欄)
+# 輸出只由 seed 與 batch_size 決定，與 workers 無關。
+def open_csv(path):
+    # 只開一次檔案: 用 utf-8-sig 開啟只會在檔頭寫一次 BOM
+    return open(path, 'w', encoding='utf-8-sig', newline='')
+
+def stream_customers(seed, num_customers=NUM_CUSTOMERS, unique_emails=UNIQUE_EMAILS,
+                     workers=NUM_WORKERS, batch_size=STREAM_BATCH):
+    """分批生成並寫出 customer / address_book，回傳訂單需要的精簡欄位與筆數。"""
+    print(f"正在串流生成 {num_customers} 位顧客資料 (每批 {batch_size} 筆)...")
+    email_counts = {} if unique_emails else None
+    customer_ids, addresses = [], []
+    num_addresses = 0
+    start = time.perf_counter()
+    with open_csv(CUSTOMER_OUTPUT) as cf, open_csv(ADDRESS_OUTPUT) as af:
+        shards = iter_customer_shards(seed, batch_bounds(num_customers, batch_size), workers)
+        for i, (customer_df, address_df) in enumerate(shards):
+            if unique_emails:
+                customer_df['Email'] = Identity_Pool.make_unique(customer_df['Email'].to_numpy(), email_counts)
+            Schema_Registry.cast(customer_df, 'customer').to_csv(cf, index=False, header=(i == 0))
+            Schema_Registry.cast(address_df, 'address_book').to_csv(af, index=False, header=(i == 0))
+            customer_ids.append(customer_df['CustomerID'].to_numpy())
+            addresses.append(address_df[['AddressID', 'CustomerID', 'PaymentMethod']].astype(
+                {'PaymentMethod': pd.CategoricalDtype(payment_methods)}))
+            num_addresses += len(address_df)
+            report_progress('Customer', int(customer_df['CustomerID'].iloc[-1]), start)
+
+    customer_df = pd.DataFrame({'CustomerID': np.concatenate(customer_ids)})
+    address_df = pd.concat(addresses, ignore_index=True)
+    return customer_df, address_df, num_addresses
+
+def stream_orders(seed, catalog, customer_df, address_df, num_orders=NUM_ORDERS,
+                  workers=NUM_WORKERS, batch_size=STREAM_BATCH, popularity=None, now=None):
+    """分批生成並寫出 order / order_item，回傳 (訂單數, 品項數, 第一批的前 5 筆)。"""
+    print(f"正在串流生成 {num_orders} 筆訂單 (每批 {batch_size} 筆)...")
+    num_order_items = 0
+    preview = None
+    start = time.perf_counter()
+    with open_csv(ORDER_OUTPUT) as of, open_csv(ORDER_ITEM_OUTPUT) as itf:
+        shards = iter_order_shards(seed, catalog, customer_df, address_df,
+                                   batch_bounds(num_orders, batch_size), workers, popularity, now)
+        for i, (order_df, order_item_df) in enumerate(shards):
+            order_df = Schema_Registry.cast(order_df, 'order')
+            order_df.to_csv(of, index=False, header=(i == 0))
+            Schema_Registry.cast(order_item_df, 'order_item').to_csv(itf, index=False, header=(i == 0))
+            num_order_items += len(order_item_df)
+            if preview is None:
+                preview = order_df.head()
+            report_progress('OrderItem', num_order_items, start)
+    return num_orders, num_order_items, preview
+
+def brand_factor(text):
+    # --brand-skew 的參數格式: 品牌=倍數 (例如 Apple=2)
+    brand, _, factor = text.rpartition('=')
+    if not brand:
+        raise argparse.ArgumentTypeError(f"格式應為 品牌=倍數: {text}")
+    return brand, float(factor)
+
+def scaled_counts(scale_factor):
+    # 顧客 / 訂單數依 SF 放大；地址 / 品項數為期望值 (實際數量依分布抽)
+    num_customers = max(1, round(NUM_CUSTOMERS * scale_factor))
+    num_orders = max(1, round(NUM_ORDERS * scale_factor))
+    per_customer = np.dot(address_counts, address_count_weights) / np.sum(address_count_weights)
+    per_order = np.dot(item_counts, item_count_weights) / np.sum(item_count_weights)
+    print(f"規模係數 SF={scale_factor:g}: 顧客 {num_customers} 位、訂單 {num_orders} 筆 "
+          f"(預期地址約 {num_customers * per_customer:.0f} 筆、品項約 {num_orders * per_order:.0f} 筆)")
+    return num_customers, num_orders
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Data Generator (V3)')
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED, help='亂數種子')
+    parser.add_argument('--columnar', nargs='*', choices=Table_Formats.COLUMNAR_FORMATS, default=[], help='另外輸出帶型別的 Parquet / Feather')
+    parser.add_argument('--identity', choices=['faker', 'pool'], default=IDENTITY_MODE, help='顧客 / 地址的身分資料來源')
+    parser.add_argument('--unique-emails', action=argparse.BooleanOptionalAction, default=UNIQUE_EMAILS, help='保證 Email 不重複')
+    parser.add_argument('--customers', type=int, default=NUM_CUSTOMERS, help='顧客人數')
+    parser.add_argument('--order-mode', choices=['loop', 'vectorized'], default=ORDER_MODE, help='訂單生成模式')
+    parser.add_argument('--orders', type=int, default=NUM_ORDERS, help='訂單筆數')
+    parser.add_argument('--workers', type=int, default=NUM_WORKERS, help='平行分片數 (1 = 不分片)')
+    parser.add_argument('--stream', action='store_true', help='串流模式: 分批生成並寫出，記憶體用量固定')
+    parser.add_argument('--batch-size', type=int, default=STREAM_BATCH, help='串流模式每批的顧客 / 訂單數')
+    parser.add_argument('--scale-factor', type=float, default=SCALE_FACTOR, help='規模係數: 顧客 / 訂單數 = 基準量 × SF (會覆蓋 --customers / --orders)')
+    parser.add_argument('--popularity', choices=Weighted_Sampler.CURVES, default=POPULARITY_CURVE, help='商品熱門度曲線 (vectorized 模式)')
+    parser.add_argument('--zipf-s', type=float, default=ZIPF_S, help='Zipf 曲線的指數')
+    parser.add_argument('--brand-skew', type=brand_factor, nargs='*', default=list(BRAND_SKEW.items()), help='品牌偏好，例如 Apple=2 Acer=0.5')
+    parser.add_argument('--price-skew', type=float, default=PRICE_SKEW, help='價格偏好: > 0 偏好便宜的商品，< 0 偏好貴的')
+    parser.add_argument('--anchor-date', type=pd.Timestamp, default=ANCHOR_DATE, help='訂單日期區間的終點 (例如 2026-01-01)；不指定則為執行當下')
+    # customers 不需要 SKU 表，可以跟 SKU ETL 同時跑；orders 需要 SKU 表與 customers 的輸出
+    parser.add_argument('--part', choices=['all', 'customers', 'orders'], default='all', help='只生成顧客 / 地址，或只生成訂單')
+    args = parser.parse_args()
+
+    if args.scale_factor is not None:
+        args.customers, args.orders = scaled_counts(args.scale_factor)
+    popularity = {'curve': args.popularity, 'zipf_s': args.zipf_s,
+                  'brand_skew': dict(args.brand_skew), 'price_skew': args.price_skew}
+
+    fake = Faker(LOCALE)
+    customer_df = address_df = order_df = order_item_df = None
+    # 串流模式只支援資料池 + 批次訂單 (逐筆的 Faker / 迴圈版本本來就要整批放在記憶體)
+    stream_customers_part = args.stream and args.identity == 'pool'
+    stream_orders_part = args.stream and args.order_mode == 'vectorized'
+    if args.stream and not (stream_customers_part and stream_orders_part):
+        print("注意：faker / loop 模式不支援串流，這部分改為整批生成。")
+
+    if args.part in ('all', 'customers'):
+        if args.workers > 1 and args.identity != 'pool':
+            print("注意：faker 模式不支援分片，顧客 / 地址改為單一行程生成。")
+        if stream_customers_part:
+            customer_df, address_df, num_addresses = stream_customers(args.seed, args.customers, args.unique_emails,
+                                                                      args.workers, args.batch_size)
+        elif args.workers > 1 and args.identity == 'pool':
+            customer_df, address_df = generate_customers_sharded(args.seed, args.customers, args.unique_emails, args.workers)
+        elif args.identity == 'pool':
+            pool = Identity_Pool.load_pools(LOCALE)
+            rng = np.random.default_rng(args.seed)
+            customer_df = generate_customers_pool(pool, rng, args.customers, args.unique_emails)
+            address_df = generate_addresses_pool(pool, rng, customer_df)
+        else:
+            seed_all(args.seed)
+            customer_df = generate_customers(fake, args.customers, args.unique_emails)
+            address_df = generate_addresses(fake, customer_df)
+
+    if args.part in ('all', 'orders'):
+        try:
+            catalog = load_sku_catalog(with_attributes=bool(popularity['brand_skew'] or popularity['price_skew']))
+            valid_sku_ids = catalog['SKU_ID'].tolist()
+            print(f"成功讀取 SKU 表，共有 {len(valid_sku_ids)} 種商品。")
+        except FileNotFoundError:
+            print("錯誤：找不到 sku_table_v6.csv 或 sku_table_v3.csv (品牌偏好另外需要 product_table.csv)。")
+            sys.exit(1)
+        if customer_df is None:
+            try:
+                customer_df = Schema_Registry.read_csv(CUSTOMER_OUTPUT, usecols=['CustomerID'])
+                address_df = Schema_Registry.read_csv(ADDRESS_OUTPUT, usecols=['AddressID', 'CustomerID', 'PaymentMethod'])
+            except FileNotFoundError:
+                print("錯誤：找不到 customer.csv 或 address_book.csv，請先執行 --part customers。")
+                sys.exit(1)
+        # 訂單用另一個種子，單獨執行 orders 與 all 的結果相同
+        order_seed = None if args.seed is None else args.seed + 1
+        if args.workers > 1 and args.order_mode != 'vectorized':
+            print("注意：loop 模式不支援分片，訂單改為單一行程生成。")
+        if args.order_mode != 'vectorized' and (args.popularity != 'hot' or args.brand_skew or args.price_skew):
+            print("注意：loop 模式只支援原本的熱銷商品邏輯，忽略熱門度設定。")
+        now = args.anchor_date
+        if now is None and args.seed is not None:
+            print("注意：未指定 --anchor-date，訂單日期以執行當下為終點，同一個 seed 的結果會隨執行時間改變。")
+        if stream_orders_part:
+            num_orders, num_order_items, preview = stream_orders(order_seed, catalog, customer_df, address_df,
+                                                                 args.orders, args.workers, args.batch_size, popularity, now)
+        elif args.workers > 1 and args.order_mode == 'vectorized':
+            order_df, order_item_df = generate_orders_sharded(order_seed, catalog, customer_df, address_df,
+                                                              args.orders, args.workers, popularity, now)
+        elif args.order_mode == 'vectorized':
+            rng = np.random.default_rng(order_seed)
+            sku_sampler = build_sku_sampler(rng, catalog, **popularity)
+            order_df, order_item_df = generate_orders_vec(rng, valid_sku_ids, customer_df, address_df, args.orders,
+                                                          now=now, sku_sampler=sku_sampler)
+        else:
+            seed_all(order_seed)
+            order_df, order_item_df = generate_orders(fake, valid_sku_ids, customer_df, address_df, args.orders,
+                                                      None if now is None else now.to_pydatetime())
+
+    # --- 6. 輸出 (串流模式已經邊生成邊寫出，這裡只補欄式檔) ---
+    print("-" * 30)
+    print(f"生成完畢！數據統計：")
+    if args.part in ('all', 'customers'):
+        if stream_customers_part:
+            for path in (CUSTOMER_OUTPUT, ADDRESS_OUTPUT):
+                Table_Formats.convert_csv(path, args.columnar)
+        else:
+            customer_df = Schema_Registry.cast(customer_df, 'customer')
+            address_df = Schema_Registry.cast(address_df, 'address_book')
+            customer_df.to_csv(CUSTOMER_OUTPUT, index=False, encoding='utf-8-sig')
+            address_df.to_csv(ADDRESS_OUTPUT, index=False, encoding='utf-8-sig')
+            Table_Formats.write_columnar(customer_df, CUSTOMER_OUTPUT, args.columnar)
+            Table_Formats.write_columnar(address_df, ADDRESS_OUTPUT, args.columnar)
+            num_addresses = len(address_df)
+        print(f"Customer:   {len(customer_df)} 筆")
+        print(f"Address:    {num_addresses} 筆")
+    if args.part in ('all', 'orders'):
+        if stream_orders_part:
+            for path in (ORDER_OUTPUT, ORDER_ITEM_OUTPUT):
+                Table_Formats.convert_csv(path, args.columnar)
+        else:
+            order_df = Schema_Registry.cast(order_df, 'order')
+            order_item_df = Schema_Registry.cast(order_item_df, 'order_item')
+            order_df.to_csv(ORDER_OUTPUT, index=False, encoding='utf-8-sig')
+            order_item_df.to_csv(ORDER_ITEM_OUTPUT, index=False, encoding='utf-8-sig')
+            Table_Formats.write_columnar(order_df, ORDER_OUTPUT, args.columnar)
+            Table_Formats.write_columnar(order_item_df, ORDER_ITEM_OUTPUT, args.columnar)
+            num_orders, num_order_items, preview = len(order_df), len(order_item_df), order_df.head()
+        print(f"Order:      {num_orders} 筆")
+        print(f"OrderItem:  {num_order_items} 筆")
+        print("-" * 30)
+        print("前 5 筆訂單預覽 (含 PaymentMethod):")
+        print(preview[['Order_ID', 'Address_ID', 'PaymentMethod']])
+
+if __name__ == '__main__':
+    main()
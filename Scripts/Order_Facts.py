@@ -0,0 +1,306 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import sys
+import time
+
+import Schema_Registry
+import Table_Formats
+
+# --- 訂單明細事實表 (去正規化) ---
+# 報表的問題 (各品牌營收、各付款方式的平均客單價、已送達訂單的顯卡分布…) 每次都要
+# Order / OrderItem / SKU / Product 四張表 JOIN。這裡先建一張「一列 = 一個訂單品項」的寬表:
+#   - 訂單欄位: OrderID / OrderDate / CustomerID / PaymentMethod / Status
+#   - 建表當下的商品快照: 單價、品牌、型號、CPU / GPU / VRAM / RAM / 儲存裝置
+#   - 依 OrderDate 排序後存成 Parquet (欄式、帶型別、類別欄位用 dictionary 編碼)
+# 因為依日期排序，每個 row group 的 OrderDate min / max 不重疊，日期區間的查詢只讀到相關的 row group。
+# --append 只把新的品項接上去 (用當下的價格)，舊品項保留原本的快照；訂單狀態會跟著 order.csv 更新。
+#   「新」指事實表裡還沒有的 OrderItemID，不是編號大於最後一筆: 訂單還沒寫進 order.csv 的品項這次不列入，
+#   下次 --append 會再試一次，不會因為後面的品項先接上去就永遠漏掉。
+# 查詢 (query) 只讀需要的欄位，條件直接交給 pyarrow 過濾，不再碰正規化的 CSV。
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FACTS_PATH = os.path.join(SCRIPTS_DIR, '..', 'Data', 'Summary', 'order_facts.parquet')
+CHUNK_ROWS = 2_000_000
+ROW_GROUP_ROWS = 256 * 1024
+ITEM_DTYPES = {'OrderItemID': np.int64, 'OrderID': np.int64, 'SKUID': str, 'Quantity': np.int64}
+
+ORDER_COLUMNS = {'Order_ID': 'OrderID', 'Customer_ID': 'CustomerID', 'OrderDate': 'OrderDate',
+                 'PaymentMethod': 'PaymentMethod', 'Status': 'Status'}
+SKU_COLUMNS = ['SKU_ID', 'ProductID', 'CPU', 'GPU', 'VRAM', 'RAM', 'StorageType', 'StorageCapacity', 'Price']
+PRODUCT_COLUMNS = ['ProductID', 'BrandName', 'ProductName']
+CATEGORY_COLUMNS = ['PaymentMethod', 'Status', 'SKU_ID', 'BrandName', 'ProductName', 'CPU', 'GPU', 'StorageType']
+FACT_COLUMNS = ['OrderDate', 'OrderID', 'OrderItemID', 'CustomerID', 'PaymentMethod', 'Status',
+                'SKU_ID', 'ProductID', 'BrandName', 'ProductName', 'CPU', 'GPU', 'VRAM', 'RAM',
+                'StorageType', 'StorageCapacity', 'Quantity', 'UnitPrice', 'LineTotal']
+# 量值: 名稱 -> (來源欄位, 彙總方式)；AOV (平均客單價) = Revenue / Orders
+MEASURES = {
+    'Lines': ('OrderItemID', 'size'),
+    'Units': ('Quantity', 'sum'),
+    'Revenue': ('LineTotal', 'sum'),
+    'Orders': ('OrderID', 'nunique'),
+}
+
+# --- 1. 建表 ---
+def read_orders(order_path):
+    orders = pd.read_csv(order_path, encoding='utf-8-sig', usecols=list(ORDER_COLUMNS),
+                         dtype={'PaymentMethod': 'category', 'Status': 'category'})
+    orders = orders.rename(columns=ORDER_COLUMNS)
+    orders['OrderDate'] = pd.to_datetime(orders['OrderDate'], format='ISO8601')
+    return orders.set_index('OrderID')
+
+def read_catalog(sku_path, product_path):
+    sku = pd.read_csv(sku_path, encoding='utf-8-sig', usecols=SKU_COLUMNS)
+    product = pd.read_csv(product_path, encoding='utf-8-sig', usecols=PRODUCT_COLUMNS)
+    return sku.merge(product, on='ProductID', how='left').rename(columns={'Price': 'UnitPrice'}).set_index('SKU_ID')
+
+def build_lines(items, orders, catalog):
+    """一批 order_item -> 事實表的列 (找不到訂單的品項不列入，等下次 --append；不在 SKU 目錄的料號商品欄位留空)。"""
+    lines = items.rename(columns={'SKUID': 'SKU_ID'}).join(orders, on='OrderID', how='inner')
+    lines = lines.join(catalog, on='SKU_ID')
+    lines['LineTotal'] = lines['Quantity'] * lines['UnitPrice'].fillna(0).astype(np.int64)
+    return lines
+
+def finish(lines):
+    # 依 OrderDate 排序 (同一時間依品項編號)，套用最窄的型別
+    lines = lines.sort_values(['OrderDate', 'OrderItemID'], ignore_index=True)[FACT_COLUMNS]
+    for column in CATEGORY_COLUMNS:
+        lines[column] = lines[column].astype('category')
+    for column in ['ProductID', 'VRAM', 'RAM', 'StorageCapacity', 'UnitPrice']:
+        # 有不在 SKU 目錄的料號時才需要可為空的整數
+        lines[column] = lines[column].astype('Int64' if lines[column].isna().any() else np.int64)
+    return Schema_Registry.shrink(lines)
+
+def build(paths, facts_path=FACTS_PATH, append=False, chunk_rows=CHUNK_ROWS):
+    """建立 (或 append 模式下接續) 事實表，回傳統計。"""
+    orders = read_orders(paths['order'])
+    catalog = read_catalog(paths['sku'], paths['product'])
+    old, built = None, np.empty(0, dtype=np.int64)
+    if append and os.path.exists(facts_path):
+        old = pd.read_parquet(facts_path)
+        built = np.sort(old['OrderItemID'].to_numpy(np.int64))
+        # 訂單欄位以 order.csv 為準 (狀態會變)，商品欄位保留當時的快照
+        current = orders.reindex(old['OrderID'].to_numpy())
+        for column in ['PaymentMethod', 'Status']:
+            old[column] = current[column].to_numpy()
+
+    parts, stats = [], {'items': 0, 'lines': 0, 'unknown_sku': 0, 'pending': 0}
+    reader = pd.read_csv(paths['order_item'], encoding='utf-8-sig', chunksize=chunk_rows, dtype=ITEM_DTYPES)
+    for items in reader:
+        # 事實表已有的品項跳過 (已排序的編號用二分搜尋比對)
+        ids = items['OrderItemID'].to_numpy()
+        pos = np.minimum(np.searchsorted(built, ids), max(len(built) - 1, 0))
+        items = items[built[pos] != ids] if len(built) else items
+        stats['items'] += len(items)
+        lines = build_lines(items, orders, catalog)
+        stats['lines'] += len(lines)
+        stats['pending'] += len(items) - len(lines)
+        stats['unknown_sku'] += int(lines['UnitPrice'].isna().sum())
+        parts.append(lines)
+    if not parts:
+        # order_item.csv 只有表頭: 用沒有資料的一批建出欄位與型別
+        empty = pd.DataFrame({c: pd.Series(dtype=t) for c, t in ITEM_DTYPES.items()})
+        parts.append(build_lines(empty, orders, catalog))
+    new = pd.concat(parts, ignore_index=True)
+    facts = finish(new if old is None else pd.concat([old.astype({c: 'object' for c in CATEGORY_COLUMNS}), new], ignore_index=True))
+    stats['total'] = len(facts)
+
+    os.makedirs(os.path.dirname(facts_path), exist_ok=True)
+    tmp_path = facts_path + '.tmp'
+    facts.to_parquet(tmp_path, index=False, row_group_size=ROW_GROUP_ROWS)
+    os.replace(tmp_path, facts_path)
+    return stats
+
+# --- 2. 查詢 ---
+def to_filters(where=None, start=None, end=None):
+    """
+    條件 -> pyarrow 的 filters。where 的寫法與 Catalog_Index 相同:
+    純量 = 等於、list / set = 其中之一、(low, high) = 區間 (含端點，None 表示不限)。
+    start / end 是 YYYY-MM-DD (含)。
+    """
+    filters = []
+    if start:
+        filters.append(('OrderDate', '>=', pd.Timestamp(start)))
+    if end:
+        filters.append(('OrderDate', '<', pd.Timestamp(end) + pd.Timedelta(days=1)))
+    for column, condition in (where or {}).items():
+        if isinstance(condition, tuple):
+            low, high = condition
+            if low is not None:
+                filters.append((column, '>=', low))
+            if high is not None:
+                filters.append((column, '<=', high))
+        elif isinstance(condition, (list, set)):
+            filters.append((column, 'in', list(condition)))
+        else:
+            filters.append((column, '==', condition))
+    return filters or None
+
+def query(group_by=(), measures=('Units', 'Revenue', 'Orders'), where=None, start=None, end=None, facts_path=FACTS_PATH):
+    """依 group_by 彙總符合條件的品項；measures 可用 MEASURES 的名稱與 AOV。"""
+    group_by = list(group_by)
+    needed = [m for m in measures if m != 'AOV'] + (['Revenue', 'Orders'] if 'AOV' in measures else [])
+    needed = list(dict.fromkeys(needed))
+    columns = list(dict.fromkeys(group_by + [MEASURES[m][0] for m in needed]))
+    lines = pd.read_parquet(facts_path, columns=columns, filters=to_filters(where, start, end))
+    spec = {m: MEASURES[m] for m in needed}
+    if group_by:
+        result = lines.groupby(group_by, observed=True).agg(**spec).reset_index()
+    else:
+        result = pd.DataFrame({m: [getattr(lines[column], how)() if how != 'size' else len(lines)]
+                               for m, (column, how) in spec.items()})
+    if 'AOV' in measures:
+        result['AOV'] = (result['Revenue'] / result['Orders']).round(1)
+    return result[group_by + list(measures)]
+
+# --- 3. 對照組與 Demo ---
+def joined_lines(paths):
+    # 對照組: 查詢當下才四表 JOIN (原本的做法)
+    orders = read_orders(paths['order'])
+    items = pd.read_csv(paths['order_item'], encoding='utf-8-sig')
+    return build_lines(items, orders, read_catalog(paths['sku'], paths['product']))
+
+def demo_queries():
+    return [
+        ('各品牌營收', dict(group_by=['BrandName'], measures=('Units', 'Revenue', 'Orders'))),
+        ('各付款方式平均客單價', dict(group_by=['PaymentMethod'], measures=('Orders', 'Revenue', 'AOV'))),
+        ('已送達訂單的顯卡分布', dict(group_by=['GPU'], measures=('Units', 'Lines'), where={'Status': 'Delivered'})),
+        ('近 30 天 16GB 以上的 SSD 機種', dict(group_by=['RAM', 'StorageType'], measures=('Units', 'Revenue'),
+                                        where={'RAM': (16, None), 'StorageType': 'SSD'}, start='LAST30')),
+    ]
+
+def baseline_query(lines, group_by=(), measures=(), where=None, start=None, end=None):
+    mask = pd.Series(True, index=lines.index)
+    if start:
+        mask &= lines['OrderDate'] >= pd.Timestamp(start)
+    if end:
+        mask &= lines['OrderDate'] < pd.Timestamp(end) + pd.Timedelta(days=1)
+    for column, condition in (where or {}).items():
+        if isinstance(condition, tuple):
+            low, high = condition
+            if low is not None:
+                mask &= lines[column] >= low
+            if high is not None:
+                mask &= lines[column] <= high
+        elif isinstance(condition, (list, set)):
+            mask &= lines[column].isin(list(condition))
+        else:
+            mask &= lines[column] == condition
+    spec = {m: MEASURES[m] for m in MEASURES if m in measures or ('AOV' in measures and m in ('Revenue', 'Orders'))}
+    result = lines[mask].groupby(list(group_by), observed=True).agg(**spec).reset_index()
+    if 'AOV' in measures:
+        result['AOV'] = (result['Revenue'] / result['Orders']).round(1)
+    return result[list(group_by) + list(measures)]
+
+def same_result(a, b, keys):
+    a = a.sort_values(keys, ignore_index=True)
+    b = b.sort_values(keys, ignore_index=True)
+    return (len(a) == len(b) and a[keys].astype(str).equals(b[keys].astype(str))
+            and all(np.allclose(a[c].to_numpy('float64'), b[c].to_numpy('float64')) for c in a.columns if c not in keys))
+
+def run_demo(paths, facts_path, verify):
+    last_day = pd.read_parquet(facts_path, columns=['OrderDate'])['OrderDate'].max().normalize()
+    baseline = None
+    if verify:
+        start = time.perf_counter()
+        baseline = joined_lines(paths)
+        print(f"對照組四表 JOIN: {time.perf_counter() - start:.2f} s")
+    failed = False
+    for title, spec in demo_queries():
+        if spec.get('start') == 'LAST30':
+            spec['start'] = str((last_day - pd.Timedelta(days=29)).date())
+        start = time.perf_counter()
+        result = query(facts_path=facts_path, **spec)
+        seconds = time.perf_counter() - start
+        print("-" * 30)
+        print(f"[{title}] 事實表 {seconds * 1000:.0f} ms")
+        print(result.sort_values(result.columns[len(spec['group_by'])], ascending=False).head(10).to_string(index=False))
+        if baseline is not None:
+            start = time.perf_counter()
+            expected = baseline_query(baseline, **spec)
+            seconds = time.perf_counter() - start
+            ok = same_result(result, expected, spec['group_by'])
+            failed |= not ok
+            print(f"  對照組 (已 JOIN 好，只算彙總) {seconds * 1000:.0f} ms，結果{'一致' if ok else '不一致'}")
+    return not failed
+
+def parse_where(items):
+    # COL=VALUE、COL=A,B (其中之一)、COL=LOW..HIGH (區間，某一端可留空)；數字自動轉型
+    def value(text):
+        try:
+            return int(text)
+        except ValueError:
+            try:
+                return float(text)
+            except ValueError:
+                return text
+    where = {}
+    for item in items or []:
+        column, _, text = item.partition('=')
+        if '..' in text:
+            low, high = text.split('..', 1)
+            where[column] = (value(low) if low else None, value(high) if high else None)
+        elif ',' in text:
+            where[column] = [value(t) for t in text.split(',')]
+        else:
+            where[column] = value(text)
+    return where
+
+def main():
+    parser = argparse.ArgumentParser(description='訂單明細事實表: 建表 (去正規化、依日期排序的 Parquet) 與彙總查詢')
+    parser.add_argument('--processed', default=Schema_Registry.PROCESSED_DIR, help='CSV 所在資料夾')
+    parser.add_argument('--facts', default=FACTS_PATH, help='事實表路徑')
+    parser.add_argument('--build', action='store_true', help='由 CSV 重建事實表')
+    parser.add_argument('--append', action='store_true', help='只把新的品項接到現有的事實表 (舊品項保留價格快照)')
+    parser.add_argument('--group-by', nargs='*', default=None, help='彙總的欄位 (例如 BrandName)')
+    parser.add_argument('--measures', nargs='*', default=['Units', 'Revenue', 'Orders'], choices=list(MEASURES) + ['AOV'])
+    parser.add_argument('--where', nargs='*', default=None, help='條件 COL=VALUE / COL=A,B / COL=LOW..HIGH')
+    parser.add_argument('--start', default=None, help='起始日 (YYYY-MM-DD，含)')
+    parser.add_argument('--end', default=None, help='結束日 (YYYY-MM-DD，含)')
+    parser.add_argument('--demo', action='store_true', help='執行幾個典型報表查詢')
+    parser.add_argument('--verify', action='store_true', help='Demo 時與直接四表 JOIN 的結果比對')
+    args = parser.parse_args()
+
+    where = parse_where(args.where)
+    unknown = [c for c in list(where) + (args.group_by or []) if c not in FACT_COLUMNS]
+    if unknown:
+        print("錯誤：事實表沒有欄位 " + '、'.join(unknown) + "，可用的欄位: " + ', '.join(FACT_COLUMNS))
+        sys.exit(1)
+    if not Table_Formats.has_pyarrow():
+        print("錯誤：事實表以 Parquet 儲存，需要安裝 pyarrow")
+        sys.exit(1)
+
+    paths = {
+        'order': os.path.join(args.processed, 'order.csv'),
+        'order_item': os.path.join(args.processed, 'order_item.csv'),
+        'sku': os.path.join(args.processed, 'sku_table_v6.csv'),
+        'product': os.path.join(args.processed, 'product_table.csv'),
+    }
+    if args.build or args.append or args.verify:
+        missing = [os.path.basename(p) for p in paths.values() if not os.path.exists(p)]
+        if missing:
+            print("錯誤：找不到 " + '、'.join(missing))
+            sys.exit(1)
+
+    if args.build or args.append:
+        start = time.perf_counter()
+        stats = build(paths, args.facts, append=args.append)
+        size = os.path.getsize(args.facts) / 1024 / 1024
+        print(f"{'接續' if args.append else '建立'}事實表: 新增 {stats['lines']:,} 列 (共 {stats['total']:,} 列，"
+              f"不在 SKU 目錄: {stats['unknown_sku']:,}，找不到訂單: {stats['pending']:,})，{time.perf_counter() - start:.1f} s，{size:.1f} MB")
+    if not os.path.exists(args.facts):
+        print(f"錯誤：找不到事實表 {args.facts}，請先執行 --build")
+        sys.exit(1)
+
+    if args.demo:
+        if not run_demo(paths, args.facts, args.verify):
+            sys.exit(1)
+    elif args.group_by is not None:
+        start = time.perf_counter()
+        result = query(args.group_by, args.measures, where, args.start, args.end, args.facts)
+        print(result.to_string(index=False))
+        print(f"({len(result):,} 列，{(time.perf_counter() - start) * 1000:.0f} ms)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# --- 規格字串解析快取 (各版 ETL_SKU_Table 共用) ---
+# RAM ("8 GB ")、SSD ("512 GB SSD Storage")、HDD、Display、GPU 這些欄位幾千列只有幾百種寫法，
+# 但每一版 ETL 都對每一列跑一次 regex。這裡先把欄位 factorize (多欄就看欄位的組合)，
+# 每種「不同的值」只解析一次，再用代碼對回每一列 → regex 的成本從「列數」變成「不同值的個數」。
+# 解析結果存在 CACHE_PATH，下次執行 (或另一版 ETL 用到同一個函式) 直接查表:
+#   - 以「函式名稱 + 所在模組整份原始碼的雜湊」區分: 解析函式會呼叫同檔案的小工具 (parse_storage_capacity、_first_int...)，
+#     只看函式本身的原始碼時改了小工具不會作廢；改成看整個檔案，同檔案任何修改都會重新解析，舊版與新版不會混用
+#   - 只適合「輸入一樣、輸出就一樣」的函式；用到亂數的 (重量、料號隨機碼) 不能放進來
+# 逐列函式 (func(value) 或 func(row)) 與整欄函式 (batch=True，func(Series / DataFrame)) 都能用。
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(SCRIPTS_DIR, '..', 'Data', '.cache', 'parse_cache.json')
+MAX_VALUES = 100_000      # 單一函式最多記幾種值 (幾乎每列都不同的欄位不適合快取)
+MAX_AGE_DAYS = 30         # 超過這麼久沒用到的函式 (多半是改版前的舊原始碼) 存檔時移除
+SEPARATOR = '\x1f'
+
+@lru_cache(maxsize=None)
+def func_key(func):
+    # 原始碼拿不到時 (例如內建函式) 只用名稱
+    try:
+        sha = hashlib.sha1(inspect.getsource(func).encode('utf-8'))
+        with open(inspect.getsourcefile(func), 'rb') as f:
+            sha.update(f.read())
+        digest = sha.hexdigest()[:12]
+    except (OSError, TypeError):
+        digest = 'nosource'
+    return f"{func.__qualname__}:{digest}"
+
+def value_key(value):
+    # 型別也放進 key: int 5 與字串 '5' 不一定解析成同一個結果；NaN 記成 'float:nan'
+    if isinstance(value, np.generic):
+        value = value.item()
+    return f"{type(value).__name__}:{value}"
+
+def to_python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+def factorize(data):
+    """回傳 (每列的代碼, 不同的值)；DataFrame 時不同的值是「欄位組合」的 DataFrame。"""
+    if isinstance(data, pd.Series):
+        codes, uniques = pd.factorize(data, use_na_sentinel=False)
+        return codes, pd.Series(uniques, name=data.name)
+    # 多欄: 各欄分別 factorize，逐欄把代碼併進組合代碼；每併一欄就重新 factorize，
+    # 讓組合代碼保持在列數以內，欄位多或基數大時乘積也不會溢位 int64
+    codes = np.zeros(len(data), dtype=np.int64)
+    per_column = []
+    for name in data.columns:
+        column_codes, uniques = pd.factorize(data[name], use_na_sentinel=False)
+        codes = pd.factorize(codes * np.int64(len(uniques)) + column_codes)[0]
+        per_column.append((name, column_codes, uniques))
+    # factorize 的代碼依第一次出現的順序編號，unique 的 return_index 即為每個代碼第一次出現的列
+    first_rows = np.unique(codes, return_index=True)[1]
+    uniques = pd.DataFrame({name: pd.Series(column_uniques).take(column_codes[first_rows]).to_numpy()
+                            for name, column_codes, column_uniques in per_column})
+    return codes, uniques
+
+def unique_keys(uniques):
+    if isinstance(uniques, pd.Series):
+        return [value_key(v) for v in uniques]
+    return [SEPARATOR.join(value_key(v) for v in row) for row in uniques.itertuples(index=False)]
+
+class ParseCache:
+    """
+    parse(data, func) 等同 data.apply(func) (DataFrame 時為 apply(func, axis=1))，但每種值只呼叫一次。
+    path=None 時不讀也不寫檔案 (只在這次執行內去重)。
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.used = {}
+        self.stats = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    saved = json.load(f)
+                self.entries, self.used = saved.get('entries', {}), saved.get('used', {})
+            except (OSError, ValueError):
+                print(f"注意：解析快取 {path} 無法讀取，這次重新解析。")
+
+    def parse(self, data, func, batch=False):
+        key = func_key(func)
+        start = time.perf_counter()
+        codes, uniques = factorize(data)
+        keys = unique_keys(uniques)
+        known = self.entries.setdefault(key, {})
+        missing = [i for i, k in enumerate(keys) if k not in known]
+
+        parsed = {}
+        if missing:
+            subset = uniques.iloc[missing].reset_index(drop=True)
+            if batch:
+                results = func(subset)
+            elif isinstance(subset, pd.Series):
+                results = subset.map(func)
+            else:
+                results = subset.apply(func, axis=1)
+            parsed = {keys[i]: to_python(r) for i, r in zip(missing, list(results))}
+            if len(known) + len(parsed) <= MAX_VALUES:
+                known.update(parsed)
+                self.dirty = True
+        # 只有命中時也要偶爾更新使用時間，否則一直命中的函式會被當成太久沒用而移除
+        if time.time() - self.used.get(key, 0) > 86400:
+            self.dirty = True
+        self.used[key] = time.time()
+
+        values = pd.Series([known[k] if k in known else parsed[k] for k in keys])
+        result = values.take(codes)
+        result.index = data.index
+
+        stat = self.stats.setdefault(func.__qualname__, {'rows': 0, 'distinct': 0, 'hits': 0, 'misses': 0, 'seconds': 0.0})
+        stat['rows'] += len(data)
+        stat['distinct'] += len(keys)
+        stat['hits'] += len(keys) - len(missing)
+        stat['misses'] += len(missing)
+        stat['seconds'] += time.perf_counter() - start
+        return result
+
+    def save(self):
+        if not (self.path and self.dirty):
+            return
+        cutoff = time.time() - MAX_AGE_DAYS * 86400
+        stale = [key for key, used in self.used.items() if used < cutoff]
+        for key in stale:
+            self.entries.pop(key, None)
+            self.used.pop(key, None)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries, 'used': self.used}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def report(self):
+        if not self.stats:
+            return
+        print("解析快取 (每種值只解析一次):")
+        for name, s in self.stats.items():
+            print(f"  {name:<28} {s['rows']:>9,} 列 / {s['distinct']:>6,} 種值  "
+                  f"命中 {s['hits']:,}、新解析 {s['misses']:,}  ({s['seconds'] * 1000:.1f} ms)")
@@ -0,0 +1,202 @@
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from Stage_Cache import StageCache, DEFAULT_MAX_BYTES
+
+# --- 0. 參數設定 ---
+# 整條資料管線: Product -> SKU -> Mock Data (顧客 / 訂單) -> 移除 BOM
+# 每個階段宣告自己讀哪些檔、寫哪些檔，依賴關係 (DAG) 由檔案推出來，互不相依的階段同時執行。
+# 每個階段的快取 key = 腳本原始碼 + 輸入檔內容 + 亂數種子，key 沒變就直接沿用上次的產物。
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RANDOM_SEED = 42
+# 訂單日期區間的終點: 固定下來，同一個 seed 的輸出才不會隨執行時間改變 (也因此可以快取)
+ANCHOR_DATE = '2026-01-01'
+
+RAW = '../Data/Raw/laptop.csv'
+PROCESSED = '../Data/Processed'
+PRODUCT = f'{PROCESSED}/product_table.csv'
+SKU = f'{PROCESSED}/sku_table_v6.csv'
+CUSTOMER = f'{PROCESSED}/customer.csv'
+ADDRESS = f'{PROCESSED}/address_book.csv'
+ORDER = f'{PROCESSED}/order.csv'
+ORDER_ITEM = f'{PROCESSED}/order_item.csv'
+ALL_TABLES = [PRODUCT, SKU, CUSTOMER, ADDRESS, ORDER, ORDER_ITEM]
+
+# 各階段共用的模組與 DDL (決定輸出型別)，改了也要讓快取失效
+SHARED_MODULES = ['Table_Formats.py', 'Schema_Registry.py', '../SQL/create_tables_v2.sql']
+
+def columnar_outputs(tables, columnar):
+    return [os.path.splitext(t)[0] + '.' + fmt for t in tables for fmt in columnar]
+
+def pipeline_stages(seed, columnar=(), anchor_date=ANCHOR_DATE):
+    # 依宣告順序排列; seeded=True 代表這個階段有用到亂數，快取 key 會包含種子
+    extra = ['--columnar', *columnar] if columnar else []
+    return [
+        {'name': 'product', 'script': 'ETL_Product_Table.py', 'args': extra,
+         'modules': SHARED_MODULES,
+         'inputs': [RAW], 'outputs': [PRODUCT] + columnar_outputs([PRODUCT], columnar), 'seeded': False},
+        {'name': 'sku', 'script': 'ETL_SKU_Table_V6.py', 'args': ['--seed', str(seed)] + extra,
+         'modules': SHARED_MODULES + ['Parse_Cache.py'],
+         'inputs': [RAW, PRODUCT], 'outputs': [SKU] + columnar_outputs([SKU], columnar), 'seeded': True},
+        # 顧客 / 地址不需要 SKU 表，可以跟 product / sku 同時跑
+        {'name': 'customers', 'script': 'Mock_Data_Generator_V3.py', 'args': ['--part', 'customers', '--seed', str(seed)] + extra,
+         'modules': SHARED_MODULES + ['Identity_Pool.py'],
+         'inputs': [], 'outputs': [CUSTOMER, ADDRESS] + columnar_outputs([CUSTOMER, ADDRESS], columnar), 'seeded': True},
+        {'name': 'orders', 'script': 'Mock_Data_Generator_V3.py',
+         'args': ['--part', 'orders', '--seed', str(seed), '--anchor-date', anchor_date] + extra,
+         'modules': SHARED_MODULES + ['Weighted_Sampler.py'],
+         'inputs': [SKU, CUSTOMER, ADDRESS], 'outputs': [ORDER, ORDER_ITEM] + columnar_outputs([ORDER, ORDER_ITEM], columnar), 'seeded': True},
+        {'name': 'remove_bom', 'script': 'fin_CSV_BOM.py', 'args': ALL_TABLES + ['--in-place'],
+         'modules': [],
+         'inputs': ALL_TABLES, 'outputs': ALL_TABLES, 'seeded': False},
+    ]
+
+# --- 1. 由檔案推出依賴關係 ---
+def stage_dependencies(stages):
+    """
+    階段 B 依賴排在它前面的階段 A，只要:
+      A 寫的檔 B 要讀或也要寫 (讀到完整的檔 / 不會同時寫)，或
+      A 讀的檔 B 要寫 (例如 remove_bom 就地改寫，必須等讀它的人都跑完)
+    """
+    deps = {}
+    for i, stage in enumerate(stages):
+        reads, writes = set(stage['inputs']), set(stage['outputs'])
+        deps[stage['name']] = {
+            prev['name'] for prev in stages[:i]
+            if set(prev['outputs']) & (reads | writes) or set(prev['inputs']) & writes
+        }
+    return deps
+
+# --- 2. 執行單一階段 (量時間、筆數、peak RSS) ---
+def count_rows(paths):
+    # CSV 資料列數 = 換行數 - 標題列 (這幾張表的欄位內容都沒有換行)
+    total = 0
+    for path in paths:
+        # 欄式檔案 (.parquet / .feather) 與 CSV 同內容，只算 CSV
+        if not path.endswith('.csv') or not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            lines = sum(block.count(b'\n') for block in iter(lambda: f.read(1024 * 1024), b''))
+        total += max(lines - 1, 0)
+    return total
+
+def run_stage(stage):
+    cmd = [sys.executable, stage['script']] + stage['args']
+    proc = subprocess.Popen(cmd, cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"階段 {stage['name']} 執行失敗 (exit code {proc.returncode})")
+    return usage.ru_maxrss / 1024  # Linux 單位為 KB
+
+def execute_stage(stage, cache, cache_lock, seed, use_cache):
+    start = time.perf_counter()
+    rows_in = count_rows(stage['inputs'])
+    scripts = [os.path.join(SCRIPTS_DIR, name) for name in [stage['script']] + stage['modules']]
+    stage_seed = seed if stage['seeded'] else None
+    key = cache.stage_key(stage['name'], scripts, stage['inputs'], stage_seed, {'args': stage['args']}) if use_cache else None
+
+    with cache_lock:
+        hit = key is not None and cache.restore(stage['name'], key, stage['outputs'])
+        if key is None:
+            cache.misses.append(stage['name'])
+    peak_rss = None
+    if not hit:
+        peak_rss = run_stage(stage)
+        # 輸出可能與輸入同檔 (例如 remove_bom 就地改寫)，所以用執行前算好的 key 存
+        with cache_lock:
+            cache.store(stage['name'], key, stage['outputs'])
+
+    return {
+        'status': '快取命中' if hit else '執行',
+        'seconds': time.perf_counter() - start,
+        'rows_in': rows_in,
+        'rows_out': count_rows(stage['outputs']),
+        'peak_rss': peak_rss,
+    }
+
+# --- 3. 依 DAG 排程 ---
+def run_pipeline(stages, cache, seed, use_cache, jobs):
+    deps = stage_dependencies(stages)
+    cache_lock = threading.Lock()
+    pending = list(stages)
+    running = {}
+    done, failed, results = set(), [], {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # 依賴都完成的階段就送出去 (有階段失敗後就不再送新的)
+            for stage in [s for s in pending if deps[s['name']] <= done]:
+                if failed or len(running) >= jobs:
+                    break
+                pending.remove(stage)
+                running[pool.submit(execute_stage, stage, cache, cache_lock, seed, use_cache)] = stage
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                try:
+                    result = future.result()
+                except RuntimeError as e:
+                    print(f"[{stage['name']:<10}] {e}")
+                    failed.append(stage['name'])
+                    continue
+                results[stage['name']] = result
+                done.add(stage['name'])
+                print(f"[{stage['name']:<10}] {result['status']:<4} {result['seconds']:6.2f} 秒")
+
+    skipped = [s['name'] for s in pending]
+    return results, failed, skipped
+
+def print_summary(stages, results, total_seconds):
+    print("-" * 72)
+    # 中文字佔兩格，標題直接用排好的字串
+    print("stage          時間(秒)    輸入筆數    輸出筆數  peak RSS(MB)  狀態")
+    for stage in stages:
+        r = results.get(stage['name'])
+        if r is None:
+            continue
+        rss = '-' if r['peak_rss'] is None else f"{r['peak_rss']:.1f}"
+        print(f"{stage['name']:<12} {r['seconds']:>10.2f} {r['rows_in']:>11,} {r['rows_out']:>11,} {rss:>13}  {r['status']}")
+    serial = sum(r['seconds'] for r in results.values())
+    print(f"總耗時 {total_seconds:.2f} 秒 (各階段加總 {serial:.2f} 秒)")
+
+def main():
+    parser = argparse.ArgumentParser(description='資料管線 (DAG 排程 + 階段快取)')
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED, help='SKU / Mock Data 階段的亂數種子')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='最多同時執行幾個階段')
+    parser.add_argument('--columnar', nargs='*', choices=['parquet', 'feather'], default=[], help='各階段另外輸出帶型別的 Parquet / Feather')
+    parser.add_argument('--anchor-date', default=ANCHOR_DATE, help='訂單日期區間的終點 (會列入 orders 階段的快取 key)')
+    parser.add_argument('--no-cache', action='store_true', help='不使用快取，全部重跑')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024, help='快取總大小上限 (MB)')
+    args = parser.parse_args()
+
+    # 所有相對路徑都以 Scripts/ 為準，不管從哪裡執行
+    os.chdir(SCRIPTS_DIR)
+    cache = StageCache(max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    stages = pipeline_stages(args.seed, args.columnar, args.anchor_date)
+
+    print("階段依賴:")
+    for name, before in stage_dependencies(stages).items():
+        print(f"  {name:<10} <- {', '.join(sorted(before)) or '(無)'}")
+    print("-" * 30)
+
+    start = time.perf_counter()
+    results, failed, skipped = run_pipeline(stages, cache, args.seed, not args.no_cache, max(1, args.jobs))
+    cache.save()
+
+    print_summary(stages, results, time.perf_counter() - start)
+    cache.report()
+    if failed:
+        print(f"失敗的階段: {', '.join(failed)}；未執行: {', '.join(skipped) or '-'}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import Schema_Registry
+import Sales_Summary
+
+# --- 熱銷排行 (串流 top-N) ---
+# V2 生成器加熱銷商品是為了讓「銷售排行」報表有變化；但排行原本要把所有訂單品項 JOIN 起來再整個排序。
+# 這裡只掃一次 order_item.csv:
+#   - 逐塊讀 (CHUNK_ROWS 筆)，SKUID 讀成 category，每塊只需把幾千個類別對到 SKU 目錄的位置 (hash)，
+#     再用 bincount 累加到「每個 SKU 一格」的陣列 → 記憶體只跟 SKU 數有關，跟品項筆數無關
+#   - Product / 品牌的排行由 SKU 的合計再彙總 (件數與營收都可直接相加)
+#   - 需要依 Status / 日期篩選時，先掃一次 order.csv 建「訂單是否列入」的 bitmap (每張訂單 1 bit)
+#   - 前 N 名用 np.argpartition 取 (O(SKU 數)，等同大小 N 的 heap)，只對這 N 筆排序
+# 營收 = 件數 * sku_table_v6 的 Price (與 Sales_Summary 相同)。
+
+CHUNK_ROWS = 2_000_000
+TOP_N = 10
+EXCLUDE_STATUS = ['Cancelled']
+BENCH_ITEMS = [10_000_000, 100_000_000]
+BASELINE_MAX = 10_000_000   # 對照組 (整個讀進來 JOIN) 只跑到這個筆數，再大記憶體不夠
+
+# --- 1. 訂單篩選 bitmap ---
+def order_filter(order_path, start=None, end=None, exclude_status=(), chunk_rows=CHUNK_ROWS):
+    """回傳 packbits 後的 bitmap (第 Order_ID 個 bit 為 1 表示列入)；沒有任何條件時回傳 None，不必讀 order.csv。"""
+    if not (start or end or exclude_status):
+        return None
+    keep_ids = []
+    max_id = 0
+    reader = pd.read_csv(order_path, encoding='utf-8-sig', usecols=['Order_ID', 'OrderDate', 'Status'],
+                         dtype={'Order_ID': np.int64, 'OrderDate': str, 'Status': 'category'}, chunksize=chunk_rows)
+    for orders in reader:
+        day = orders['OrderDate'].str[:10]
+        mask = ~orders['Status'].isin(list(exclude_status)).to_numpy()
+        if start:
+            mask &= (day >= start).to_numpy()
+        if end:
+            mask &= (day <= end).to_numpy()
+        keep_ids.append(orders['Order_ID'].to_numpy()[mask])
+        max_id = max(max_id, int(orders['Order_ID'].max()))
+    keep = np.zeros(max_id + 1, dtype=bool)
+    for ids in keep_ids:
+        keep[ids] = True
+    return np.packbits(keep, bitorder='little')
+
+def passes(bitmap, order_ids):
+    inside = order_ids < len(bitmap) * 8
+    bits = bitmap[np.where(inside, order_ids, 0) >> 3] >> (order_ids & 7).astype(np.uint8)
+    return inside & (bits & 1).astype(bool)
+
+# --- 2. 一次掃描，依 SKU 累加件數 ---
+def aggregate_units(item_path, sku_index, keep=None, chunk_rows=CHUNK_ROWS):
+    """回傳 (每個 SKU 的件數, 統計)。SKU 目錄裡沒有的料號另外計數。"""
+    units = np.zeros(len(sku_index), dtype=np.int64)
+    stats = {'rows': 0, 'counted': 0, 'unknown': 0}
+    reader = pd.read_csv(item_path, encoding='utf-8-sig', usecols=['OrderID', 'SKUID', 'Quantity'],
+                         dtype={'OrderID': np.int64, 'SKUID': 'category', 'Quantity': np.int64}, chunksize=chunk_rows)
+    for items in reader:
+        stats['rows'] += len(items)
+        # 每塊只查一次各類別在目錄裡的位置，再用類別代碼展開到每一列
+        lookup = sku_index.get_indexer(items['SKUID'].cat.categories)
+        codes = lookup[items['SKUID'].cat.codes.to_numpy()]
+        quantity = items['Quantity'].to_numpy()
+        mask = codes >= 0
+        stats['unknown'] += int((~mask).sum())
+        if keep is not None:
+            mask &= passes(keep, items['OrderID'].to_numpy())
+        units += np.bincount(codes[mask], weights=quantity[mask], minlength=len(units)).astype(np.int64)
+        stats['counted'] += int(mask.sum())
+    return units, stats
+
+# --- 3. 前 N 名 ---
+def level_totals(units, catalog, level):
+    """SKU 的件數 -> 該層級的 (件數, 營收)。"""
+    df = catalog[['ProductID', 'BrandName', 'ProductName']].copy()
+    df['Units'] = units
+    df['Revenue'] = units * catalog['Price'].fillna(0).to_numpy(np.int64)
+    df = df.rename_axis('SKU_ID').reset_index()
+    keys = Sales_Summary.LEVELS[level]
+    return df.groupby(keys, dropna=False)[['Units', 'Revenue']].sum().reset_index()
+
+def top_n(totals, n=TOP_N, by='Units'):
+    values = totals[by].to_numpy()
+    if n < len(values):
+        picked = np.argpartition(-values, n - 1)[:n]
+    else:
+        picked = np.arange(len(values))
+    return totals.iloc[picked].sort_values([by] + list(totals.columns[:1]), ascending=[False, True], ignore_index=True)
+
+def rank(paths, by='Units', n=TOP_N, start=None, end=None, exclude_status=EXCLUDE_STATUS, chunk_rows=CHUNK_ROWS):
+    """回傳 ({層級: 前 N 名}, {層級: 全部合計}, 統計)。"""
+    catalog = Sales_Summary.sku_catalog(paths['sku'], paths['product'])
+    keep = order_filter(paths['order'], start, end, exclude_status, chunk_rows)
+    units, stats = aggregate_units(paths['order_item'], catalog.index, keep, chunk_rows)
+    totals = {level: level_totals(units, catalog, level) for level in Sales_Summary.LEVELS}
+    return {level: top_n(t, n, by) for level, t in totals.items()}, totals, stats
+
+# --- 4. 效能測試 ---
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def write_tiled(processed, out_dir, num_items):
+    """把現有的 order / order_item 重複接成約 num_items 筆 (每份 Order_ID / OrderItemID 往後平移)，回傳實際筆數。"""
+    orders = pd.read_csv(os.path.join(processed, 'order.csv'), encoding='utf-8-sig', dtype=str)
+    items = pd.read_csv(os.path.join(processed, 'order_item.csv'), encoding='utf-8-sig', dtype=str)
+    order_ids, item_ids = orders['Order_ID'].astype(np.int64), items['OrderItemID'].astype(np.int64)
+    item_order_ids = items['OrderID'].astype(np.int64)
+    copies = int(np.ceil(num_items / len(items)))
+    with open(os.path.join(out_dir, 'order.csv'), 'w', encoding='utf-8-sig', newline='') as of, \
+            open(os.path.join(out_dir, 'order_item.csv'), 'w', encoding='utf-8-sig', newline='') as itf:
+        for k in range(copies):
+            orders.assign(Order_ID=order_ids + k * int(order_ids.max())).to_csv(of, index=False, header=(k == 0))
+            items.assign(OrderItemID=item_ids + k * int(item_ids.max()),
+                         OrderID=item_order_ids + k * int(order_ids.max())).to_csv(itf, index=False, header=(k == 0))
+    for name in ('sku_table_v6', 'product_table'):
+        os.symlink(os.path.abspath(os.path.join(processed, name + '.csv')), os.path.join(out_dir, name + '.csv'))
+    return copies * len(items)
+
+def same_totals(fast, slow, level):
+    keys = Sales_Summary.LEVELS[level]
+    fast = fast[fast['Units'] > 0].sort_values(keys, ignore_index=True)
+    slow = slow.sort_values(keys, ignore_index=True)
+    return (len(fast) == len(slow) and fast[keys].astype(str).equals(slow[keys].astype(str))
+            and (fast['Units'].to_numpy() == slow['Units'].to_numpy()).all()
+            and (fast['Revenue'].to_numpy() == slow['Revenue'].to_numpy()).all())
+
+def benchmark(processed, sizes, exclude_status, start, end, baseline_max):
+    for num_items in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            rows = write_tiled(processed, tmp, num_items)
+            size = os.path.getsize(os.path.join(tmp, 'order_item.csv')) / 1024 / 1024
+            print(f"[{rows:,} 個品項] 準備測試檔 {time.perf_counter() - t0:.1f} s (order_item.csv {size:,.0f} MB)")
+            paths = paths_for(tmp)
+            t0 = time.perf_counter()
+            _, totals, stats = rank(paths, exclude_status=exclude_status, start=start, end=end)
+            seconds = time.perf_counter() - t0
+            print(f"  串流排行      : {seconds:8.2f} s ({stats['rows'] / seconds:12,.0f} 筆/秒)   peak RSS {peak_rss_mb():8.0f} MB")
+            if num_items > baseline_max:
+                print(f"  JOIN + 排序   : 略過 (超過 {baseline_max:,} 筆)")
+                continue
+            t0 = time.perf_counter()
+            slow = {level: Sales_Summary.raw_report(paths, level, start, end, exclude_status) for level in ['sku']}
+            seconds = time.perf_counter() - t0
+            ok = same_totals(totals['sku'], slow['sku'], 'sku')
+            print(f"  JOIN + 排序   : {seconds:8.2f} s ({rows / seconds:12,.0f} 筆/秒)   peak RSS {peak_rss_mb():8.0f} MB   "
+                  f"SKU 合計{'一致' if ok else '不一致'}")
+
+def paths_for(processed):
+    return {
+        'order': os.path.join(processed, 'order.csv'),
+        'order_item': os.path.join(processed, 'order_item.csv'),
+        'sku': os.path.join(processed, 'sku_table_v6.csv'),
+        'product': os.path.join(processed, 'product_table.csv'),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='熱銷排行: 一次掃描 order_item.csv 算出 SKU / Product / 品牌的前 N 名')
+    parser.add_argument('--processed', default=Schema_Registry.PROCESSED_DIR, help='CSV 所在資料夾')
+    parser.add_argument('--by', choices=['units', 'revenue'], default='units', help='依件數或營收排名')
+    parser.add_argument('--top', type=int, default=TOP_N, help='前幾名')
+    parser.add_argument('--start', default=None, help='起始日 (YYYY-MM-DD，含)')
+    parser.add_argument('--end', default=None, help='結束日 (YYYY-MM-DD，含)')
+    parser.add_argument('--exclude-status', nargs='*', default=EXCLUDE_STATUS, help='不列入的訂單狀態 (不給值表示全部列入)')
+    parser.add_argument('--verify', action='store_true', help='與 pandas JOIN 全部資料的結果比對')
+    parser.add_argument('--benchmark', type=int, nargs='*', default=None, help=f'效能測試的品項筆數 (不給值為 {BENCH_ITEMS})')
+    parser.add_argument('--baseline-max', type=int, default=BASELINE_MAX, help='效能測試中對照組最多跑到幾筆')
+    args = parser.parse_args()
+
+    paths = paths_for(args.processed)
+    missing = [os.path.basename(p) for p in paths.values() if not os.path.exists(p)]
+    if missing:
+        print("錯誤：找不到 " + '、'.join(missing))
+        sys.exit(1)
+
+    if args.benchmark is not None:
+        benchmark(args.processed, args.benchmark or BENCH_ITEMS, args.exclude_status, args.start, args.end, args.baseline_max)
+        return
+
+    by = args.by.capitalize()
+    start = time.perf_counter()
+    tops, totals, stats = rank(paths, by, args.top, args.start, args.end, args.exclude_status)
+    seconds = time.perf_counter() - start
+    print(f"掃描 {stats['rows']:,} 個品項，列入 {stats['counted']:,} 個 (不在 SKU 目錄: {stats['unknown']:,})，"
+          f"{seconds:.2f} s，peak RSS {peak_rss_mb():.0f} MB")
+    for level, table in tops.items():
+        print("-" * 30)
+        print(f"[{level}] 依 {by} 前 {args.top} 名")
+        print(table.to_string(index=False))
+
+    if args.verify:
+        print("-" * 30)
+        failed = False
+        for level in Sales_Summary.LEVELS:
+            ok = same_totals(totals[level], Sales_Summary.raw_report(paths, level, args.start, args.end, args.exclude_status), level)
+            failed |= not ok
+            print(f"  {level:<8}: {'與 JOIN 結果一致' if ok else '與 JOIN 結果不一致'}")
+        if failed:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+import pandas as pd
+import numpy as np
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+import Schema_Registry
+import Table_Formats
+
+# --- 銷售彙總表 (增量維護) ---
+# idx_order_date 是為了「銷售報表統計」加的，但每次出報表還是要把 Order / OrderItem 整個 JOIN 再 GROUP BY 一次。
+# 這裡維護三張每日彙總表 (SKU / Product / 品牌)，報表只讀彙總列:
+#   Day, Status, 鍵, Units (件數), Revenue (件數 * SKU 的 Price), Orders (訂單數)
+# 增量更新: 狀態檔記下 order.csv / order_item.csv 已處理到的 byte 位置 (水位線)，
+# 之後只讀水位線後面追加的完整資料列，把新算出的彙總加到原本的彙總表上。
+#   - 水位線前最後 FINGERPRINT_BYTES 的雜湊對不上 (檔案被重新生成而不是追加)、
+#     或 SKU / Product 表有變動 (Price 變了，舊的營收就不對) 時，自動全部重算
+#   - 訂單的 Day / Status 存成精簡的對照表 (OrderID 排序 + 日期 + 狀態代碼)，之後追加的品項也查得到
+#   - 品項的訂單還沒出現 (order.csv 晚一步寫入) 的先放在 pending，下次再處理
+# 假設同一張訂單的品項是一起追加的 (生成器與下單流程都是如此)，Orders 才不會重複計算；
+# 訂單狀態之後才改變 (Processing -> Shipped) 屬於更新而非追加，需要 --full 重算。
+# 彙總表輸出 CSV；有 pyarrow 時另外寫一份 Feather (Table_Formats)，報表優先讀 Feather，不必每次重新解析文字。
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join(SCRIPTS_DIR, '..', 'Data', 'State')
+SUMMARY_DIR = os.path.join(SCRIPTS_DIR, '..', 'Data', 'Summary')
+STATE_PATH = os.path.join(STATE_DIR, 'sales_summary_state.json')
+ORDER_LOOKUP_PATH = os.path.join(STATE_DIR, 'sales_summary_orders.npz')
+PENDING_PATH = os.path.join(STATE_DIR, 'sales_summary_pending.csv')
+
+LEVELS = {
+    'sku': ['SKU_ID', 'ProductID'],
+    'product': ['ProductID', 'BrandName', 'ProductName'],
+    'brand': ['BrandName'],
+}
+SUMMARY_PATHS = {level: os.path.join(SUMMARY_DIR, f'daily_{level}_sales.csv') for level in LEVELS}
+MEASURES = ['Units', 'Revenue', 'Orders']
+
+ITEM_COLUMNS = ['OrderItemID', 'OrderID', 'SKUID', 'Quantity']
+BLOCK_BYTES = 64 * 1024 * 1024
+MERGE_EVERY = 8     # 累積幾塊的部分彙總就先合併一次，記憶體只跟彙總列數有關
+FINGERPRINT_BYTES = 64 * 1024
+
+# --- 1. 讀取追加的資料 ---
+def tail_fingerprint(path, offset):
+    # 水位線前最後一段的雜湊: 只在後面追加時不變
+    start = max(0, offset - FINGERPRINT_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def iter_appended(path, offset, block_bytes=BLOCK_BYTES):
+    """從 offset 開始逐塊讀完整的資料列，yield (DataFrame, 這塊結束的 byte 位置)；最後沒有換行的半行留到下次。"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        position = max(offset, len(header))
+        f.seek(position)
+        rest = b''
+        while True:
+            block = f.read(block_bytes)
+            if not block:
+                break
+            block = rest + block
+            end = block.rfind(b'\n') + 1
+            rest = block[end:]
+            if end == 0:
+                continue
+            position += end
+            yield pd.read_csv(io.BytesIO(header + block[:end]), encoding='utf-8-sig'), position
+
+# --- 2. 狀態 ---
+def load_state():
+    if not os.path.exists(STATE_PATH):
+        return None
+    with open(STATE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state):
+    tmp_path = STATE_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+def save_atomic(df, path):
+    tmp_path = path + '.tmp'
+    df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, path)
+
+def needs_rebuild(state, paths):
+    """回傳需要全部重算的原因，不需要時回傳 None。"""
+    if state is None:
+        return '沒有狀態檔'
+    if state['catalog'] != {name: file_hash(paths[name]) for name in ('sku', 'product')}:
+        return 'SKU / Product 表有變動'
+    for name in ('order', 'order_item'):
+        offset = state['offsets'][name]
+        if os.path.getsize(paths[name]) < offset or tail_fingerprint(paths[name], offset) != state['fingerprints'][name]:
+            return f'{os.path.basename(paths[name])} 不是單純追加'
+    return None
+
+def empty_lookup():
+    return {'order_id': np.empty(0, np.int64), 'day': np.empty(0, np.int32), 'status': np.empty(0, np.int8)}
+
+def load_order_lookup():
+    if not os.path.exists(ORDER_LOOKUP_PATH):
+        return empty_lookup()
+    with np.load(ORDER_LOOKUP_PATH) as data:
+        return {key: data[key] for key in data.files}
+
+def save_order_lookup(lookup):
+    tmp_path = ORDER_LOOKUP_PATH + '.tmp.npz'
+    np.savez(tmp_path, **lookup)
+    os.replace(tmp_path, ORDER_LOOKUP_PATH)
+
+# --- 3. 彙總 ---
+def sku_catalog(sku_path, product_path):
+    sku = pd.read_csv(sku_path, encoding='utf-8-sig', usecols=['SKU_ID', 'ProductID', 'Price'])
+    product = pd.read_csv(product_path, encoding='utf-8-sig', usecols=['ProductID', 'BrandName', 'ProductName'])
+    return sku.merge(product, on='ProductID', how='left').set_index('SKU_ID')
+
+def add_orders(lookup, order_df, statuses):
+    # 新訂單加進對照表；狀態代碼依 statuses 的順序，新出現的狀態接在後面
+    for status in order_df['Status'].unique():
+        if status not in statuses:
+            statuses.append(status)
+    day = np.array(order_df['OrderDate'].str[:10], dtype='datetime64[D]').astype(np.int32)
+    status = pd.Categorical(order_df['Status'], categories=statuses).codes.astype(np.int8)
+    order_id = np.concatenate([lookup['order_id'], order_df['Order_ID'].to_numpy(np.int64)])
+    day, status = np.concatenate([lookup['day'], day]), np.concatenate([lookup['status'], status])
+    if len(order_id) and (np.diff(order_id) < 0).any():
+        order = np.argsort(order_id, kind='stable')
+        order_id, day, status = order_id[order], day[order], status[order]
+    return {'order_id': order_id, 'day': day, 'status': status}
+
+def summarize_items(items, lookup, statuses, catalog):
+    """回傳 ({層級: 彙總}, 找不到訂單的品項)。"""
+    ids = lookup['order_id']
+    pos = np.minimum(np.searchsorted(ids, items['OrderID'].to_numpy()), max(len(ids) - 1, 0))
+    found = (ids[pos] == items['OrderID'].to_numpy()) if len(ids) else np.zeros(len(items), dtype=bool)
+    pending = items[~found]
+    items, pos = items[found], pos[found]
+
+    sku = catalog.reindex(items['SKUID'])
+    lines = pd.DataFrame({
+        'Day': lookup['day'][pos].astype('datetime64[D]').astype(str),
+        'Status': pd.Categorical.from_codes(lookup['status'][pos], categories=statuses),
+        'SKU_ID': items['SKUID'].to_numpy(),
+        'ProductID': sku['ProductID'].astype('Int64').to_numpy(),
+        'BrandName': sku['BrandName'].to_numpy(),
+        'ProductName': sku['ProductName'].to_numpy(),
+        'OrderID': items['OrderID'].to_numpy(),
+        'Units': items['Quantity'].to_numpy(np.int64),
+        'Revenue': items['Quantity'].to_numpy(np.int64) * sku['Price'].fillna(0).to_numpy(np.int64),
+    })
+    result = {}
+    for level, keys in LEVELS.items():
+        result[level] = (lines.groupby(['Day', 'Status'] + keys, observed=True, dropna=False)
+                         .agg(Units=('Units', 'sum'), Revenue=('Revenue', 'sum'), Orders=('OrderID', 'nunique'))
+                         .reset_index())
+    return result, pending
+
+def merge_summary(parts, level):
+    # 同一組 (Day, Status, 鍵) 的彙總相加；三個指標對日期 / 狀態都可以直接相加
+    keys = ['Day', 'Status'] + LEVELS[level]
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame(columns=keys + MEASURES)
+    df = pd.concat(parts, ignore_index=True)
+    df['Status'] = df['Status'].astype(str)
+    return df.groupby(keys, dropna=False)[MEASURES].sum().reset_index().sort_values(keys, ignore_index=True)
+
+def save_summary(df, level):
+    save_atomic(df, SUMMARY_PATHS[level])
+    if Table_Formats.has_pyarrow():
+        Table_Formats.write_columnar(df, SUMMARY_PATHS[level], ['feather'])
+
+def read_summary(level):
+    # 有 Feather 就讀 Feather；文字欄可能被轉成 category，轉回一般字串再比較 / 合併
+    df = Table_Formats.read_table(SUMMARY_PATHS[level], prefer=['feather'])
+    for name in ['Day', 'Status'] + [k for k in LEVELS[level] if k != 'ProductID']:
+        df[name] = df[name].astype(str)
+    if 'ProductID' in df.columns:
+        df['ProductID'] = df['ProductID'].astype('Int64')
+    return df
+
+def iter_item_batches(path, offset, block_bytes=BLOCK_BYTES):
+    """品項依 OrderID 連續寫入；每塊最後一張訂單的品項延到下一塊，同一張訂單不會被切開。yield (品項, byte 位置)。"""
+    carry, position = None, offset
+    for items, position in iter_appended(path, offset, block_bytes):
+        if carry is not None:
+            items = pd.concat([carry, items], ignore_index=True)
+        tail = items['OrderID'].to_numpy() == items['OrderID'].iloc[-1]
+        carry = items[tail]
+        if (~tail).any():
+            yield items[~tail], position
+    if carry is not None and len(carry):
+        yield carry, position
+
+def update(paths, full=False, block_bytes=BLOCK_BYTES):
+    """增量 (或全部) 更新彙總表，回傳統計。"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    os.makedirs(SUMMARY_DIR, exist_ok=True)
+    state = load_state()
+    reason = '--full' if full else needs_rebuild(state, paths)
+    if reason:
+        state = {'offsets': {'order': 0, 'order_item': 0}, 'statuses': []}
+        lookup = empty_lookup()
+    else:
+        lookup = load_order_lookup()
+    statuses = state['statuses']
+    stats = {'rebuild': reason, 'orders': 0, 'items': 0}
+
+    # 1. 新訂單加進對照表
+    for order_df, position in iter_appended(paths['order'], state['offsets']['order'], block_bytes):
+        lookup = add_orders(lookup, order_df, statuses)
+        stats['orders'] += len(order_df)
+        state['offsets']['order'] = position
+
+    # 2. 新品項 (加上上次 pending 的) 彙總後加到原本的彙總表
+    catalog = sku_catalog(paths['sku'], paths['product'])
+    parts = {level: [] for level in LEVELS}
+    batches = iter_item_batches(paths['order_item'], state['offsets']['order_item'], block_bytes)
+    if not reason and os.path.exists(PENDING_PATH):
+        pending = pd.read_csv(PENDING_PATH, encoding='utf-8-sig')
+        batches = itertools.chain([(pending, state['offsets']['order_item'])], batches)
+    waiting = []
+    for items, position in batches:
+        summary, rest = summarize_items(items, lookup, statuses, catalog)
+        for level in LEVELS:
+            parts[level].append(summary[level])
+            if len(parts[level]) > MERGE_EVERY:
+                parts[level] = [merge_summary(parts[level], level)]
+        stats['items'] += len(items) - len(rest)
+        waiting.append(rest)
+        state['offsets']['order_item'] = position
+
+    # 沒有新資料時彙總表不動；有的話讀回原本的彙總表一起合併
+    if reason or stats['items']:
+        for level in LEVELS:
+            summary = merge_summary(([] if reason else [read_summary(level)]) + parts[level], level)
+            save_summary(summary, level)
+            stats[level] = len(summary)
+    waiting = pd.concat(waiting, ignore_index=True) if waiting else pd.DataFrame(columns=ITEM_COLUMNS)
+    save_atomic(waiting, PENDING_PATH)
+    stats['pending'] = len(waiting)
+    if reason or stats['orders']:
+        save_order_lookup(lookup)
+    state['fingerprints'] = {name: tail_fingerprint(paths[name], state['offsets'][name]) for name in ('order', 'order_item')}
+    state['catalog'] = {name: file_hash(paths[name]) for name in ('sku', 'product')}
+    save_state(state)
+    return stats
+
+# --- 4. 報表 ---
+def report(level, start=None, end=None, exclude_status=()):
+    """日期區間 [start, end] (YYYY-MM-DD) 的彙總，依營收排序；另附各狀態的訂單數。"""
+    df = read_summary(level)
+    mask = ~df['Status'].isin(list(exclude_status))
+    if start:
+        mask &= df['Day'] >= start
+    if end:
+        mask &= df['Day'] <= end
+    df = df[mask]
+    keys = LEVELS[level]
+    totals = df.groupby(keys, dropna=False)[MEASURES].sum()
+    by_status = df.groupby(keys + ['Status'], dropna=False)['Orders'].sum().unstack('Status', fill_value=0)
+    by_status.columns = [f'Orders_{c}' for c in by_status.columns]
+    return totals.join(by_status).sort_values('Revenue', ascending=False).reset_index()
+
+def raw_report(paths, level, start=None, end=None, exclude_status=()):
+    # 對照組: 直接從 order.csv / order_item.csv JOIN 再 GROUP BY (原本出報表的做法)
+    orders = pd.read_csv(paths['order'], encoding='utf-8-sig', usecols=['Order_ID', 'OrderDate', 'Status'])
+    items = pd.read_csv(paths['order_item'], encoding='utf-8-sig')
+    lines = items.merge(orders, left_on='OrderID', right_on='Order_ID').join(
+        sku_catalog(paths['sku'], paths['product']), on='SKUID').rename(columns={'SKUID': 'SKU_ID'})
+    day = lines['OrderDate'].str[:10]
+    mask = ~lines['Status'].isin(list(exclude_status))
+    if start:
+        mask &= day >= start
+    if end:
+        mask &= day <= end
+    lines = lines[mask].assign(Units=lambda d: d['Quantity'], Revenue=lambda d: d['Quantity'] * d['Price'].fillna(0))
+    lines['ProductID'] = lines['ProductID'].astype('Int64')
+    return (lines.groupby(LEVELS[level], dropna=False)
+            .agg(Units=('Units', 'sum'), Revenue=('Revenue', 'sum'), Orders=('OrderID', 'nunique'))
+            .sort_values('Revenue', ascending=False).reset_index())
+
+def same_report(a, b, level):
+    keys = LEVELS[level]
+    a = a.sort_values(keys, ignore_index=True)[keys + MEASURES]
+    b = b.sort_values(keys, ignore_index=True)[keys + MEASURES]
+    return len(a) == len(b) and all((a[c].astype('float64').to_numpy() == b[c].astype('float64').to_numpy()).all()
+                                    for c in MEASURES) and a[keys].astype(str).equals(b[keys].astype(str))
+
+def main():
+    parser = argparse.ArgumentParser(description='每日銷售彙總表 (SKU / Product / 品牌)，依 byte 水位線增量更新')
+    parser.add_argument('--processed', default=Schema_Registry.PROCESSED_DIR, help='CSV 所在資料夾')
+    parser.add_argument('--full', action='store_true', help='忽略狀態檔，全部重算')
+    parser.add_argument('--report', choices=list(LEVELS), default=None, help='更新後印出這個層級的報表')
+    parser.add_argument('--start', default=None, help='報表起始日 (YYYY-MM-DD，含)')
+    parser.add_argument('--end', default=None, help='報表結束日 (YYYY-MM-DD，含)')
+    parser.add_argument('--exclude-status', nargs='*', default=[], help='不列入報表的訂單狀態 (例如 Cancelled)')
+    parser.add_argument('--top', type=int, default=10, help='報表列出前幾名')
+    parser.add_argument('--verify', action='store_true', help='與直接 JOIN 原始 CSV 的結果逐層比對，並比較耗時')
+    args = parser.parse_args()
+
+    paths = {name: os.path.join(args.processed, f'{name}.csv') for name in ('order', 'order_item')}
+    paths['sku'] = os.path.join(args.processed, 'sku_table_v6.csv')
+    paths['product'] = os.path.join(args.processed, 'product_table.csv')
+    missing = [os.path.basename(p) for p in paths.values() if not os.path.exists(p)]
+    if missing:
+        print("錯誤：找不到 " + '、'.join(missing))
+        sys.exit(1)
+
+    start = time.perf_counter()
+    stats = update(paths, args.full)
+    mode = f"全部重算 ({stats['rebuild']})" if stats['rebuild'] else '增量更新'
+    print(f"{mode}: 新訂單 {stats['orders']:,} 筆、新品項 {stats['items']:,} 筆、等待訂單的品項 {stats['pending']:,} 筆，"
+          f"{time.perf_counter() - start:.2f} s")
+    if all(level in stats for level in LEVELS):
+        print("彙總表: " + '  '.join(f"{level} {stats[level]:,} 列" for level in LEVELS))
+    else:
+        print("沒有新資料，彙總表未變動。")
+
+    if args.report:
+        table = report(args.report, args.start, args.end, args.exclude_status)
+        print("-" * 30)
+        print(table.head(args.top).to_string(index=False))
+
+    if args.verify:
+        print("-" * 30)
+        failed = False
+        for level in LEVELS:
+            t0 = time.perf_counter()
+            fast = report(level, args.start, args.end, args.exclude_status)
+            t1 = time.perf_counter()
+            slow = raw_report(paths, level, args.start, args.end, args.exclude_status)
+            t2 = time.perf_counter()
+            ok = same_report(fast, slow, level)
+            failed |= not ok
+            print(f"  {level:<8}: 彙總表 {(t1 - t0) * 1000:8.1f} ms   JOIN 原始資料 {(t2 - t1) * 1000:8.1f} ms   "
+                  f"{'一致' if ok else '不一致'} ({len(fast):,} 列)")
+        if failed:
+            print("錯誤：彙總表與原始資料的結果不一致。")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+import pandas as pd
+import numpy as np
+import re
+import os
+import argparse
+from functools import lru_cache
+
+# --- Schema Registry ---
+# 欄位型別的唯一來源是 SQL/create_tables_v2.sql，這裡把 DDL 解析成:
+#   read_csv 用的 dtype、輸出前的型別轉換、以及 CSV 與 DDL 不一致 (drift) 的檢查。
+# 對照規則:
+#   INT            -> int32   (可為 NULL 且沒有 DEFAULT 時用 Int32)
+#   DECIMAL(p, s)  -> float32 (p <= 7，float32 的有效位數足夠) / float64
+#   VARCHAR(n)     -> 文字；讀入後重複值多的欄位再轉成 category
+#   DATETIME       -> datetime64
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DDL_PATH = os.path.join(SCRIPTS_DIR, '..', 'SQL', 'create_tables_v2.sql')
+PROCESSED_DIR = os.path.join(SCRIPTS_DIR, '..', 'Data', 'Processed')
+
+# CSV 檔名 (不含副檔名) -> DDL 資料表
+CSV_TABLES = {
+    'product_table': 'Product',
+    'sku_table_v6': 'SKU',
+    'customer': 'Customer',
+    'address_book': 'AddressBook',
+    'order': 'Order',
+    'order_item': 'OrderItem',
+}
+
+# 已知的欄名差異: CSV 欄名 -> DDL 欄名
+# SKU 表的 StorageType ('SSD' / 'HDD' / 'SSD + HDD') 匯入時對應到 DDL 的 Storage VARCHAR(100)
+COLUMN_ALIASES = {
+    'sku_table_v6': {'StorageType': 'Storage'},
+}
+
+# 不同值的個數 <= 筆數 * 這個比例時，文字欄轉成 category
+CATEGORY_RATIO = 0.5
+
+INT_RANGES = {'TINYINT': (-2**7, 2**7 - 1), 'SMALLINT': (-2**15, 2**15 - 1), 'INT': (-2**31, 2**31 - 1), 'BIGINT': (-2**63, 2**63 - 1)}
+INT_DTYPES = {'TINYINT': 'int8', 'SMALLINT': 'int16', 'INT': 'int32', 'BIGINT': 'int64'}
+TEXT_TYPES = ('VARCHAR', 'CHAR', 'TEXT')
+DATE_TYPES = ('DATETIME', 'DATE', 'TIMESTAMP')
+
+# --- 1. 解析 DDL ---
+_TABLE_RE = re.compile(r'CREATE TABLE\s+`?(\w+)`?\s*\((.*?)\n\);', re.S | re.I)
+_COLUMN_RE = re.compile(r'^`?(\w+)`?\s+([A-Za-z]+)(?:\s*\(\s*(\d+)(?:\s*,\s*(\d+))?\s*\))?(.*)$')
+_FK_RE = re.compile(r'FOREIGN KEY\s*\((\w+)\)\s*REFERENCES\s*`?(\w+)`?\s*\((\w+)\)', re.I)
+_INDEX_RE = re.compile(r'CREATE INDEX\s+(\w+)\s+ON\s+`?(\w+)`?\s*\(([^)]*)\)', re.I)
+
+def parse_ddl(path=DDL_PATH):
+    """
+    回傳 {'tables': {表名: {欄名: 欄位資訊}}, 'foreign_keys': [...], 'indexes': [...]}
+    欄位資訊: sql_type, length, scale, not_null, default, primary_key, unique
+    """
+    with open(path, encoding='utf-8') as f:
+        ddl = f.read()
+
+    tables, foreign_keys = {}, []
+    for table, body in _TABLE_RE.findall(ddl):
+        columns = {}
+        for line in body.splitlines():
+            line = line.split('--')[0].strip().rstrip(',').strip()
+            if not line:
+                continue
+            fk = _FK_RE.match(line)
+            if fk:
+                foreign_keys.append({'table': table, 'column': fk.group(1), 'ref_table': fk.group(2), 'ref_column': fk.group(3)})
+                continue
+            match = _COLUMN_RE.match(line)
+            if not match or match.group(1).upper() in ('PRIMARY', 'UNIQUE', 'INDEX', 'KEY', 'CONSTRAINT'):
+                continue
+            name, sql_type, length, scale, rest = match.groups()
+            rest_upper = rest.upper()
+            default = re.search(r'DEFAULT\s+(\'[^\']*\'|\S+)', rest, re.I)
+            columns[name] = {
+                'sql_type': sql_type.upper(),
+                'length': int(length) if length else None,
+                'scale': int(scale) if scale else None,
+                'not_null': 'NOT NULL' in rest_upper or 'PRIMARY KEY' in rest_upper,
+                'default': default.group(1).strip("'") if default else None,
+                'primary_key': 'PRIMARY KEY' in rest_upper,
+                'unique': 'UNIQUE' in rest_upper,
+            }
+        tables[table] = columns
+
+    indexes = [{'name': name, 'table': table, 'columns': [c.strip(' `') for c in cols.split(',')]}
+               for name, table, cols in _INDEX_RE.findall(ddl)]
+    return {'tables': tables, 'foreign_keys': foreign_keys, 'indexes': indexes}
+
+@lru_cache(maxsize=None)
+def load_schema(path=DDL_PATH):
+    return parse_ddl(path)
+
+# --- 2. CSV 欄位 -> 型別 ---
+def csv_columns(csv_table):
+    """CSV 欄名 -> DDL 欄位資訊 (已套用 COLUMN_ALIASES)，不在 DDL 裡的欄位不列出。"""
+    columns = load_schema()['tables'][CSV_TABLES[csv_table]]
+    aliases = COLUMN_ALIASES.get(csv_table, {})
+    by_ddl_name = {ddl: csv for csv, ddl in aliases.items()}
+    return {by_ddl_name.get(name, name): info for name, info in columns.items()}
+
+def column_dtype(info):
+    sql_type = info['sql_type']
+    if sql_type in INT_DTYPES:
+        nullable = not info['not_null'] and info['default'] is None
+        return INT_DTYPES[sql_type].capitalize() if nullable else INT_DTYPES[sql_type]
+    if sql_type in ('DECIMAL', 'NUMERIC'):
+        return 'float32' if (info['length'] or 10) <= 7 else 'float64'
+    if sql_type == 'FLOAT':
+        return 'float32'
+    if sql_type == 'DOUBLE':
+        return 'float64'
+    if sql_type in TEXT_TYPES:
+        return 'str'
+    return None
+
+def read_dtypes(csv_table):
+    """read_csv 用的 dtype (日期欄改用 date_columns 交給 parse_dates)。"""
+    if csv_table not in CSV_TABLES:
+        return None
+    dtypes = {}
+    for name, info in csv_columns(csv_table).items():
+        dtype = column_dtype(info)
+        if dtype is not None:
+            dtypes[name] = dtype
+    return dtypes
+
+def date_columns(csv_table):
+    if csv_table not in CSV_TABLES:
+        return []
+    return [name for name, info in csv_columns(csv_table).items() if info['sql_type'] in DATE_TYPES]
+
+# --- 2b. 資料表相依 / 欄名對照 (匯入 / 匯出用) ---
+def load_order():
+    """依外鍵排序的 DDL 表名: 被參照的表在前，同一層維持 DDL 裡的順序。"""
+    schema = load_schema()
+    depends = {table: set() for table in schema['tables']}
+    for fk in schema['foreign_keys']:
+        if fk['ref_table'] != fk['table']:
+            depends[fk['table']].add(fk['ref_table'])
+    ordered = []
+    while len(ordered) < len(depends):
+        ready = [t for t in depends if t not in ordered and depends[t] <= set(ordered)]
+        if not ready:
+            raise ValueError("外鍵有循環參照，無法決定匯入順序。")
+        ordered.append(ready[0])
+    return ordered
+
+def csv_table_for(table):
+    return {ddl: csv for csv, ddl in CSV_TABLES.items()}[table]
+
+def ddl_column(csv_table, name):
+    return COLUMN_ALIASES.get(csv_table, {}).get(name, name)
+
+# --- 3. 讀取 / 轉型 ---
+def table_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def read_csv(path, shrink_columns=True, **kwargs):
+    """依 DDL 讀入 CSV；shrink_columns=True 時再縮成最窄的型別 (整數降位、低基數文字轉 category)。"""
+    csv_table = table_name(path)
+    kwargs.setdefault('encoding', 'utf-8-sig')
+    # 只對檔案裡真的有 (且有讀入) 的欄位指定型別，例如 customer.csv 沒有 RegisterDate
+    present = set(kwargs.get('usecols') or pd.read_csv(path, nrows=0, encoding=kwargs['encoding']).columns)
+    dtypes = {k: v for k, v in (read_dtypes(csv_table) or {}).items() if k in present}
+    dates = [c for c in date_columns(csv_table) if c in present]
+    df = pd.read_csv(path, dtype=dtypes or None, parse_dates=dates or None, **kwargs)
+    return shrink(df) if shrink_columns else df
+
+def cast(df, csv_table):
+    """
+    輸出前轉成 DDL 的型別 (INT -> int32、DECIMAL(4, x) -> float32 ...)。
+    超出 DDL 範圍的整數會直接報錯，而不是等到匯入 MySQL 才發現。
+    """
+    if csv_table not in CSV_TABLES:
+        return df
+    columns = csv_columns(csv_table)
+    dtypes = {}
+    for name, dtype in read_dtypes(csv_table).items():
+        if name not in df.columns or dtype == 'str':
+            continue
+        sql_type = columns[name]['sql_type']
+        if sql_type in INT_RANGES and len(df):
+            low, high = INT_RANGES[sql_type]
+            if df[name].min() < low or df[name].max() > high:
+                raise ValueError(f"{csv_table}.{name} 超出 {sql_type} 範圍")
+        dtypes[name] = dtype
+    df = df.astype(dtypes)
+    for name in date_columns(csv_table):
+        if name in df.columns:
+            df[name] = pd.to_datetime(df[name])
+    return df
+
+def shrink(df):
+    """整數依實際範圍降到最窄的位元數，重複值多的文字欄轉成 category。"""
+    df = df.copy()
+    for name in df.columns:
+        col = df[name]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_integer_dtype(col.dtype) and isinstance(col.dtype, np.dtype):
+            df[name] = pd.to_numeric(col, downcast='integer')
+        elif pd.api.types.is_string_dtype(col.dtype) and len(col) and col.nunique() <= len(col) * CATEGORY_RATIO:
+            df[name] = col.astype('category')
+    return df
+
+# --- 4. 與 DDL 比對 (drift) ---
+def check(df, csv_table):
+    """回傳 CSV 與 DDL 不一致的地方 (文字說明的 list)，沒有問題時回傳空 list。"""
+    problems = []
+    columns = csv_columns(csv_table)
+    for csv_name, ddl_name in COLUMN_ALIASES.get(csv_table, {}).items():
+        if csv_name in df.columns:
+            problems.append(f"欄名不同: CSV {csv_name} 對應 DDL {ddl_name}")
+    for name, info in columns.items():
+        if name not in df.columns:
+            note = f"匯入時使用 DEFAULT {info['default']}" if info['default'] is not None else '匯入會失敗' if info['not_null'] else '匯入時為 NULL'
+            problems.append(f"缺少欄位: {name} ({note})")
+    for name in df.columns:
+        if name not in columns:
+            problems.append(f"DDL 沒有的欄位: {name}")
+
+    for name, info in columns.items():
+        if name not in df.columns:
+            continue
+        col = df[name]
+        if info['not_null'] and col.isna().any():
+            problems.append(f"{name} 為 NOT NULL，但有 {int(col.isna().sum())} 筆空值")
+        if info['sql_type'] in TEXT_TYPES and info['length'] and len(col):
+            longest = col.dropna().astype(str).str.len().max()
+            if pd.notna(longest) and longest > info['length']:
+                problems.append(f"{name} 最長 {int(longest)} 字，超過 {info['sql_type']}({info['length']})")
+        if info['sql_type'] in INT_RANGES and pd.api.types.is_numeric_dtype(col.dtype) and len(col):
+            low, high = INT_RANGES[info['sql_type']]
+            if col.min() < low or col.max() > high:
+                problems.append(f"{name} 超出 {info['sql_type']} 範圍")
+        if (info['primary_key'] or info['unique']) and col.duplicated().any():
+            problems.append(f"{name} 為 {'PRIMARY KEY' if info['primary_key'] else 'UNIQUE'}，但有 {int(col.duplicated().sum())} 筆重複")
+    return problems
+
+# --- 5. 記憶體報告 ---
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description='由 create_tables_v2.sql 產生的 Schema Registry')
+    parser.add_argument('--show', action='store_true', help='列出解析出來的欄位型別')
+    args = parser.parse_args()
+
+    if args.show:
+        for csv_table, table in CSV_TABLES.items():
+            print(f"[{table}] <- {csv_table}.csv")
+            for name, info in csv_columns(csv_table).items():
+                print(f"  {name:<16} {info['sql_type']:<8} -> {column_dtype(info) or 'datetime64'}")
+        print("-" * 30)
+
+    total_before = total_after = 0.0
+    for csv_table in CSV_TABLES:
+        path = os.path.join(PROCESSED_DIR, csv_table + '.csv')
+        if not os.path.exists(path):
+            print(f"找不到 {csv_table}.csv，略過。")
+            continue
+        before = memory_mb(pd.read_csv(path, encoding='utf-8-sig'))
+        typed = read_csv(path)
+        after = memory_mb(typed)
+        total_before += before
+        total_after += after
+        print(f"[{csv_table}] {len(typed)} 筆   記憶體 {before:7.2f} MB -> {after:7.2f} MB ({before / after:4.1f}x)")
+        for problem in check(typed, csv_table):
+            print(f"  drift: {problem}")
+
+    print("-" * 30)
+    print(f"全部資料表: {total_before:.2f} MB -> {total_after:.2f} MB ({total_before / total_after:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# --- 內容定址的階段快取 (Stage Cache) ---
+# 每個 pipeline 階段的 key = sha256(階段名稱 + 腳本原始碼 + 所有輸入檔內容 + 亂數種子 + 其他參數)。
+# key 相同代表輸出一定相同，直接把快取裡的產物複製回去，不必重跑腳本。
+#
+# 目錄結構:
+#   Data/.cache/stages/<stage>/<key>/         <- 產物 (檔名與輸出相同)
+#   Data/.cache/stages/<stage>/<key>/meta.json <- 輸出清單、大小、最後使用時間
+#   Data/.cache/file_hashes.json               <- 檔案雜湊的記憶 (路徑 + 大小 + mtime 沒變就不重算)
+
+CACHE_DIR = '../Data/.cache'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3   # 快取總大小上限 (超過就依最久沒用到的先刪)
+BLOCK_SIZE = 1024 * 1024
+
+class StageCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.stage_dir = os.path.join(cache_dir, 'stages')
+        self.max_bytes = max_bytes
+        self.hits = []
+        self.misses = []
+        self._hash_index_path = os.path.join(cache_dir, 'file_hashes.json')
+        self._hash_index = self._load_json(self._hash_index_path, {})
+
+    # --- 雜湊 ---
+    @staticmethod
+    def _load_json(path, default):
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        return default
+
+    def file_hash(self, path):
+        # 大小與 mtime 都沒變就沿用上次的結果，避免每次都重讀大檔
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        cached = self._hash_index.get(path)
+        if cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns:
+            return cached['sha256']
+
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        self._hash_index[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+        return digest
+
+    def stage_key(self, stage, scripts, inputs, seed=None, params=None):
+        """
+        scripts: 階段會執行 / import 的腳本路徑
+        inputs:  輸入檔路徑 (缺檔時回傳 None，代表這次無法使用快取)
+        """
+        h = hashlib.sha256()
+        h.update(f'stage={stage}\n'.encode())
+        for path in sorted(scripts) + sorted(inputs):
+            if not os.path.exists(path):
+                return None
+            h.update(f'{os.path.basename(path)}={self.file_hash(path)}\n'.encode())
+        h.update(f'seed={seed!r}\n'.encode())
+        h.update(f'params={json.dumps(params or {}, sort_keys=True)}\n'.encode())
+        return h.hexdigest()
+
+    # --- 查詢 / 寫入 ---
+    def _entry_dir(self, stage, key):
+        return os.path.join(self.stage_dir, stage, key)
+
+    def restore(self, stage, key, outputs):
+        """命中時把產物複製回輸出路徑並回傳 True。"""
+        entry = self._entry_dir(stage, key)
+        meta_path = os.path.join(entry, 'meta.json')
+        if key is None or not os.path.exists(meta_path):
+            self.misses.append(stage)
+            return False
+
+        meta = self._load_json(meta_path, {})
+        for output in outputs:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            shutil.copyfile(os.path.join(entry, os.path.basename(output)), output)
+        meta['last_used'] = time.time()
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        self.hits.append(stage)
+        return True
+
+    def store(self, stage, key, outputs):
+        if key is None:
+            return
+        entry = self._entry_dir(stage, key)
+        tmp_entry = entry + '.tmp'
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        os.makedirs(tmp_entry)
+        size = 0
+        for output in outputs:
+            shutil.copyfile(output, os.path.join(tmp_entry, os.path.basename(output)))
+            size += os.path.getsize(output)
+        with open(os.path.join(tmp_entry, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'stage': stage, 'outputs': [os.path.basename(o) for o in outputs],
+                       'size': size, 'created': time.time(), 'last_used': time.time()}, f)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+        self.evict()
+
+    # --- 依總大小淘汰 (LRU) ---
+    def entries(self):
+        result = []
+        if not os.path.isdir(self.stage_dir):
+            return result
+        for stage in os.listdir(self.stage_dir):
+            for key in os.listdir(os.path.join(self.stage_dir, stage)):
+                meta_path = os.path.join(self.stage_dir, stage, key, 'meta.json')
+                if os.path.exists(meta_path):
+                    meta = self._load_json(meta_path, {})
+                    result.append((meta.get('last_used', 0), meta.get('size', 0), stage, key))
+        return result
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _, _ in entries)
+        evicted = 0
+        for _, size, stage, key in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(stage, key), ignore_errors=True)
+            total -= size
+            evicted += 1
+        return evicted
+
+    def save(self):
+        # 上限可能在這次執行時被調小，結束前再淘汰一次
+        self.evict()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._hash_index_path, 'w', encoding='utf-8') as f:
+            json.dump(self._hash_index, f)
+
+    def report(self):
+        total = sum(size for _, size, _, _ in self.entries())
+        print(f"快取命中 {len(self.hits)} 個階段: {', '.join(self.hits) or '-'}")
+        print(f"快取未命中 {len(self.misses)} 個階段: {', '.join(self.misses) or '-'}")
+        print(f"快取大小 {total / 1024 / 1024:.1f} MB / 上限 {self.max_bytes / 1024 / 1024:.0f} MB")
@@ -0,0 +1,136 @@
+import pandas as pd
+import numpy as np
+import os
+
+import Schema_Registry
+
+# --- 欄式格式輸出 (Parquet / Feather) ---
+# CSV 仍是主要輸出 (MySQL Workbench 匯入用)，另外可選擇多存一份帶型別的欄式檔案:
+#   小整數 (RAM / VRAM / Quantity ...)、類別 (CPU / GPU / StorageType / Status / PaymentMethod)、
+#   OrderDate 存成真正的 datetime。下游讀取不必再把整個檔案當文字重新解析。
+# 型別由 Schema_Registry (create_tables_v2.sql) 決定，再依實際資料縮到最窄。
+# 需要 pyarrow；沒有安裝時只輸出 CSV。
+
+COLUMNAR_FORMATS = ['parquet', 'feather']
+CHUNK_ROWS = 1_000_000  # convert_csv 每塊讀入的列數
+
+def table_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def columnar_path(csv_path, fmt):
+    return os.path.splitext(csv_path)[0] + '.' + fmt
+
+def has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+# --- 1. 套用型別 ---
+def typed_table(df, table):
+    return Schema_Registry.shrink(Schema_Registry.cast(df, table))
+
+# --- 2. 寫出 ---
+def write_columnar(df, csv_path, formats):
+    """在 CSV 旁邊寫出同名的 .parquet / .feather，回傳寫出的路徑。"""
+    if not formats:
+        return []
+    if not has_pyarrow():
+        print("未安裝 pyarrow，略過 Parquet / Feather 輸出。")
+        return []
+
+    typed = typed_table(df.reset_index(drop=True), table_name(csv_path))
+    written = []
+    for fmt in formats:
+        path = columnar_path(csv_path, fmt)
+        if fmt == 'parquet':
+            typed.to_parquet(path, index=False)
+        else:
+            typed.to_feather(path)
+        written.append(path)
+    return written
+
+def column_types(csv_path, chunksize):
+    """
+    逐塊掃過 CSV，決定整個檔案共用的窄型別 (與 typed_table 的 shrink 相同規則):
+    整數依全檔的最小 / 最大值降位，不同值夠少的文字欄轉成 category (類別清單取全檔的值)。
+    各塊各自 shrink 會得到不同的型別，無法寫進同一個檔案。
+    """
+    table = table_name(csv_path)
+    # 先只讀第一欄數出總列數，才知道 category 的門檻 (不同值 <= 總列數 * CATEGORY_RATIO)
+    rows = sum(len(chunk) for chunk in pd.read_csv(csv_path, usecols=[0], chunksize=chunksize, encoding='utf-8-sig'))
+    limit = rows * Schema_Registry.CATEGORY_RATIO
+    ranges, values = {}, {}
+    for chunk in Schema_Registry.read_csv(csv_path, shrink_columns=False, chunksize=chunksize):
+        chunk = Schema_Registry.cast(chunk, table)
+        for name in chunk.columns:
+            col = chunk[name]
+            if pd.api.types.is_integer_dtype(col.dtype) and isinstance(col.dtype, np.dtype):
+                if len(col):
+                    low, high = ranges.get(name, (col.min(), col.max()))
+                    ranges[name] = (min(low, col.min()), max(high, col.max()))
+            elif pd.api.types.is_string_dtype(col.dtype) and values.get(name, set()) is not None:
+                seen = values.setdefault(name, set())
+                seen.update(col.dropna().unique())
+                # 不同值已超過門檻就不會轉 category，不再收集 (避免把整欄留在記憶體)
+                if len(seen) > limit:
+                    values[name] = None
+    dtypes = {}
+    for name, (low, high) in ranges.items():
+        dtypes[name] = next(t for t in (np.int8, np.int16, np.int32, np.int64)
+                            if np.iinfo(t).min <= low and high <= np.iinfo(t).max)
+    for name, seen in values.items():
+        if seen is not None and rows:
+            dtypes[name] = pd.CategoricalDtype(sorted(seen))
+    return dtypes
+
+def convert_csv(csv_path, formats, chunksize=CHUNK_ROWS):
+    """
+    串流 / 平行模式的 CSV 是分批寫出的，寫完後再逐塊轉成欄式檔 (記憶體只需要一塊):
+    先掃一遍決定全檔共用的型別，再逐塊套用型別、附加到 ParquetWriter / Feather (Arrow IPC) 檔。
+    """
+    if not formats:
+        return []
+    if not has_pyarrow():
+        print("未安裝 pyarrow，略過 Parquet / Feather 輸出。")
+        return []
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = table_name(csv_path)
+    dtypes = column_types(csv_path, chunksize)
+    paths = {fmt: columnar_path(csv_path, fmt) for fmt in formats}
+    writers, schema = {}, None
+    try:
+        for chunk in Schema_Registry.read_csv(csv_path, shrink_columns=False, chunksize=chunksize):
+            chunk = Schema_Registry.cast(chunk, table).astype(dtypes).reset_index(drop=True)
+            batch = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if schema is None:
+                schema = batch.schema
+                for fmt, path in paths.items():
+                    # Feather 與 to_feather 相同: Arrow IPC 檔，預設 lz4 壓縮
+                    writers[fmt] = (pq.ParquetWriter(path, schema) if fmt == 'parquet' else
+                                    pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression='lz4')))
+            for fmt, writer in writers.items():
+                writer.write_table(batch)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    if schema is None:
+        # 只有表頭 (沒有資料列): 讀不出任何一塊，直接整檔寫出空表
+        return write_columnar(Schema_Registry.read_csv(csv_path, shrink_columns=False), csv_path, formats)
+    return list(paths.values())
+
+# --- 3. 讀取 ---
+def read_table(csv_path, prefer=COLUMNAR_FORMATS):
+    """
+    有欄式檔案就讀欄式檔，否則讀 CSV 並套用型別。
+    (不比較 mtime: fin_CSV_BOM.py 會就地改寫 CSV，內容沒變但時間比欄式檔新)
+    """
+    if has_pyarrow():
+        for fmt in prefer:
+            path = columnar_path(csv_path, fmt)
+            if os.path.exists(path):
+                return pd.read_parquet(path) if fmt == 'parquet' else pd.read_feather(path)
+    return Schema_Registry.read_csv(csv_path)
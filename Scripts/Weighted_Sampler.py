@@ -0,0 +1,123 @@
+import pandas as pd
+import numpy as np
+import time
+import argparse
+
+# --- 加權抽樣 (Alias Method) ---
+# 累積機率表 + searchsorted 每抽一次要 O(log N)，商品數到百萬級時會明顯變慢。
+# Alias table (Vose) 先花 O(N) 建表，之後每抽一次只要: 均勻抽一格 + 一個亂數決定取本格或替身，O(1)。
+# 熱門度曲線與品牌 / 價格偏好都只是在建表前調整權重，抽樣本身不變。
+
+CURVES = ['uniform', 'hot', 'zipf']
+
+# --- 1. Alias table ---
+class AliasTable:
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) == 0 or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("權重必須非負且總和大於 0。")
+        n = len(weights)
+        scaled = weights * (n / weights.sum())
+        prob = np.ones(n)
+        alias = np.arange(n)
+
+        # Vose: 不足 1 的格子由超過 1 的格子補滿，補完後剩下的部分再放回對應的清單
+        small = np.flatnonzero(scaled < 1.0).tolist()
+        large = np.flatnonzero(scaled >= 1.0).tolist()
+        remaining = scaled.tolist()
+        while small and large:
+            s, l = small.pop(), large[-1]
+            prob[s] = remaining[s]
+            alias[s] = l
+            remaining[l] -= 1.0 - remaining[s]
+            if remaining[l] < 1.0:
+                small.append(large.pop())
+        # 剩下的格子只差浮點誤差，機率視為 1
+
+        self.n = n
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, rng, size):
+        cell = rng.integers(0, self.n, size)
+        return np.where(rng.random(size) < self.prob[cell], cell, self.alias[cell])
+
+    def probabilities(self):
+        # 由表反推每個項目的抽中機率 (驗證用)
+        p = self.prob / self.n
+        return p + np.bincount(self.alias, weights=(1.0 - self.prob) / self.n, minlength=self.n)
+
+# --- 2. 熱門度曲線 ---
+def popularity_weights(rng, n, curve='hot', zipf_s=1.0, hot_ratio=0.1, hot_weight=10):
+    """
+    'uniform': 每個項目一樣熱門
+    'hot'    : 隨機挑 hot_ratio 的項目，權重 hot_weight 倍 (原本的熱銷商品邏輯)
+    'zipf'   : 項目隨機排名，第 k 名的權重 1 / k^zipf_s
+    """
+    if curve == 'uniform':
+        return np.ones(n)
+    if curve == 'hot':
+        weights = np.ones(n)
+        weights[rng.choice(n, size=int(n * hot_ratio), replace=False)] = hot_weight
+        return weights
+    if curve == 'zipf':
+        rank = rng.permutation(n) + 1
+        return rank.astype(np.float64) ** -zipf_s
+    raise ValueError(f"未知的熱門度曲線: {curve}")
+
+# --- 3. 品牌 / 價格偏好 ---
+def skew_weights(weights, brands=None, brand_skew=None, prices=None, price_skew=0.0):
+    """
+    brand_skew: {品牌: 倍數}，沒列到的品牌為 1
+    price_skew: 權重乘上 (價格 / 中位數) ^ -price_skew (> 0 偏好便宜的商品，< 0 偏好貴的)
+    """
+    weights = np.asarray(weights, dtype=np.float64).copy()
+    if brand_skew and brands is not None:
+        weights *= pd.Series(np.asarray(brands)).map(brand_skew).fillna(1.0).to_numpy(dtype=np.float64)
+    if price_skew and prices is not None:
+        prices = np.asarray(prices, dtype=np.float64)
+        ratio = prices / np.nanmedian(prices)
+        # 沒有價格的商品不調整
+        weights *= np.where(np.isfinite(ratio) & (ratio > 0), ratio, 1.0) ** -price_skew
+    return weights
+
+def top_share(weights, ratio=0.01):
+    # 前 ratio 的項目占總權重的比例 (描述分布偏斜程度)
+    weights = np.sort(np.asarray(weights, dtype=np.float64))[::-1]
+    k = max(1, int(len(weights) * ratio))
+    return weights[:k].sum() / weights.sum()
+
+# --- 4. 效能比較: 累積機率表 vs alias table ---
+def main():
+    parser = argparse.ArgumentParser(description='加權抽樣效能比較 (searchsorted vs alias table)')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[4_000, 1_000_000, 10_000_000], help='項目數')
+    parser.add_argument('--draws', type=int, default=5_000_000, help='每種方法抽幾次')
+    parser.add_argument('--curve', choices=CURVES, default='zipf', help='熱門度曲線')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.sizes:
+        weights = popularity_weights(rng, n, args.curve)
+
+        start = time.perf_counter()
+        cdf = np.cumsum(weights)
+        cdf /= cdf[-1]
+        cdf_build = time.perf_counter() - start
+        start = time.perf_counter()
+        np.searchsorted(cdf, rng.random(args.draws), side='right')
+        cdf_draw = time.perf_counter() - start
+
+        start = time.perf_counter()
+        table = AliasTable(weights)
+        alias_build = time.perf_counter() - start
+        start = time.perf_counter()
+        table.sample(rng, args.draws)
+        alias_draw = time.perf_counter() - start
+
+        error = np.abs(table.probabilities() - weights / weights.sum()).max()
+        print(f"[{n:>10,} 項] 前 1% 占 {top_share(weights):.1%}   alias 機率最大誤差 {error:.1e}")
+        print(f"  searchsorted: 建表 {cdf_build:6.3f} s   抽 {args.draws:,} 次 {cdf_draw:6.3f} s ({args.draws / cdf_draw:12,.0f} 次/秒)")
+        print(f"  alias table : 建表 {alias_build:6.3f} s   抽 {args.draws:,} 次 {alias_draw:6.3f} s ({args.draws / alias_draw:12,.0f} 次/秒)")
+
+if __name__ == '__main__':
+    main()
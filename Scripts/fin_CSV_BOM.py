@@ -1,21 +1,106 @@
-import pandas as pd
-
-try:
-    # 1. 讀取原始檔案 (使用 utf-8-sig 來正確處理並吃掉原本的 BOM)
-    print("正在讀取 product_table.csv...")
-    df = pd.read_csv('product_table.csv', encoding='utf-8-sig')
-    
-    # 2. 存成新檔案 (使用 utf-8，這樣就不會帶 BOM 了)
-    output_filename = 'product_table_clean.csv'
-    print(f"正在移除 BOM 並儲存為 {output_filename}...")
-    df.to_csv(output_filename, index=False, encoding='utf-8')
-    
-    print("-" * 30)
-    print("成功！BOM 已移除。")
-    print(f"請使用 MySQL Workbench 匯入新產生的 '{output_filename}'")
-    print("-" * 30)
-    
-except FileNotFoundError:
-    print("錯誤：找不到 product_table.csv，請確認檔案位置。")
-except Exception as e:
-    print(f"發生其他錯誤：{e}")
\ No newline at end of file
+import argparse
+import codecs
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 用法:
+#   python fin_CSV_BOM.py                       -> 讀 product_table.csv，另存 product_table_clean.csv
+#   python fin_CSV_BOM.py a.csv b.csv --in-place -> 直接覆寫原檔 (pipeline 用)
+#   python fin_CSV_BOM.py ../Data/Raw/laptop.csv --in-place --source-encoding latin-1
+#                                               -> latin-1 轉成 UTF-8 (已經是合法 UTF-8 就不動，重跑不會重複轉)
+# 以 byte 為單位處理，不經過 pandas: 每次讀 BLOCK_BYTES 寫 BLOCK_BYTES，記憶體固定，
+# 內容 (OrderDate 的微秒、浮點數的寫法、引號) 除了開頭的 BOM 以外一個 byte 都不會變。
+# 沒有 BOM 又不必轉碼的檔案直接略過，不重寫 (修改時間也不變)；多個檔案同時處理 (I/O 為主，用 thread)。
+
+BOM = codecs.BOM_UTF8
+BLOCK_BYTES = 8 * 1024 * 1024
+WORKERS = 4
+
+def is_utf8(path, block_bytes=BLOCK_BYTES):
+    # 逐塊餵給 incremental decoder，字元被切在兩塊之間也能正確判斷
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_bytes), b''):
+                decoder.decode(block)
+        decoder.decode(b'', final=True)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def normalize(path, output, source_encoding='utf-8', block_bytes=BLOCK_BYTES):
+    """去掉開頭的 BOM (需要時順便轉成 UTF-8)，回傳 (處理方式, 寫出的 bytes)。"""
+    with open(path, 'rb') as f:
+        has_bom = f.read(len(BOM)) == BOM
+    transcode = codecs.lookup(source_encoding).name != 'utf-8' and not is_utf8(path, block_bytes)
+    if output == path and not has_bom and not transcode:
+        return 'unchanged', 0
+
+    # 先寫到暫存檔再換名，中途失敗不會留下寫一半的檔案
+    tmp_path = output + '.tmp'
+    written = 0
+    decoder = codecs.getincrementaldecoder(source_encoding)() if transcode else None
+    with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        if has_bom:
+            src.seek(len(BOM))
+        for block in iter(lambda: src.read(block_bytes), b''):
+            if decoder:
+                block = decoder.decode(block).encode('utf-8')
+            written += dst.write(block)
+        if decoder:
+            written += dst.write(decoder.decode(b'', final=True).encode('utf-8'))
+    if output == path:
+        shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, output)
+    action = ' + '.join(name for name, done in (('移除 BOM', has_bom), (f'{source_encoding} 轉 UTF-8', transcode)) if done)
+    return action or '複製', written
+
+def output_path(path, in_place):
+    return path if in_place else os.path.splitext(path)[0] + '_clean.csv'
+
+def process(path, in_place, source_encoding, block_bytes):
+    # 回傳 (檔名, 處理方式, bytes, 秒數, 錯誤訊息)
+    start = time.perf_counter()
+    try:
+        action, written = normalize(path, output_path(path, in_place), source_encoding, block_bytes)
+        return path, action, written, time.perf_counter() - start, None
+    except FileNotFoundError:
+        return path, None, 0, 0.0, f"錯誤：找不到 {path}，請確認檔案位置。"
+    except (OSError, LookupError) as e:
+        return path, None, 0, 0.0, f"發生其他錯誤：{e}"
+
+def main():
+    parser = argparse.ArgumentParser(description='移除 CSV 的 UTF-8 BOM (byte 串流，不經過 pandas)')
+    parser.add_argument('files', nargs='*', default=['product_table.csv'], help='要處理的 CSV 檔')
+    parser.add_argument('--in-place', action='store_true', help='直接覆寫原檔，不另存 *_clean.csv')
+    parser.add_argument('--source-encoding', default='utf-8', help='原檔編碼；不是 UTF-8 時轉成 UTF-8 (例如 latin-1)')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='同時處理幾個檔案')
+    parser.add_argument('--block-size', type=int, default=BLOCK_BYTES, help='每次讀寫的 bytes')
+    args = parser.parse_args()
+
+    failed = False
+    with ThreadPoolExecutor(max_workers=max(1, min(args.workers, len(args.files)))) as pool:
+        futures = [pool.submit(process, path, args.in_place, args.source_encoding, args.block_size) for path in args.files]
+        for future in futures:
+            path, action, written, seconds, error = future.result()
+            if error:
+                print(error)
+                failed = True
+            elif action == 'unchanged':
+                print(f"{path}: 沒有 BOM、已是 UTF-8，不需處理")
+            else:
+                print(f"{path}: {action} -> {output_path(path, args.in_place)} "
+                      f"({written / 1024 / 1024:,.1f} MB，{seconds:.2f} s)")
+
+    # 有任何一個檔案失敗就回傳非 0，pipeline 才知道這個階段沒成功
+    if failed:
+        sys.exit(1)
+    if not args.in_place:
+        print("-" * 30)
+        print("請使用 MySQL Workbench 匯入新產生的 *_clean.csv")
+
+if __name__ == '__main__':
+    main()